@@ -1,5 +1,68 @@
 """.. include:: ../../README.md"""  # noqa: D205, D415
 
-from mobi_marker.gui import main
+import importlib
+from typing import TYPE_CHECKING
 
-__all__ = ["main"]
+from mobi_marker.main import main
+
+if TYPE_CHECKING:
+    from mobi_marker.engine import MarkerEngine
+    from mobi_marker.gui import MobiMarkerGUI
+    from mobi_marker.headless import run_headless
+    from mobi_marker.journal import MarkerJournal
+    from mobi_marker.metrics import Metrics
+    from mobi_marker.outlets import OutletManager, StreamSpec
+    from mobi_marker.scheduler import ProtocolScheduler, load_protocol
+
+# Public names imported from their module on first access (PEP 562), so that
+# importing the package or running the command-line entry point does not
+# load pylsl, numpy or PyQt6
+_LAZY_EXPORTS = {
+    "MarkerEngine": "mobi_marker.engine",
+    "MarkerJournal": "mobi_marker.journal",
+    "Metrics": "mobi_marker.metrics",
+    "MobiMarkerGUI": "mobi_marker.gui",
+    "OutletManager": "mobi_marker.outlets",
+    "ProtocolScheduler": "mobi_marker.scheduler",
+    "StreamSpec": "mobi_marker.outlets",
+    "load_protocol": "mobi_marker.scheduler",
+    "run_headless": "mobi_marker.headless",
+}
+
+__all__ = [
+    "MarkerEngine",
+    "MarkerJournal",
+    "Metrics",
+    "MobiMarkerGUI",
+    "OutletManager",
+    "ProtocolScheduler",
+    "StreamSpec",
+    "load_protocol",
+    "main",
+    "run_headless",
+]
+
+
+def __getattr__(name: str) -> object:
+    """Import a lazily exported name on first access.
+
+    Args:
+        name: The requested attribute.
+
+    Returns:
+        The exported object, which is then cached in the package namespace.
+
+    Raises:
+        AttributeError: If the package has no such attribute.
+    """
+    module = _LAZY_EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    """List the package attributes, including the lazy exports."""
+    return sorted({*globals(), *_LAZY_EXPORTS})
@@ -0,0 +1,110 @@
+"""Benchmarks for the MoBI Marker application.
+
+This package contains benchmarks meant to be run on a quiet, loopback-only
+machine so that results can be compared across releases. Each benchmark is
+a module that can be run with ``python -m`` and reports its results as
+JSON, in the common report format written by write_report().
+
+Modules:
+    hotkeys: Keypress and button click to push latency of a quick marker.
+    latency: End-to-end latency from send_marker() to a local StreamInlet.
+    scheduler: Deadline error of the protocol scheduler.
+    startup: GUI time to first paint, from a cold interpreter.
+
+Functions:
+    environment: Describe the machine and software a benchmark ran on.
+    add_output_argument: Add the --output option to a benchmark's parser.
+    write_report: Write a benchmark report as JSON.
+"""
+
+import argparse
+import json
+import math
+import platform
+import sys
+from datetime import datetime, timezone
+from importlib.metadata import version
+from typing import Iterable, Mapping, Optional, Sequence
+
+
+def environment(packages: Sequence[str] = ()) -> dict[str, str]:
+    """Describe the machine and software versions a benchmark ran on.
+
+    Args:
+        packages: Distributions the benchmark depends on, whose versions are
+            reported along with mobi-marker's.
+
+    Returns:
+        Version and platform information for the report.
+    """
+    info = {"mobi_marker": version("mobi-marker")}
+    info.update((package.lower(), version(package)) for package in packages)
+    info.update(
+        python=platform.python_version(),
+        platform=platform.platform(),
+        machine=platform.machine(),
+    )
+    return info
+
+
+def add_output_argument(parser: argparse.ArgumentParser) -> None:
+    """Add the --output option to a benchmark's parser.
+
+    Args:
+        parser: The benchmark's argument parser.
+    """
+    parser.add_argument(
+        "--output", metavar="PATH", help="write the report here instead of stdout"
+    )
+
+
+def _json_value(value: object) -> object:
+    """Replace a non-finite number, which JSON cannot represent, with None.
+
+    Args:
+        value: A result field.
+
+    Returns:
+        The value, or None if it is NaN or infinite.
+    """
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def write_report(
+    benchmark: str,
+    parameters: Mapping[str, object],
+    results: Iterable[Mapping[str, object]],
+    packages: Sequence[str] = (),
+    output: Optional[str] = None,
+) -> None:
+    """Write a benchmark report as JSON.
+
+    Statistics that could not be computed, such as the latency of a case in
+    which nothing was received, are written as null.
+
+    Args:
+        benchmark: Name of the benchmark.
+        parameters: Parameters shared by all results.
+        results: One mapping of statistics per result.
+        packages: Distributions whose versions are reported, see
+            environment().
+        output: Path to write the report to, or None for stdout.
+    """
+    report = {
+        "benchmark": benchmark,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "environment": environment(packages),
+        "parameters": dict(parameters),
+        "results": [
+            {name: _json_value(value) for name, value in result.items()}
+            for result in results
+        ],
+    }
+    text = json.dumps(report, indent=2, allow_nan=False)
+    if output:
+        with open(output, "w") as report_file:
+            report_file.write(text + "\n")
+    else:
+        sys.stdout.write(text + "\n")
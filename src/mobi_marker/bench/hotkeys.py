@@ -0,0 +1,256 @@
+"""Keypress and button click to push latency benchmark.
+
+This module compares the two GUI input paths of a quick marker: pressing
+its hotkey, handled by the application-wide HotkeyDispatcher, and clicking
+its button. Both are driven with synthetic input events from QTest on a
+real MobiMarkerGUI window. Latency is measured from the moment the input
+event is sent to the moment the dispatch thread has pushed the marker to
+the LSL outlet, so it covers Qt event delivery, the handler and the
+dispatch queue, but not the operating system's input stack.
+
+The window uses a benchmark profile whose only quick marker has the hotkey
+F12, and no journal. Set QT_QPA_PLATFORM=offscreen to run the benchmark
+without a display.
+
+Example:
+    Measure 5000 presses and clicks without a display::
+
+        QT_QPA_PLATFORM=offscreen python -m mobi_marker.bench.hotkeys --count 5000
+
+Classes:
+    PathResult: Latency statistics of one input path.
+
+Functions:
+    summarize: Compute latency statistics from raw measurements.
+    run_benchmark: Measure hotkey and button click latency.
+    main: Command-line entry point.
+"""
+
+import argparse
+import sys
+import threading
+import time
+from typing import Callable, NamedTuple, Optional, Sequence
+
+import numpy as np
+from pylsl import local_clock
+
+from mobi_marker.bench import add_output_argument, write_report
+from mobi_marker.profile import MarkerProfile, QuickMarker
+
+BENCH_PROFILE = MarkerProfile(
+    name="Benchmark",
+    markers=(QuickMarker("BENCH", "#3498db", "F12"),),
+    modalities=(),
+)
+# Seconds to wait for a marker to be pushed before giving up
+_PUSH_TIMEOUT = 2.0
+
+
+class PathResult(NamedTuple):
+    """Latency statistics of one input path.
+
+    All latencies are in milliseconds.
+
+    Attributes:
+        path: Name of the input path, "hotkey" or "click".
+        samples: Number of measured markers.
+        p50_ms: Median latency.
+        p99_ms: 99th percentile latency.
+        mean_ms: Mean latency.
+        max_ms: Largest latency.
+    """
+
+    path: str
+    samples: int
+    p50_ms: float
+    p99_ms: float
+    mean_ms: float
+    max_ms: float
+
+
+def summarize(path: str, latencies: np.ndarray) -> PathResult:
+    """Compute latency statistics from raw measurements.
+
+    Args:
+        path: Name of the input path.
+        latencies: Input-to-push latencies in seconds.
+
+    Returns:
+        The latency statistics.
+
+    Raises:
+        ValueError: If there are no measurements.
+    """
+    if latencies.size == 0:
+        raise ValueError(f"No {path} latencies")
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    return PathResult(
+        path,
+        int(latencies.size),
+        float(p50),
+        float(p99),
+        float(latencies.mean() * 1000),
+        float(latencies.max() * 1000),
+    )
+
+
+class _RecordingOutlet:
+    """Outlet wrapper recording when each push completes.
+
+    Attributes:
+        pushed: Set after each push.
+        pushed_at: local_clock() time right after the most recent push.
+    """
+
+    def __init__(self, outlet: object) -> None:
+        """Wrap an outlet.
+
+        Args:
+            outlet: The outlet pushes are forwarded to.
+        """
+        self._outlet = outlet
+        self.pushed = threading.Event()
+        self.pushed_at = 0.0
+
+    def push_sample(self, *args: object) -> None:
+        """Forward a push_sample call and record its completion."""
+        self._outlet.push_sample(*args)  # type: ignore[attr-defined]
+        self.pushed_at = local_clock()
+        self.pushed.set()
+
+    def push_chunk(self, *args: object) -> None:
+        """Forward a push_chunk call and record its completion."""
+        self._outlet.push_chunk(*args)  # type: ignore[attr-defined]
+        self.pushed_at = local_clock()
+        self.pushed.set()
+
+
+def _measure(
+    trigger: Callable[[], None], outlet: _RecordingOutlet, count: int, warmup: int
+) -> np.ndarray:
+    """Send markers through one input path and measure their latency.
+
+    Args:
+        trigger: Sends one synthetic input event.
+        outlet: The recording outlet of the window's engine.
+        count: Number of measured markers.
+        warmup: Number of unmeasured markers sent first.
+
+    Returns:
+        The input-to-push latencies in seconds.
+
+    Raises:
+        RuntimeError: If a marker is not pushed within _PUSH_TIMEOUT seconds.
+    """
+    latencies = np.empty(count)
+    for index in range(warmup + count):
+        outlet.pushed.clear()
+        start = local_clock()
+        trigger()
+        if not outlet.pushed.wait(_PUSH_TIMEOUT):
+            raise RuntimeError("A marker was not pushed")
+        if index >= warmup:
+            latencies[index - warmup] = outlet.pushed_at - start
+        # Let the dispatch thread go back to sleep, as between real inputs
+        time.sleep(0.001)
+    return latencies
+
+
+def run_benchmark(count: int, warmup: int) -> list[PathResult]:
+    """Measure hotkey and button click latency.
+
+    Creates the process's QApplication and a MobiMarkerGUI window.
+
+    Args:
+        count: Number of measured markers per input path.
+        warmup: Number of unmeasured markers sent first on each path.
+
+    Returns:
+        The latency statistics of the hotkey and the click path.
+
+    Raises:
+        RuntimeError: If the LSL stream cannot be started or a marker is
+            not pushed.
+    """
+    from PyQt6.QtCore import Qt
+    from PyQt6.QtTest import QTest
+    from PyQt6.QtWidgets import QApplication, QPushButton
+
+    from mobi_marker.gui import MobiMarkerGUI
+
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+    window = MobiMarkerGUI(use_journal=False, profile=BENCH_PROFILE)
+    try:
+        assert window.lsl_thread is not None
+        engine = window.lsl_thread.engine
+        engine.started.wait()
+        if engine.outlet is None:
+            raise RuntimeError("The LSL stream could not be started")
+        outlet = _RecordingOutlet(engine.outlet)
+        engine.outlet = outlet  # type: ignore[assignment]
+        window.show()
+        app.processEvents()
+
+        button = next(
+            button
+            for button in window.findChildren(QPushButton)
+            if button.property("marker") == "BENCH"
+        )
+        # The PyQt6 stubs declare QTest's static functions as methods
+        hotkey = _measure(
+            lambda: QTest.keyClick(window, Qt.Key.Key_F12),  # type: ignore[call-overload]
+            outlet,
+            count,
+            warmup,
+        )
+        click = _measure(
+            lambda: QTest.mouseClick(button, Qt.MouseButton.LeftButton),  # type: ignore[call-overload]
+            outlet,
+            count,
+            warmup,
+        )
+    finally:
+        window.close()
+    return [summarize("hotkey", hotkey), summarize("click", click)]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Command-line entry point.
+
+    Args:
+        argv: Command-line arguments, excluding the program name. Defaults
+            to sys.argv[1:].
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m mobi_marker.bench.hotkeys",
+        description="Compare hotkey and button click to push latency and write "
+        "the results as JSON.",
+    )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=2000,
+        help="markers per input path (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=100,
+        help="unmeasured markers sent first (default: %(default)s)",
+    )
+    add_output_argument(parser)
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args.count, args.warmup)
+    write_report(
+        "hotkeys",
+        {"count": args.count, "warmup": args.warmup},
+        [result._asdict() for result in results],
+        ["pylsl", "PyQt6"],
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+"""End-to-end marker latency benchmark.
+
+This module measures how long it takes for a marker handed to
+MarkerEngine.send_marker() - the call behind LSLStreamThread.send_marker()
+and every GUI button - to arrive as a sample on a StreamInlet in the same
+process. The engine's outlet is resolved by a benchmark-specific source ID,
+so a running MoBI Marker instance is never measured by mistake.
+
+Each marker is stamped with local_clock() when it is sent, and the outlet
+pushes it with that timestamp. Latency is the difference between the
+local_clock() time at which the inlet returns the sample and that
+timestamp. Markers are sent at a fixed rate from a pacing thread, or as
+fast as possible with a rate of 0.
+
+Example:
+    Measure three rates and write the report to a file::
+
+        python -m mobi_marker.bench.latency --rate 100 1000 0 --output out.json
+
+Classes:
+    LatencyResult: Latency statistics of one benchmark case.
+
+Functions:
+    summarize: Compute latency statistics from raw measurements.
+    run_case: Send markers at a fixed rate and measure their latency.
+    run_benchmark: Run every combination of rates and payload sizes.
+    main: Command-line entry point.
+"""
+
+import argparse
+import os
+import threading
+import time
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+from pylsl import StreamInlet, local_clock, resolve_byprop
+
+from mobi_marker.bench import add_output_argument, write_report
+from mobi_marker.engine import MarkerEngine
+
+# Digits of the marker index at the start of every benchmark payload
+_INDEX_DIGITS = 10
+# Seconds to wait for outstanding markers after the last one was sent
+_DRAIN_TIMEOUT = 2.0
+
+
+class LatencyResult(NamedTuple):
+    """Latency statistics of one benchmark case.
+
+    All latencies are in milliseconds.
+
+    Attributes:
+        rate: Requested send rate in markers per second, 0 for unthrottled.
+        payload_size: Size of each marker in bytes.
+        sent: Number of markers sent.
+        received: Number of markers received by the inlet.
+        p50_ms: Median latency.
+        p99_ms: 99th percentile latency.
+        p999_ms: 99.9th percentile latency.
+        mean_ms: Mean latency.
+        max_ms: Maximum latency.
+        jitter_ms: Standard deviation of the latency.
+        throughput: Markers received per second, from the first send to the
+            last receipt.
+    """
+
+    rate: float
+    payload_size: int
+    sent: int
+    received: int
+    p50_ms: float
+    p99_ms: float
+    p999_ms: float
+    mean_ms: float
+    max_ms: float
+    jitter_ms: float
+    throughput: float
+
+
+def summarize(
+    latencies: np.ndarray,
+    rate: float,
+    payload_size: int,
+    sent: int,
+    duration: float,
+) -> LatencyResult:
+    """Compute latency statistics from raw measurements.
+
+    Args:
+        latencies: Latency of every received marker, in seconds.
+        rate: Requested send rate in markers per second.
+        payload_size: Size of each marker in bytes.
+        sent: Number of markers sent.
+        duration: Seconds from the first send to the last receipt.
+
+    Returns:
+        The latency statistics. Latency fields are NaN if nothing was
+        received, and reported as null.
+    """
+    received = len(latencies)
+    if received:
+        ms = latencies * 1000.0
+        p50, p99, p999 = (float(p) for p in np.percentile(ms, [50.0, 99.0, 99.9]))
+        mean, peak, jitter = float(ms.mean()), float(ms.max()), float(ms.std())
+    else:
+        p50 = p99 = p999 = mean = peak = jitter = float("nan")
+    return LatencyResult(
+        rate=rate,
+        payload_size=payload_size,
+        sent=sent,
+        received=received,
+        p50_ms=p50,
+        p99_ms=p99,
+        p999_ms=p999,
+        mean_ms=mean,
+        max_ms=peak,
+        jitter_ms=jitter,
+        throughput=received / duration if duration > 0 else 0.0,
+    )
+
+
+def _payload(index: int, payload_size: int) -> str:
+    """Build a benchmark marker carrying its index.
+
+    Args:
+        index: Index of the marker within the case.
+        payload_size: Size of the marker in bytes; at least _INDEX_DIGITS.
+
+    Returns:
+        The zero-padded index followed by filler up to payload_size bytes.
+    """
+    return f"{index:0{_INDEX_DIGITS}d}".ljust(payload_size, "x")
+
+
+def _wait_until(deadline: float) -> None:
+    """Wait until time.perf_counter() reaches a deadline.
+
+    Sleeps while the deadline is far away and spins for the last
+    millisecond, since sleep() alone overshoots by far more than the
+    latencies being measured.
+
+    Args:
+        deadline: The time.perf_counter() value to wait for.
+    """
+    while True:
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return
+        if remaining > 0.001:
+            time.sleep(remaining - 0.001)
+
+
+def _send(
+    engine: MarkerEngine,
+    rate: float,
+    payload_size: int,
+    count: int,
+    sent_times: np.ndarray,
+) -> None:
+    """Send a case's markers at a fixed rate.
+
+    Args:
+        engine: The engine to send through.
+        rate: Markers per second, or 0 to send as fast as possible.
+        payload_size: Size of each marker in bytes.
+        count: Number of markers to send.
+        sent_times: Array receiving the local_clock() time of every send.
+    """
+    markers = [_payload(index, payload_size) for index in range(count)]
+    start = time.perf_counter()
+    for index, marker in enumerate(markers):
+        if rate > 0:
+            _wait_until(start + index / rate)
+        timestamp = local_clock()
+        sent_times[index] = timestamp
+        while engine.send_marker(marker, timestamp) is not None:
+            # Queue full at unthrottled rates: let the dispatch loop catch up
+            time.sleep(0)
+
+
+def run_case(
+    engine: MarkerEngine,
+    inlet: StreamInlet,
+    rate: float,
+    payload_size: int,
+    count: int,
+) -> LatencyResult:
+    """Send markers at a fixed rate and measure their latency.
+
+    Args:
+        engine: The running engine to send through.
+        inlet: An open inlet on the engine's stream.
+        rate: Markers per second, or 0 to send as fast as possible.
+        payload_size: Size of each marker in bytes.
+        count: Number of markers to send.
+
+    Returns:
+        The latency statistics of the case.
+    """
+    sent_times = np.full(count, np.nan)
+    latencies = np.full(count, np.nan)
+    sender = threading.Thread(
+        target=_send, args=(engine, rate, payload_size, count, sent_times)
+    )
+    sender.start()
+
+    received = 0
+    last_receipt = local_clock()
+    done_at: Optional[float] = None
+    while received < count:
+        # pull_sample returns as soon as one sample is available; pull_chunk
+        # with a zero timeout then collects whatever arrived with it.
+        sample, timestamp = inlet.pull_sample(timeout=0.05)
+        now = local_clock()
+        if sample is None:
+            if not sender.is_alive():
+                done_at = done_at or now
+                if now - done_at > _DRAIN_TIMEOUT:
+                    break
+            continue
+        samples, timestamps = inlet.pull_chunk(timeout=0.0, max_samples=count)
+        for marker, stamp in zip([sample, *samples], [timestamp, *timestamps]):
+            index = int(marker[0][:_INDEX_DIGITS])
+            if np.isnan(latencies[index]):
+                latencies[index] = now - stamp
+                received += 1
+        last_receipt = now
+    sender.join()
+
+    return summarize(
+        latencies[~np.isnan(latencies)],
+        rate,
+        payload_size,
+        count,
+        last_receipt - float(sent_times[0]),
+    )
+
+
+def _open_inlet(source_id: str, timeout: float = 10.0) -> StreamInlet:
+    """Resolve the benchmark stream and open an inlet on it.
+
+    Args:
+        source_id: Source ID of the benchmark stream.
+        timeout: Seconds to wait for the stream.
+
+    Returns:
+        The open inlet.
+
+    Raises:
+        RuntimeError: If the stream cannot be resolved.
+    """
+    streams = resolve_byprop("source_id", source_id, timeout=timeout)
+    if not streams:
+        raise RuntimeError(f"LSL stream with source ID {source_id} not found")
+    inlet = StreamInlet(streams[0], max_buflen=60)
+    inlet.open_stream(timeout=timeout)
+    return inlet
+
+
+def run_benchmark(
+    rates: Sequence[float],
+    payload_sizes: Sequence[int],
+    count: int,
+    warmup: int = 200,
+    max_batch_size: int = 64,
+) -> list[LatencyResult]:
+    """Run every combination of rates and payload sizes.
+
+    Starts a dedicated engine and a local inlet, warms the connection up,
+    and then runs one case per combination.
+
+    Args:
+        rates: Send rates in markers per second; 0 sends unthrottled.
+        payload_sizes: Marker sizes in bytes.
+        count: Number of markers per case.
+        warmup: Number of unmeasured markers sent before the first case.
+        max_batch_size: The engine's max_batch_size.
+
+    Returns:
+        The statistics of every case, in order.
+
+    Raises:
+        RuntimeError: If the LSL stream cannot be started or resolved.
+        ValueError: If a payload size is too small to carry the marker
+            index.
+    """
+    if min(payload_sizes) < _INDEX_DIGITS:
+        raise ValueError(f"Payload sizes must be at least {_INDEX_DIGITS} bytes")
+    source_id = f"mobi_marker_bench_{os.getpid()}"
+    engine = MarkerEngine(
+        max_batch_size=max_batch_size,
+        stream_name="MobiMarkerBenchmark",
+        source_id=source_id,
+    )
+    dispatcher = threading.Thread(target=engine.run, name="MarkerEngine")
+    dispatcher.start()
+    try:
+        engine.started.wait()
+        if engine.outlet is None:
+            raise RuntimeError("LSL stream could not be started")
+        inlet = _open_inlet(source_id)
+        try:
+            if warmup:
+                run_case(engine, inlet, 0, _INDEX_DIGITS, warmup)
+            return [
+                run_case(engine, inlet, rate, payload_size, count)
+                for rate in rates
+                for payload_size in payload_sizes
+            ]
+        finally:
+            inlet.close_stream()
+    finally:
+        engine.stop()
+        dispatcher.join()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Command-line entry point.
+
+    Args:
+        argv: Command-line arguments, excluding the program name. Defaults
+            to sys.argv[1:].
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m mobi_marker.bench.latency",
+        description="Measure send_marker() to StreamInlet latency and write "
+        "the results as JSON.",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        nargs="+",
+        default=[100.0, 1000.0, 0.0],
+        help="send rates in markers per second, 0 for unthrottled "
+        "(default: %(default)s)",
+    )
+    parser.add_argument(
+        "--payload-size",
+        type=int,
+        nargs="+",
+        default=[16, 228],
+        help="marker sizes in bytes (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=2000,
+        help="markers per case (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=200,
+        help="unmeasured markers sent first (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--max-batch-size",
+        type=int,
+        default=64,
+        help="the engine's max_batch_size (default: %(default)s)",
+    )
+    add_output_argument(parser)
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(
+        args.rate, args.payload_size, args.count, args.warmup, args.max_batch_size
+    )
+    write_report(
+        "latency",
+        {
+            "count": args.count,
+            "warmup": args.warmup,
+            "max_batch_size": args.max_batch_size,
+        },
+        [result._asdict() for result in results],
+        ["pylsl"],
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""Protocol scheduler timing benchmark.
+
+This module measures how closely ProtocolScheduler meets its deadlines:
+markers are fired at a fixed interval through a running MarkerEngine with a
+real LSL outlet, and every marker's send time is compared with its
+deadline. Each interval is measured once per spin threshold, so sleeping
+alone (a threshold of 0) can be compared with the hybrid sleep and spin
+wait. The achieved interval between consecutive markers is reported next
+to the intended one.
+
+Results depend on the machine's load and timer resolution. On stock Linux
+the hybrid wait keeps the median error within a few microseconds, while
+sleeping alone overshoots by the kernel's timer slack and wakeup latency,
+typically around 100 microseconds.
+
+Example:
+    Compare sleeping alone with a 2 ms spin at three intervals::
+
+        python -m mobi_marker.bench.scheduler --interval 0.002 0.01 0.05
+
+Classes:
+    ScheduleResult: Timing statistics of one benchmark case.
+
+Functions:
+    summarize: Compute timing statistics from fired markers.
+    run_case: Fire markers at a fixed interval and record their timing.
+    run_benchmark: Run every combination of intervals and spin thresholds.
+    main: Command-line entry point.
+"""
+
+import argparse
+import os
+import threading
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from mobi_marker.bench import add_output_argument, write_report
+from mobi_marker.dispatch import MarkerRecord, SPSCQueue
+from mobi_marker.engine import MarkerEngine
+from mobi_marker.scheduler import (
+    LATE_THRESHOLD,
+    FiredMarker,
+    Protocol,
+    ProtocolLoop,
+    ProtocolScheduler,
+    ProtocolStep,
+)
+
+
+class ScheduleResult(NamedTuple):
+    """Timing statistics of one benchmark case.
+
+    Errors are the delays of markers after their deadlines, in
+    microseconds.
+
+    Attributes:
+        interval_ms: Intended interval between two markers.
+        spin_ms: Spin threshold of the scheduler; 0 sleeps only.
+        markers: Number of measured markers.
+        p50_us: Median error.
+        p99_us: 99th percentile error.
+        max_us: Largest error.
+        mean_us: Mean error.
+        late: Fraction of markers later than LATE_THRESHOLD.
+        achieved_interval_ms: Mean interval between consecutive markers.
+        interval_jitter_us: Standard deviation of the achieved interval.
+    """
+
+    interval_ms: float
+    spin_ms: float
+    markers: int
+    p50_us: float
+    p99_us: float
+    max_us: float
+    mean_us: float
+    late: float
+    achieved_interval_ms: float
+    interval_jitter_us: float
+
+
+def summarize(
+    interval: float, spin: float, fired: Sequence[FiredMarker]
+) -> ScheduleResult:
+    """Compute timing statistics from fired markers.
+
+    Args:
+        interval: Intended interval between two markers, in seconds.
+        spin: Spin threshold of the scheduler, in seconds.
+        fired: The fired markers, in order.
+
+    Returns:
+        The timing statistics.
+
+    Raises:
+        ValueError: If fewer than two markers were fired.
+    """
+    if len(fired) < 2:
+        raise ValueError(f"Need at least two markers, got {len(fired)}")
+    deadlines = np.array([item.deadline for item in fired])
+    fired_at = np.array([item.fired_at for item in fired])
+    errors = (fired_at - deadlines) * 1e6
+    intervals = np.diff(fired_at)
+    p50, p99 = np.percentile(errors, [50, 99])
+    return ScheduleResult(
+        interval * 1000,
+        spin * 1000,
+        len(fired),
+        float(p50),
+        float(p99),
+        float(errors.max()),
+        float(errors.mean()),
+        float(np.mean(errors > LATE_THRESHOLD * 1e6)),
+        float(intervals.mean() * 1000),
+        float(intervals.std() * 1e6),
+    )
+
+
+def run_case(
+    engine: MarkerEngine,
+    interval: float,
+    spin: float,
+    count: int,
+    queue: Optional[SPSCQueue[MarkerRecord]] = None,
+) -> ScheduleResult:
+    """Fire markers at a fixed interval and record their timing.
+
+    Args:
+        engine: The running engine to send through.
+        interval: Seconds between two markers.
+        spin: Spin threshold of the scheduler, in seconds.
+        count: Number of markers.
+        queue: Dispatch queue shared by consecutive cases. Defaults to a
+            new queue registered with the engine.
+
+    Returns:
+        The timing statistics of the case.
+
+    Raises:
+        RuntimeError: If a marker was rejected by the engine.
+    """
+    protocol = Protocol(
+        "Benchmark", (ProtocolLoop((ProtocolStep("BENCH", interval),), count),)
+    )
+    fired: list[FiredMarker] = []
+    scheduler = ProtocolScheduler(
+        engine, protocol, spin=spin, on_fired=fired.append, queue=queue
+    )
+    scheduler.start()
+    scheduler.join()
+    if len(fired) != count:
+        raise RuntimeError(f"Only {len(fired)} of {count} markers were sent")
+    return summarize(interval, spin, fired)
+
+
+def run_benchmark(
+    intervals: Sequence[float], spins: Sequence[float], count: int
+) -> list[ScheduleResult]:
+    """Run every combination of intervals and spin thresholds.
+
+    Args:
+        intervals: Seconds between two markers of each case.
+        spins: Spin thresholds of each case, in seconds.
+        count: Number of markers per case.
+
+    Returns:
+        The statistics of every case, in order.
+
+    Raises:
+        RuntimeError: If the LSL stream cannot be started or a marker was
+            rejected.
+    """
+    engine = MarkerEngine(
+        stream_name="MobiMarkerBenchmark",
+        source_id=f"mobi_marker_bench_{os.getpid()}",
+    )
+    dispatcher = threading.Thread(target=engine.run, name="MarkerEngine")
+    dispatcher.start()
+    try:
+        engine.started.wait()
+        if engine.outlet is None:
+            raise RuntimeError("LSL stream could not be started")
+        queue = engine.add_queue()
+        return [
+            run_case(engine, interval, spin, count, queue)
+            for interval in intervals
+            for spin in spins
+        ]
+    finally:
+        engine.stop()
+        dispatcher.join()
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Command-line entry point.
+
+    Args:
+        argv: Command-line arguments, excluding the program name. Defaults
+            to sys.argv[1:].
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m mobi_marker.bench.scheduler",
+        description="Measure how closely the protocol scheduler meets its "
+        "deadlines and write the results as JSON.",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        nargs="+",
+        default=[0.002, 0.01, 0.05],
+        help="seconds between two markers (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--spin",
+        type=float,
+        nargs="+",
+        default=[0.0, 0.002],
+        help="spin thresholds in seconds, 0 to sleep only (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=300,
+        help="markers per case (default: %(default)s)",
+    )
+    add_output_argument(parser)
+    args = parser.parse_args(argv)
+    if args.count < 2:
+        parser.error("--count must be at least 2")
+
+    results = run_benchmark(args.interval, args.spin, args.count)
+    write_report(
+        "scheduler",
+        {"count": args.count},
+        [result._asdict() for result in results],
+        ["pylsl"],
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+"""GUI startup time benchmark.
+
+This module measures how long the MoBI Marker window takes to start, from
+importing the GUI module to the first paint of the main window. Every sample
+runs in a fresh interpreter, so module imports and style sheet parsing are
+measured cold. Each sample is split into phases:
+
+- ``import_s``: importing mobi_marker.gui, which loads PyQt6 and pylsl.
+- ``app_s``: creating the QApplication.
+- ``window_s``: constructing MobiMarkerGUI, including init_ui() and starting
+  the LSL stream thread.
+- ``paint_s``: from show() until the window receives its first paint event.
+- ``total_s``: the sum of all phases, i.e. the time to first paint.
+
+The window is created without a journal. Set QT_QPA_PLATFORM=offscreen to
+run the benchmark without a display.
+
+Example:
+    Measure 20 cold starts without a display::
+
+        QT_QPA_PLATFORM=offscreen python -m mobi_marker.bench.startup --count 20
+
+Classes:
+    PhaseResult: Statistics of one startup phase.
+
+Functions:
+    measure_startup: Start the GUI once and time each phase.
+    summarize: Compute per-phase statistics from startup samples.
+    run_benchmark: Time cold starts in fresh interpreters.
+    main: Command-line entry point.
+
+Constants:
+    PHASES: Names of the measured phases.
+"""
+
+import argparse
+import importlib
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import NamedTuple, Optional, Sequence
+
+from mobi_marker.bench import add_output_argument, write_report
+
+PHASES = ("import_s", "app_s", "window_s", "paint_s", "total_s")
+# Seconds to wait for the first paint before giving up
+_PAINT_TIMEOUT = 10.0
+
+
+class PhaseResult(NamedTuple):
+    """Statistics of one startup phase.
+
+    All durations are in milliseconds.
+
+    Attributes:
+        phase: Name of the phase.
+        samples: Number of measured starts.
+        median_ms: Median duration.
+        p90_ms: 90th percentile duration.
+        min_ms: Shortest duration.
+        max_ms: Longest duration.
+    """
+
+    phase: str
+    samples: int
+    median_ms: float
+    p90_ms: float
+    min_ms: float
+    max_ms: float
+
+
+def measure_startup() -> dict[str, float]:
+    """Start the GUI once and time each phase.
+
+    Must run in a fresh interpreter that has not imported PyQt6 yet, and
+    creates the process's QApplication.
+
+    Returns:
+        The duration of each phase in PHASES, in seconds.
+
+    Raises:
+        RuntimeError: If the window is not painted within _PAINT_TIMEOUT
+            seconds.
+    """
+    start = time.perf_counter()
+    gui = importlib.import_module("mobi_marker.gui")
+    from PyQt6.QtCore import QEvent, QEventLoop, QObject
+
+    imported = time.perf_counter()
+    app = gui.QApplication([sys.argv[0]])
+    created = time.perf_counter()
+    window = gui.MobiMarkerGUI(use_journal=False)
+    constructed = time.perf_counter()
+
+    painted: list[float] = []
+
+    class _PaintFilter(QObject):
+        """Record the time of the window's first paint event."""
+
+        def eventFilter(self, watched: QObject | None, event: QEvent | None) -> bool:
+            """Record paint events without filtering them out."""
+            if event is not None and event.type() == QEvent.Type.Paint:
+                painted.append(time.perf_counter())
+            return False
+
+    paint_filter = _PaintFilter()
+    window.installEventFilter(paint_filter)
+    shown = time.perf_counter()
+    window.show()
+    while not painted and time.perf_counter() - shown < _PAINT_TIMEOUT:
+        app.processEvents(QEventLoop.ProcessEventsFlag.WaitForMoreEvents, 50)
+    window.removeEventFilter(paint_filter)
+    window.close()
+    if not painted:
+        raise RuntimeError("The window was not painted")
+
+    return {
+        "import_s": imported - start,
+        "app_s": created - imported,
+        "window_s": constructed - created,
+        "paint_s": painted[0] - shown,
+        "total_s": painted[0] - shown + constructed - start,
+    }
+
+
+def summarize(samples: Sequence[dict[str, float]]) -> list[PhaseResult]:
+    """Compute per-phase statistics from startup samples.
+
+    Args:
+        samples: Phase durations in seconds of each start, as returned by
+            measure_startup().
+
+    Returns:
+        One result per phase in PHASES.
+
+    Raises:
+        ValueError: If there are no samples.
+    """
+    if not samples:
+        raise ValueError("No startup samples")
+    results = []
+    for phase in PHASES:
+        durations = sorted(sample[phase] * 1000 for sample in samples)
+        if len(durations) > 1:
+            p90 = statistics.quantiles(durations, n=10, method="inclusive")[-1]
+        else:
+            p90 = durations[0]
+        results.append(
+            PhaseResult(
+                phase,
+                len(durations),
+                statistics.median(durations),
+                p90,
+                durations[0],
+                durations[-1],
+            )
+        )
+    return results
+
+
+def run_benchmark(count: int) -> list[dict[str, float]]:
+    """Time cold starts in fresh interpreters.
+
+    Args:
+        count: Number of starts to measure.
+
+    Returns:
+        The phase durations of each start, in seconds.
+
+    Raises:
+        subprocess.CalledProcessError: If a start fails.
+    """
+    samples = []
+    for _ in range(count):
+        result = subprocess.run(
+            [sys.executable, "-m", "mobi_marker.bench.startup", "--sample"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        samples.append(json.loads(result.stdout.splitlines()[-1]))
+    return samples
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Command-line entry point.
+
+    Args:
+        argv: Command-line arguments, excluding the program name. Defaults
+            to sys.argv[1:].
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m mobi_marker.bench.startup",
+        description="Measure the GUI's time to first paint and write the "
+        "results as JSON.",
+    )
+    parser.add_argument(
+        "--count",
+        type=int,
+        default=10,
+        help="cold starts to measure (default: %(default)s)",
+    )
+    add_output_argument(parser)
+    parser.add_argument("--sample", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.sample:
+        sys.stdout.write(json.dumps(measure_startup()) + "\n")
+        return
+
+    write_report(
+        "startup",
+        {"count": args.count},
+        [result._asdict() for result in summarize(run_benchmark(args.count))],
+        ["PyQt6"],
+        args.output,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""Monitoring of the wall clock against the LSL clock.
+
+Status records carry both a wall-clock time and an LSL time, but the two
+clocks are independent: the wall clock can be stepped or slewed by NTP,
+while local_clock() is monotonic. This module samples both clocks at a
+fixed rate and fits the offset between them with an incremental linear
+regression, whose slope is the drift between the clocks. A warning status
+record is raised when the clocks diverge or the offset jitters beyond a
+threshold, e.g. after the wall clock was stepped.
+
+The fit weights samples down exponentially with their age, so the drift
+and jitter describe the last JITTER_WINDOW samples or so: late jitter is
+not diluted by a long quiet session, and once a wall-clock step has aged
+out the jitter settles and the warning can be raised again. The fit keeps
+only running means and co-moments, so memory use is constant and every
+sample costs a few floating point operations.
+
+Classes:
+    DriftFit: Incremental linear regression of the clock offset.
+    DriftEstimate: Current estimate of the relationship between the clocks.
+    ClockMonitor: Thread sampling both clocks and warning about divergence.
+
+Constants:
+    MIN_FIT_SAMPLES: Samples needed before the jitter is checked.
+    JITTER_WINDOW: Number of recent samples the monitor's fit covers.
+"""
+
+import math
+import threading
+import time
+from typing import Callable, NamedTuple, Optional
+
+from pylsl import local_clock
+
+from mobi_marker.metrics import Metrics
+from mobi_marker.status import StatusLevel, StatusRecord
+
+MIN_FIT_SAMPLES = 10
+
+# One minute at the default interval
+JITTER_WINDOW = 60
+
+
+class DriftFit:
+    """Incremental linear regression of the clock offset.
+
+    Fits y = intercept + slope * x with Welford-style running means and
+    co-moments, which stay numerically stable over long runs. With a
+    window, every added point weights the earlier ones down by a factor of
+    1 - 1 / window, so the fit follows the recent points.
+
+    Attributes:
+        samples: Number of added points.
+    """
+
+    __slots__ = (
+        "_decay",
+        "_mean_x",
+        "_mean_y",
+        "_sxx",
+        "_sxy",
+        "_syy",
+        "_weight",
+        "_weight_sq",
+        "samples",
+    )
+
+    def __init__(self, window: Optional[int] = None) -> None:
+        """Initialize an empty fit.
+
+        Args:
+            window: Number of recent points the fit mainly covers, or None
+                to weight all points equally.
+
+        Raises:
+            ValueError: If window is not a positive integer.
+        """
+        if window is not None and window < 1:
+            raise ValueError(f"window must be a positive integer, got {window}")
+        self._decay = 1.0 if window is None else 1.0 - 1.0 / window
+        self.samples = 0
+        self._weight = 0.0
+        self._weight_sq = 0.0
+        self._mean_x = 0.0
+        self._mean_y = 0.0
+        self._sxx = 0.0
+        self._sxy = 0.0
+        self._syy = 0.0
+
+    def add(self, x: float, y: float) -> None:
+        """Add a point to the fit.
+
+        Args:
+            x: The independent variable, e.g. seconds since the first sample.
+            y: The dependent variable, e.g. the change of the clock offset.
+        """
+        decay = self._decay
+        self.samples += 1
+        self._weight = decay * self._weight + 1.0
+        self._weight_sq = decay * decay * self._weight_sq + 1.0
+        dx = x - self._mean_x
+        dy = y - self._mean_y
+        self._mean_x += dx / self._weight
+        self._mean_y += dy / self._weight
+        self._sxx = decay * self._sxx + dx * (x - self._mean_x)
+        self._sxy = decay * self._sxy + dx * (y - self._mean_y)
+        self._syy = decay * self._syy + dy * (y - self._mean_y)
+
+    @property
+    def slope(self) -> float:
+        """Slope of the fitted line, or 0 with fewer than two distinct x."""
+        return self._sxy / self._sxx if self._sxx > 0 else 0.0
+
+    @property
+    def intercept(self) -> float:
+        """Intercept of the fitted line."""
+        return self._mean_y - self.slope * self._mean_x
+
+    @property
+    def residual_std(self) -> float:
+        """Standard deviation of the points around the fitted line."""
+        if self.samples < 3:
+            return 0.0
+        # Effective number of points, equal to samples without a window
+        effective = self._weight * self._weight / self._weight_sq
+        if effective <= 2:
+            return 0.0
+        residual = self._syy - self.slope * self._sxy
+        variance = max(0.0, residual) / self._weight * effective / (effective - 2)
+        return math.sqrt(variance)
+
+
+class DriftEstimate(NamedTuple):
+    """Current estimate of the relationship between the clocks.
+
+    Attributes:
+        samples: Number of clock samples taken.
+        offset: Latest wall-clock time minus LSL time, in seconds.
+        divergence: Change of the offset since the first sample, in
+            seconds.
+        drift_ppm: Recent fitted rate of change of the offset, in parts
+            per million.
+        jitter: Standard deviation of the recent offsets around the fit,
+            in seconds.
+    """
+
+    samples: int
+    offset: float
+    divergence: float
+    drift_ppm: float
+    jitter: float
+
+
+class ClockMonitor(threading.Thread):
+    """Thread sampling both clocks and warning about divergence.
+
+    Each warning is raised once when its threshold is exceeded, and again
+    only after the value has returned below it.
+
+    Attributes:
+        interval: Seconds between two clock samples.
+        max_divergence: Largest tolerated change of the wall-clock to LSL
+            offset since monitoring started, in seconds.
+        max_jitter: Largest tolerated standard deviation of the offset
+            around the fit, in seconds.
+        fit: Regression of the recent offset changes over LSL time.
+        on_status: Callback receiving status records raised on the monitor
+            thread, or None to discard them.
+        metrics: Instrumentation whose clock gauges are updated, or None.
+    """
+
+    def __init__(
+        self,
+        interval: float = 1.0,
+        max_divergence: float = 0.010,
+        max_jitter: float = 0.001,
+        window: int = JITTER_WINDOW,
+        on_status: Optional[Callable[[StatusRecord], None]] = None,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        """Initialize the monitor.
+
+        Args:
+            interval: Seconds between two clock samples.
+            max_divergence: Largest tolerated change of the wall-clock to
+                LSL offset, in seconds.
+            max_jitter: Largest tolerated standard deviation of the offset
+                around the fit, in seconds.
+            window: Number of recent samples the fit mainly covers.
+            on_status: Optional callback receiving status records raised on
+                the monitor thread. It is called on the monitor thread.
+            metrics: Optional instrumentation whose clock gauges are updated
+                with every sample.
+
+        Raises:
+            ValueError: If interval or window is not positive.
+        """
+        if interval <= 0:
+            raise ValueError(f"interval must be positive, got {interval}")
+        super().__init__(name="ClockMonitor", daemon=True)
+        self.interval = interval
+        self.max_divergence = max_divergence
+        self.max_jitter = max_jitter
+        self.on_status = on_status
+        self.metrics = metrics
+        self.fit = DriftFit(window)
+        self._first: Optional[tuple[float, float]] = None
+        self._offset = 0.0
+        self._diverged = False
+        self._jittery = False
+        self._stop_requested = threading.Event()
+
+    def _report(self, record: StatusRecord) -> None:
+        """Deliver a status record to on_status, if set.
+
+        Args:
+            record: The status record.
+        """
+        if self.on_status is not None:
+            self.on_status(record)
+
+    def sample(
+        self, wall_time: Optional[float] = None, lsl_time: Optional[float] = None
+    ) -> None:
+        """Take one sample of both clocks and check the thresholds.
+
+        The LSL clock is read before and after the wall clock and averaged,
+        so the time between the two reads does not bias the offset.
+
+        Args:
+            wall_time: Wall-clock time to use instead of reading the clock.
+            lsl_time: LSL time to use instead of reading the clock.
+        """
+        if wall_time is None or lsl_time is None:
+            before = local_clock()
+            wall_time = time.time()
+            lsl_time = (before + local_clock()) / 2
+        offset = wall_time - lsl_time
+        if self._first is None:
+            self._first = (lsl_time, offset)
+        self._offset = offset
+        self.fit.add(lsl_time - self._first[0], offset - self._first[1])
+        self._check(self.estimate())
+
+    def estimate(self) -> DriftEstimate:
+        """Return the current estimate of the relationship between the clocks.
+
+        Returns:
+            The estimate; all zeros before the first sample.
+        """
+        first_offset = 0.0 if self._first is None else self._first[1]
+        return DriftEstimate(
+            self.fit.samples,
+            self._offset,
+            self._offset - first_offset,
+            self.fit.slope * 1e6,
+            self.fit.residual_std,
+        )
+
+    def _check(self, estimate: DriftEstimate) -> None:
+        """Update the gauges and raise warnings for exceeded thresholds.
+
+        Args:
+            estimate: The estimate after the latest sample.
+        """
+        if self.metrics is not None:
+            self.metrics.clock_divergence.set(estimate.divergence)
+            self.metrics.clock_drift.set(estimate.drift_ppm)
+            self.metrics.clock_jitter.set(estimate.jitter)
+        diverged = abs(estimate.divergence) > self.max_divergence
+        if diverged and not self._diverged:
+            self._report(
+                StatusRecord.now(
+                    StatusLevel.WARNING,
+                    "Warning: wall clock diverged from LSL clock",
+                    f"{estimate.divergence * 1000:+.3f} ms "
+                    f"(drift {estimate.drift_ppm:+.1f} ppm)",
+                )
+            )
+        self._diverged = diverged
+        jittery = (
+            estimate.samples >= MIN_FIT_SAMPLES and estimate.jitter > self.max_jitter
+        )
+        if jittery and not self._jittery:
+            self._report(
+                StatusRecord.now(
+                    StatusLevel.WARNING,
+                    "Warning: wall clock to LSL clock offset is jittery",
+                    f"{estimate.jitter * 1000:.3f} ms",
+                )
+            )
+        self._jittery = jittery
+
+    def run(self) -> None:
+        """Sample the clocks every interval until stop() is called."""
+        self.sample()
+        while not self._stop_requested.wait(self.interval):
+            self.sample()
+
+    def stop(self) -> None:
+        """Ask the monitor to stop; join() the thread to wait for it."""
+        self._stop_requested.set()
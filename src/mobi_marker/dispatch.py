@@ -0,0 +1,117 @@
+"""Marker dispatch queue for the LSL marker application.
+
+This module provides the data structures used to hand markers from the
+producer side (the GUI thread) to the LSL dispatch worker without taking a
+lock on the hot path.
+
+Classes:
+    MarkerRecord: A single marker queued for dispatch.
+    SPSCQueue: Bounded single-producer/single-consumer ring buffer.
+"""
+
+from typing import Generic, NamedTuple, TypeVar
+
+T = TypeVar("T")
+
+
+class MarkerRecord(NamedTuple):
+    """A single marker queued for dispatch.
+
+    Attributes:
+        seq: Monotonic sequence number assigned when the marker was queued.
+        marker: The marker string to push to the LSL outlet.
+        timestamp: LSL timestamp (local_clock()) of the event the marker
+            describes, captured when the user action happened.
+    """
+
+    seq: int
+    marker: str
+    timestamp: float
+
+
+class SPSCQueue(Generic[T]):
+    """Bounded single-producer/single-consumer ring buffer.
+
+    The producer only ever writes ``_tail`` and the consumer only ever writes
+    ``_head``, so neither side needs a lock: each index has a single writer
+    and reading the other side's index is atomic. The buffer is preallocated,
+    so enqueueing never allocates.
+
+    Attributes:
+        capacity: Maximum number of items the queue can hold.
+    """
+
+    __slots__ = ("_buffer", "_head", "_tail", "capacity")
+
+    def __init__(self, capacity: int = 4096) -> None:
+        """Initialize the queue.
+
+        Args:
+            capacity: Maximum number of items the queue can hold.
+
+        Raises:
+            ValueError: If capacity is not a positive integer.
+        """
+        if capacity < 1:
+            raise ValueError(f"Queue capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self._buffer: list[T | None] = [None] * capacity
+        self._head = 0  # next slot to read, written by the consumer only
+        self._tail = 0  # next slot to write, written by the producer only
+
+    def __len__(self) -> int:
+        """Return the number of items currently queued."""
+        return self._tail - self._head
+
+    def put(self, item: T) -> bool:
+        """Enqueue an item (producer side).
+
+        Args:
+            item: The item to enqueue.
+
+        Returns:
+            True if the item was enqueued, False if the queue is full.
+        """
+        tail = self._tail
+        if tail - self._head >= self.capacity:
+            return False
+        self._buffer[tail % self.capacity] = item
+        self._tail = tail + 1
+        return True
+
+    def get(self) -> T | None:
+        """Dequeue a single item (consumer side).
+
+        Returns:
+            The oldest queued item, or None if the queue is empty.
+        """
+        head = self._head
+        if head == self._tail:
+            return None
+        index = head % self.capacity
+        item = self._buffer[index]
+        self._buffer[index] = None
+        self._head = head + 1
+        return item
+
+    def drain(self, max_items: int | None = None) -> list[T]:
+        """Dequeue all currently queued items (consumer side).
+
+        Args:
+            max_items: Maximum number of items to dequeue. Dequeues everything
+                available if None.
+
+        Returns:
+            The dequeued items, oldest first. Empty if the queue is empty.
+        """
+        head = self._head
+        count = self._tail - head
+        if max_items is not None:
+            count = min(count, max_items)
+        items: list[T] = []
+        for position in range(head, head + count):
+            index = position % self.capacity
+            items.append(self._buffer[index])  # type: ignore[arg-type]
+            self._buffer[index] = None
+        self._head = head + count
+        return items
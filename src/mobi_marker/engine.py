@@ -0,0 +1,863 @@
+"""Marker dispatch engine for the LSL marker application.
+
+This module provides the LSL outlet and the marker dispatch loop without any
+dependency on Qt, so it can be driven by the GUI as well as by headless,
+script-driven processes.
+
+Classes:
+    MarkerEngine: LSL stream outlet with a long-lived marker dispatch loop.
+
+Constants:
+    DEFAULT_STREAM_NAME: Name of the LSL marker stream.
+    DEFAULT_SOURCE_ID: Source ID of the LSL marker stream.
+    GAUGE_INTERVAL: Longest time between two samples of the metrics gauges.
+    CONSUMER_POLL_INTERVAL: Shortest time between two consumer checks.
+    RECONNECT_TIMEOUT: Longest time replayed markers wait for consumers to
+        reconnect to a re-created outlet.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Optional, Sequence
+
+from pylsl import StreamInfo, StreamOutlet, local_clock
+
+from mobi_marker.dispatch import MarkerRecord, SPSCQueue
+from mobi_marker.journal import MarkerJournal
+from mobi_marker.metrics import Metrics
+from mobi_marker.status import StatusLevel, StatusRecord
+
+DEFAULT_STREAM_NAME = "MobiMarkerStream"
+DEFAULT_SOURCE_ID = "mobi_marker_gui_v1"
+# Longest the dispatch loop sleeps between two gauge samples when idle
+GAUGE_INTERVAL = 1.0
+# Seconds between two have_consumers() calls while tracking consumers
+CONSUMER_POLL_INTERVAL = 0.1
+# Seconds held markers wait for the consumers of a lost outlet to reconnect
+# to its replacement before they are pushed anyway
+RECONNECT_TIMEOUT = 10.0
+
+
+class MarkerEngine:
+    """LSL stream outlet with a long-lived marker dispatch loop.
+
+    run() creates the LSL stream and then drains bounded single-producer/
+    single-consumer queues of marker records until stop() is called. It
+    blocks, so it is meant to be the body of a dedicated thread; producers
+    only enqueue markers with send_marker(), so pushing samples never blocks
+    them. The engine does not depend on Qt.
+
+    Every producer thread needs its own queue: the default queue serves a
+    single thread, such as the GUI thread, and other producers, such as
+    network listeners, obtain one with add_queue(). Producers submitting
+    many markers at once can instead queue whole chunks with send_chunk()
+    on a queue from add_chunk_queue(); each chunk is pushed with a single
+    push_chunk call, regardless of max_batch_size.
+
+    The engine can track whether the outlet has consumers, such as
+    LabRecorder, by polling have_consumers() from the dispatch loop. With
+    hold_until_consumers, markers dispatched while no consumer is connected
+    are held in a bounded pre-connection buffer, with their timestamps, and
+    pushed as one chunk as soon as a consumer connects, instead of being
+    lost.
+
+    The outlet is supervised: if it cannot be created, or a push fails, it
+    is re-created with exponential backoff. Meanwhile markers are still
+    accepted and held, and once the outlet is back they are replayed with
+    their original timestamps. If the lost outlet had consumers, the replay
+    waits up to RECONNECT_TIMEOUT seconds for them to reconnect, since LSL
+    inlets recover from a lost stream by resolving its source ID again.
+
+    Attributes:
+        outlet: The LSL stream outlet for sending markers.
+        stream_info: Information about the LSL stream.
+        queue: Default queue of marker records waiting to be pushed to the
+            outlet.
+        max_batch_size: Maximum number of markers coalesced into a single
+            push_chunk call. A value of 1 disables batching.
+        max_linger: Seconds the dispatch loop may wait for more markers to
+            fill a partial batch before pushing it. 0 pushes immediately.
+        status_interval: Minimum number of seconds between two deliveries
+            of buffered status records to on_status.
+        on_status: Callback receiving lists of status records raised on the
+            dispatch thread, or None to discard them.
+        journal: Journal every pushed marker is appended to, or None.
+        stream_name: Name of the LSL stream.
+        source_id: Source ID of the LSL stream.
+        metrics: Instrumentation timings are recorded into, or None.
+        hold_until_consumers: Whether markers are held while the outlet has
+            no consumers.
+        hold_capacity: Maximum number of markers held while they cannot be
+            pushed; further markers are dropped.
+        on_consumers: Callback receiving whether the outlet has consumers
+            whenever that changes, or None.
+        have_consumers: Whether the outlet had consumers when last checked.
+            Only tracked with hold_until_consumers or on_consumers.
+        retry_delay: Seconds before the first attempt to re-create a failed
+            outlet, doubled after every failed attempt, or None to give up
+            when the outlet fails.
+        max_retry_delay: Longest time between two attempts to re-create
+            the outlet.
+        recovering: Whether the outlet failed and is being re-created.
+            Markers are accepted and held meanwhile.
+        started: Event set once run() has tried to create the outlet; check
+            outlet to see whether it succeeded.
+        last_push_delay: Seconds between the event timestamp of the oldest
+            marker in the most recent push and the moment it was pushed, or
+            None if no marker has been pushed yet.
+    """
+
+    def __init__(
+        self,
+        queue_capacity: int = 4096,
+        max_batch_size: int = 64,
+        max_linger: float = 0.0,
+        status_interval: float = 1 / 60,
+        journal: Optional[MarkerJournal] = None,
+        on_status: Optional[Callable[[list[StatusRecord]], None]] = None,
+        stream_name: str = DEFAULT_STREAM_NAME,
+        source_id: str = DEFAULT_SOURCE_ID,
+        metrics: Optional[Metrics] = None,
+        hold_until_consumers: bool = False,
+        hold_capacity: int = 4096,
+        on_consumers: Optional[Callable[[bool], None]] = None,
+        retry_delay: Optional[float] = 0.5,
+        max_retry_delay: float = 30.0,
+    ) -> None:
+        """Initialize the marker engine.
+
+        Sets up the engine with null outlet and stream_info attributes and
+        an empty dispatch queue.
+
+        Args:
+            queue_capacity: Maximum number of markers that can be waiting
+                for dispatch at once.
+            max_batch_size: Maximum number of queued markers pushed together
+                as one chunk. Use 1 to push every marker individually.
+            max_linger: Seconds to wait for more markers before pushing a
+                partial batch. Markers keep their event timestamps, so
+                lingering delays delivery but not the recorded time.
+            status_interval: Minimum number of seconds between two
+                deliveries of buffered status records to on_status.
+                Defaults to one display frame at 60 Hz.
+            journal: Optional journal every pushed marker is appended to.
+                The caller owns the journal and closes it.
+            on_status: Optional callback receiving lists of status records
+                raised on the dispatch thread. It is called on the dispatch
+                thread.
+            stream_name: Name of the LSL stream created by run().
+            source_id: Source ID of the LSL stream created by run().
+            metrics: Optional instrumentation to record enqueue, dispatch
+                and push timings into. Without it, nothing is timed.
+            hold_until_consumers: Whether to hold markers while the outlet
+                has no consumers and push them once one connects.
+            hold_capacity: Maximum number of markers held while they
+                cannot be pushed, because the outlet has no consumers or is
+                being re-created.
+            on_consumers: Optional callback receiving whether the outlet has
+                consumers whenever that changes. It is called on the
+                dispatch thread.
+            retry_delay: Seconds before the first attempt to re-create a
+                failed outlet; the delay doubles after every failed attempt.
+                None disables recovery, so a failed outlet stays closed.
+            max_retry_delay: Longest time between two attempts to re-create
+                the outlet.
+
+        Raises:
+            ValueError: If max_batch_size is less than 1, max_linger is
+                negative, hold_capacity is less than 1 or retry_delay is not
+                positive.
+        """
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be positive, got {max_batch_size}")
+        if max_linger < 0:
+            raise ValueError(f"max_linger must not be negative, got {max_linger}")
+        if hold_capacity < 1:
+            raise ValueError(f"hold_capacity must be positive, got {hold_capacity}")
+        if retry_delay is not None and retry_delay <= 0:
+            raise ValueError(f"retry_delay must be positive, got {retry_delay}")
+        self.outlet: Optional[StreamOutlet] = None
+        self.stream_info: Optional[StreamInfo] = None
+        self.queue: SPSCQueue[MarkerRecord] = SPSCQueue(queue_capacity)
+        # Replaced, never mutated, so the dispatch thread can iterate it
+        # while producers register new queues.
+        self._queues: tuple[SPSCQueue[MarkerRecord], ...] = (self.queue,)
+        self._chunk_queues: tuple[SPSCQueue[list[MarkerRecord]], ...] = ()
+        self._queues_lock = threading.Lock()
+        self._next_queue = 0
+        self._sequence = itertools.count(1)
+        self._wakeup = threading.Event()
+        self._stop_requested = threading.Event()
+        self.started = threading.Event()
+        self.max_batch_size = max_batch_size
+        self.max_linger = max_linger
+        self.status_interval = status_interval
+        self.journal = journal
+        self.on_status = on_status
+        self.stream_name = stream_name
+        self.source_id = source_id
+        self.metrics = metrics
+        if metrics is not None:
+            # Swap in the timed variant only when instrumenting, so the
+            # uninstrumented hot path does not even test for metrics.
+            self.send_marker = self._timed_send_marker  # type: ignore[method-assign]
+        self.last_push_delay: Optional[float] = None
+        self.hold_until_consumers = hold_until_consumers
+        self.hold_capacity = hold_capacity
+        self.on_consumers = on_consumers
+        self.have_consumers = False
+        self._track_consumers = hold_until_consumers or on_consumers is not None
+        self._next_consumer_poll = 0.0
+        # Markers held while they cannot be pushed, oldest first
+        self._held: list[MarkerRecord] = []
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.recovering = False
+        self._retry_wait = retry_delay or 0.0
+        self._next_retry = 0.0
+        # Whether the consumers of a lost outlet are expected to reconnect
+        self._expect_reconnect = False
+        self._reconnect_deadline: Optional[float] = None
+        self._status_buffer: list[StatusRecord] = []
+        self._last_status_flush = float("-inf")
+
+    def run(self) -> None:
+        """Create the LSL stream and dispatch queued markers until stopped.
+
+        This method blocks and is meant to be run on a dedicated thread. It
+        creates the LSL stream info and outlet, reports a status update, and
+        then drains the dispatch queue until stop() is called, re-creating
+        the outlet whenever it fails. Markers still queued when the engine
+        is stopped are pushed before it returns; if the outlet is down at
+        that point, they are only journaled.
+        """
+        if not self._open_outlet() and not self.recovering:
+            self._flush_status(force=True)
+            self.started.set()
+            return
+
+        if self.hold_until_consumers:
+            self._report(
+                StatusRecord.now(
+                    StatusLevel.INFO, "Holding markers until a consumer connects"
+                )
+            )
+        self._flush_status(force=True)
+        self.started.set()
+        while not self._stop_requested.is_set():
+            self._wakeup.clear()
+            # Re-check after clearing so a marker enqueued in between is not
+            # left waiting for the next wakeup.
+            if not self._pending():
+                self._wakeup.wait(self._status_flush_timeout())
+            if self.outlet is None and time.monotonic() >= self._next_retry:
+                self._open_outlet()
+            if self._track_consumers or self._reconnect_deadline is not None:
+                self._poll_consumers()
+            if self.metrics is not None:
+                self._sample_gauges(self.metrics)
+            self._dispatch_pending()
+            self._flush_status()
+        self._dispatch_pending()
+        held = self._held
+        self._held = []
+        if held and self.outlet is None:
+            self._report(
+                StatusRecord.now(
+                    StatusLevel.ERROR,
+                    "Error: LSL stream down, markers not sent",
+                    tuple(record.marker for record in held),
+                )
+            )
+            self._journal(held)
+        elif held:
+            # Push anyway so the held markers are journaled
+            self._report(
+                StatusRecord.now(
+                    StatusLevel.WARNING,
+                    "Warning: no consumer connected, markers not recorded",
+                    tuple(record.marker for record in held),
+                )
+            )
+            self._push(held)
+        self._flush_status(force=True)
+
+    def _open_outlet(self) -> bool:
+        """Create the LSL stream info and outlet.
+
+        If creation fails and recovery is enabled, the next attempt is
+        scheduled with exponential backoff. After a recovery, the held
+        markers wait for the consumers of the lost outlet to reconnect.
+
+        Returns:
+            Whether the outlet was created.
+        """
+        try:
+            stream_info = StreamInfo(
+                name=self.stream_name,
+                type="Markers",
+                channel_count=1,
+                nominal_srate=0,  # irregular sampling rate
+                channel_format="string",
+                source_id=self.source_id,
+            )
+            outlet = StreamOutlet(stream_info)
+        except Exception as e:
+            if self.retry_delay is None:
+                detail: object = e
+            else:
+                detail = f"{e}; retrying in {self._schedule_retry():.1f} s"
+                self.recovering = True
+            self._report(
+                StatusRecord.now(StatusLevel.ERROR, "Error starting LSL stream", detail)
+            )
+            return False
+
+        self.stream_info = stream_info
+        self.outlet = outlet
+        self._retry_wait = self.retry_delay or 0.0
+        self._next_consumer_poll = 0.0
+        if not self.recovering:
+            self._report(
+                StatusRecord.now(StatusLevel.INFO, "LSL stream started successfully")
+            )
+            return True
+        self.recovering = False
+        if self._expect_reconnect:
+            self._reconnect_deadline = time.monotonic() + RECONNECT_TIMEOUT
+        self._report(
+            StatusRecord.now(
+                StatusLevel.INFO,
+                "LSL stream recovered, replaying held markers",
+                len(self._held),
+            )
+        )
+        return True
+
+    def _schedule_retry(self) -> float:
+        """Schedule the next attempt to create the outlet.
+
+        Returns:
+            Seconds until the attempt. Each call doubles the delay of the
+            next one, up to max_retry_delay.
+        """
+        delay = self._retry_wait
+        self._next_retry = time.monotonic() + delay
+        self._retry_wait = min(delay * 2, self.max_retry_delay)
+        return delay
+
+    def _lose_outlet(self) -> None:
+        """Close a failed outlet and schedule its re-creation."""
+        outlet = self.outlet
+        self.outlet = None
+        self.recovering = True
+        self._reconnect_deadline = None
+        try:
+            self._expect_reconnect = outlet is not None and bool(
+                outlet.have_consumers()
+            )
+        except Exception:
+            self._expect_reconnect = self.have_consumers
+        if self.have_consumers:
+            self.have_consumers = False
+            if self.on_consumers is not None:
+                self.on_consumers(False)
+        self._report(
+            StatusRecord.now(
+                StatusLevel.WARNING,
+                "Warning: LSL stream lost, holding markers",
+                f"retrying in {self._schedule_retry():.1f} s",
+            )
+        )
+
+    def add_queue(self, capacity: int = 4096) -> SPSCQueue[MarkerRecord]:
+        """Register a dispatch queue for an additional producer thread.
+
+        Args:
+            capacity: Maximum number of markers from this producer that can
+                be waiting for dispatch at once.
+
+        Returns:
+            The new queue, to be passed to send_marker() by that producer
+            only.
+
+        Raises:
+            ValueError: If capacity is not a positive integer.
+        """
+        queue: SPSCQueue[MarkerRecord] = SPSCQueue(capacity)
+        with self._queues_lock:
+            self._queues = (*self._queues, queue)
+        return queue
+
+    def add_chunk_queue(self, capacity: int = 64) -> SPSCQueue[list[MarkerRecord]]:
+        """Register a chunk queue for an additional producer thread.
+
+        Args:
+            capacity: Maximum number of chunks from this producer that can
+                be waiting for dispatch at once.
+
+        Returns:
+            The new queue, to be passed to send_chunk() by that producer
+            only.
+
+        Raises:
+            ValueError: If capacity is not a positive integer.
+        """
+        queue: SPSCQueue[list[MarkerRecord]] = SPSCQueue(capacity)
+        with self._queues_lock:
+            self._chunk_queues = (*self._chunk_queues, queue)
+        return queue
+
+    def _pending(self) -> bool:
+        """Return whether any dispatch queue holds markers or chunks."""
+        return any(len(queue) for queue in self._queues) or any(
+            len(queue) for queue in self._chunk_queues
+        )
+
+    def _drain(self, max_items: int) -> list[MarkerRecord]:
+        """Dequeue up to max_items markers across all dispatch queues.
+
+        Queues are visited round-robin, starting one further each call, so a
+        busy producer cannot starve the others. Markers from different
+        queues are merged by timestamp, always taking the earlier of the
+        queues' next markers, so each queue's own order is kept even if its
+        timestamps are not.
+
+        Args:
+            max_items: Maximum number of markers to dequeue.
+
+        Returns:
+            The dequeued markers. Empty if all queues are empty.
+        """
+        queues = self._queues
+        if len(queues) == 1:
+            return queues[0].drain(max_items)
+        start = self._next_queue % len(queues)
+        self._next_queue = start + 1
+        drained: list[list[MarkerRecord]] = []
+        remaining = max_items
+        for offset in range(len(queues)):
+            items = queues[(start + offset) % len(queues)].drain(remaining)
+            if items:
+                drained.append(items)
+                remaining -= len(items)
+                if remaining <= 0:
+                    break
+        if len(drained) <= 1:
+            return drained[0] if drained else []
+        return list(heapq.merge(*drained, key=lambda record: record.timestamp))
+
+    def _report(self, record: StatusRecord) -> None:
+        """Buffer a status record raised on the dispatch thread.
+
+        Args:
+            record: The status record to buffer.
+        """
+        self._status_buffer.append(record)
+
+    def _status_flush_timeout(self) -> Optional[float]:
+        """Return how long the dispatch loop may sleep before flushing status.
+
+        Returns:
+            Seconds until buffered status records are due, or None if there
+            is nothing buffered. With metrics, at most GAUGE_INTERVAL, so
+            the gauges are sampled even while no markers arrive, while
+            tracking consumers at most CONSUMER_POLL_INTERVAL, and while
+            the outlet is down at most the time until the next attempt to
+            re-create it.
+        """
+        idle = None if self.metrics is None else GAUGE_INTERVAL
+        if self._track_consumers or self._reconnect_deadline is not None:
+            idle = CONSUMER_POLL_INTERVAL
+        if self.outlet is None and self.recovering:
+            retry = max(0.0, self._next_retry - time.monotonic())
+            idle = retry if idle is None else min(idle, retry)
+        if not self._status_buffer:
+            return idle
+        due = self._last_status_flush + self.status_interval
+        timeout = max(0.0, due - time.monotonic())
+        return timeout if idle is None else min(timeout, idle)
+
+    def _flush_status(self, force: bool = False) -> None:
+        """Deliver buffered status records to on_status as one batch.
+
+        Args:
+            force: Flush even if status_interval has not yet elapsed since
+                the previous flush.
+        """
+        if not self._status_buffer:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_status_flush < self.status_interval:
+            return
+        records = self._status_buffer
+        self._status_buffer = []
+        self._last_status_flush = now
+        if self.on_status is not None:
+            self.on_status(records)
+
+    def _poll_consumers(self) -> None:
+        """Check whether the outlet has consumers, at most every 100 ms.
+
+        Reports and forwards changes to on_consumers. When a consumer
+        connects, the held markers are pushed as one chunk.
+        """
+        now = time.monotonic()
+        if now < self._next_consumer_poll or self.outlet is None:
+            return
+        self._next_consumer_poll = now + CONSUMER_POLL_INTERVAL
+        try:
+            have_consumers = bool(self.outlet.have_consumers())
+        except Exception:
+            have_consumers = False
+        if have_consumers == self.have_consumers:
+            return
+        self.have_consumers = have_consumers
+        if have_consumers:
+            self._reconnect_deadline = None
+            self._report(StatusRecord.now(StatusLevel.INFO, "Consumer connected"))
+        else:
+            self._report(
+                StatusRecord.now(StatusLevel.WARNING, "Warning: no consumers connected")
+            )
+        if self.on_consumers is not None:
+            self.on_consumers(have_consumers)
+        if have_consumers and self._held:
+            held = self._held
+            self._held = []
+            self._push(held)
+
+    def _hold(self, batch: list[MarkerRecord]) -> None:
+        """Hold markers until they can be pushed.
+
+        Markers beyond hold_capacity are dropped and reported.
+
+        Args:
+            batch: The markers to hold, oldest first.
+        """
+        space = self.hold_capacity - len(self._held)
+        self._held.extend(batch[:space])
+        dropped = batch[max(space, 0) :]
+        if dropped:
+            if self.metrics is not None:
+                self.metrics.markers_rejected.inc(len(dropped))
+            self._report(
+                StatusRecord.now(
+                    StatusLevel.ERROR,
+                    "Error: held marker buffer full, dropped markers",
+                    tuple(record.marker for record in dropped),
+                )
+            )
+
+    def _sample_gauges(self, metrics: Metrics) -> None:
+        """Sample the queue depth, consumer and journal gauges.
+
+        Called by the dispatch loop whenever it wakes up, before draining
+        the queues, so scrapes read the values instead of recomputing them.
+
+        Args:
+            metrics: The metrics holding the gauges.
+        """
+        metrics.queue_depth.set(
+            sum(len(queue) for queue in self._queues)
+            + sum(len(queue) for queue in self._chunk_queues)
+        )
+        if self.outlet is not None:
+            try:
+                metrics.have_consumers.set(float(self.outlet.have_consumers()))
+            except Exception:
+                metrics.have_consumers.set(0.0)
+        journal = self.journal
+        if journal is not None:
+            pending = journal.records_written != journal.records_synced
+            metrics.journal_fsync_lag.set(
+                time.monotonic() - journal.last_sync if pending else 0.0
+            )
+
+    def _dispatch_pending(self) -> None:
+        """Push every queued marker and chunk to the outlet in batches.
+
+        Held markers that can be pushed again are pushed first, as one
+        chunk. While markers cannot be pushed, they are held instead.
+        """
+        if self._held and not self._holding():
+            held = self._held
+            self._held = []
+            self._push(held)
+        for queue in self._chunk_queues:
+            for chunk in queue.drain():
+                if self._holding():
+                    self._hold(chunk)
+                else:
+                    self._push(chunk)
+        while True:
+            batch = self._drain(self.max_batch_size)
+            if not batch:
+                return
+            if self.max_linger > 0 and len(batch) < self.max_batch_size:
+                self._linger(batch)
+            if self._holding():
+                self._hold(batch)
+            else:
+                self._push(batch)
+
+    def _holding(self) -> bool:
+        """Return whether markers must be held instead of pushed.
+
+        They are held while the outlet is down, while it has no consumers
+        if hold_until_consumers is set, and after a recovery until the
+        consumers of the lost outlet reconnect or RECONNECT_TIMEOUT has
+        passed.
+        """
+        if self.outlet is None:
+            return True
+        if self.have_consumers:
+            return False
+        if self.hold_until_consumers:
+            return True
+        deadline = self._reconnect_deadline
+        if deadline is None:
+            return False
+        if time.monotonic() < deadline:
+            return True
+        self._reconnect_deadline = None
+        return False
+
+    def _linger(self, batch: list[MarkerRecord]) -> None:
+        """Wait up to max_linger seconds for more markers to fill a batch.
+
+        Args:
+            batch: The partial batch, extended in place with newly queued
+                markers until it is full or the linger time has elapsed.
+        """
+        deadline = time.monotonic() + self.max_linger
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or self._stop_requested.is_set():
+                return
+            self._wakeup.clear()
+            if not any(len(queue) for queue in self._queues):
+                self._wakeup.wait(remaining)
+            batch.extend(self._drain(self.max_batch_size - len(batch)))
+
+    def _push(self, batch: list[MarkerRecord]) -> None:
+        """Push a batch of marker records to the outlet.
+
+        A single marker is pushed with push_sample; larger batches are
+        pushed with one push_chunk call carrying per-sample timestamps.
+        Pushed markers are then appended to the journal, if any. If the push
+        fails and recovery is enabled, the outlet is closed for re-creation
+        and the batch is held for replay.
+
+        Args:
+            batch: The marker records to push, oldest first.
+
+        Note:
+            The status record is buffered and delivered to on_status with
+            the next flush.
+        """
+        if self.outlet is None:
+            return
+        metrics = self.metrics
+        try:
+            start = time.perf_counter_ns() if metrics is not None else 0
+            if len(batch) == 1:
+                self.outlet.push_sample([batch[0].marker], batch[0].timestamp)
+            else:
+                self.outlet.push_chunk(
+                    [[record.marker] for record in batch],
+                    [record.timestamp for record in batch],
+                )
+            if metrics is not None:
+                metrics.push.record(time.perf_counter_ns() - start)
+        except Exception as e:
+            if metrics is not None:
+                metrics.send_errors.inc()
+            self._report(StatusRecord.now(StatusLevel.ERROR, "Error sending marker", e))
+            if self.retry_delay is not None:
+                self._lose_outlet()
+                self._hold(batch)
+            return
+
+        pushed_at = local_clock()
+        self.last_push_delay = pushed_at - batch[0].timestamp
+        if metrics is not None:
+            # Instrumentation must never stop dispatch
+            try:
+                metrics.pushes.inc()
+                metrics.markers_sent.inc(len(batch))
+                for record in batch:
+                    metrics.dispatch.record_seconds(pushed_at - record.timestamp)
+            except Exception as e:
+                self._report(
+                    StatusRecord.now(StatusLevel.ERROR, "Error recording metrics", e)
+                )
+        if len(batch) == 1:
+            self._report(
+                StatusRecord.now(
+                    StatusLevel.INFO,
+                    "Sent marker",
+                    batch[0].marker,
+                    batch[0].timestamp,
+                    self.last_push_delay,
+                )
+            )
+        else:
+            self._report(
+                StatusRecord.now(
+                    StatusLevel.INFO,
+                    "Sent markers",
+                    tuple(record.marker for record in batch),
+                    batch[0].timestamp,
+                    self.last_push_delay,
+                )
+            )
+
+        self._journal(batch)
+
+    def _journal(self, batch: list[MarkerRecord]) -> None:
+        """Append markers to the journal, if any.
+
+        Args:
+            batch: The marker records to append, oldest first.
+        """
+        if self.journal is not None:
+            try:
+                self.journal.write(batch, time.time())
+            except Exception as e:
+                self._report(
+                    StatusRecord.now(
+                        StatusLevel.ERROR, "Error writing marker journal", e
+                    )
+                )
+
+    def send_marker(
+        self,
+        marker: str,
+        timestamp: Optional[float] = None,
+        queue: Optional[SPSCQueue[MarkerRecord]] = None,
+    ) -> Optional[StatusRecord]:
+        """Queue a marker for dispatch through the LSL stream.
+
+        This only enqueues the marker and wakes the dispatch loop, so it
+        returns immediately; the sample is pushed from the dispatch thread
+        with the given timestamp, so queueing delays do not shift it.
+
+        Args:
+            marker: The marker string to send through the LSL stream.
+            timestamp: LSL timestamp of the event the marker describes, as
+                returned by local_clock(). Defaults to the current time.
+            queue: The calling producer's queue from add_queue(). Defaults
+                to the engine's default queue.
+
+        Returns:
+            None if the marker was queued, otherwise a status record
+            explaining why it was rejected: the stream is not active or the
+            dispatch queue is full. Markers are accepted while the outlet is
+            being re-created.
+        """
+        if self.outlet is None and not self.recovering:
+            return StatusRecord.now(StatusLevel.ERROR, "LSL stream not active")
+
+        if timestamp is None:
+            timestamp = local_clock()
+        record = MarkerRecord(next(self._sequence), marker, timestamp)
+        if queue is None:
+            queue = self.queue
+        if not queue.put(record):
+            return StatusRecord.now(
+                StatusLevel.ERROR, "Error: marker queue full, dropped marker", marker
+            )
+        self._wakeup.set()
+        return None
+
+    def send_chunk(
+        self,
+        markers: Sequence[str],
+        timestamps: Sequence[Optional[float]],
+        queue: SPSCQueue[list[MarkerRecord]],
+    ) -> list[MarkerRecord] | StatusRecord:
+        """Queue several markers to be pushed together as one chunk.
+
+        Args:
+            markers: The marker strings, oldest first.
+            timestamps: LSL timestamp of each marker, as returned by
+                local_clock(). A None entry is replaced by the current time.
+            queue: The calling producer's queue from add_chunk_queue().
+
+        Returns:
+            The queued marker records, with their assigned sequence numbers
+            and timestamps, or a status record explaining why the chunk was
+            rejected: the stream is not active or the chunk queue is full.
+
+        Raises:
+            ValueError: If markers and timestamps differ in length.
+        """
+        if len(markers) != len(timestamps):
+            raise ValueError(
+                f"Got {len(markers)} markers but {len(timestamps)} timestamps"
+            )
+        if self.outlet is None and not self.recovering:
+            return StatusRecord.now(StatusLevel.ERROR, "LSL stream not active")
+        if not markers:
+            return []
+        if len(queue) >= queue.capacity:
+            if self.metrics is not None:
+                self.metrics.markers_rejected.inc(len(markers))
+            return StatusRecord.now(
+                StatusLevel.ERROR,
+                "Error: marker queue full, dropped markers",
+                tuple(markers),
+            )
+
+        now = local_clock()
+        chunk = [
+            MarkerRecord(
+                next(self._sequence), marker, now if timestamp is None else timestamp
+            )
+            for marker, timestamp in zip(markers, timestamps)
+        ]
+        queue.put(chunk)
+        self._wakeup.set()
+        if self.metrics is not None:
+            self.metrics.markers_enqueued.inc(len(chunk))
+        return chunk
+
+    def _timed_send_marker(
+        self,
+        marker: str,
+        timestamp: Optional[float] = None,
+        queue: Optional[SPSCQueue[MarkerRecord]] = None,
+    ) -> Optional[StatusRecord]:
+        """Queue a marker like send_marker(), recording enqueue metrics.
+
+        Replaces send_marker() on engines created with metrics.
+
+        Args:
+            marker: The marker string to send through the LSL stream.
+            timestamp: LSL timestamp of the event the marker describes.
+            queue: The calling producer's queue from add_queue().
+
+        Returns:
+            None if the marker was queued, otherwise the rejection record.
+        """
+        metrics = self.metrics
+        assert metrics is not None
+        start = time.perf_counter_ns()
+        rejection = MarkerEngine.send_marker(self, marker, timestamp, queue)
+        metrics.enqueue.record(time.perf_counter_ns() - start)
+        if rejection is None:
+            metrics.markers_enqueued.inc()
+        else:
+            metrics.markers_rejected.inc()
+        return rejection
+
+    def stop(self) -> None:
+        """Ask the dispatch loop to flush queued markers and exit.
+
+        run() returns once the remaining markers have been pushed.
+        """
+        self._stop_requested.set()
+        self._wakeup.set()
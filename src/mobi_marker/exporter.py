@@ -0,0 +1,227 @@
+"""Prometheus metrics endpoint for marker stations.
+
+This module serves the instrumentation of mobi_marker.metrics in the
+Prometheus text exposition format (version 0.0.4) at ``GET /metrics``, so
+many marker stations can be scraped by one Prometheus server. Every value
+comes from counters, histograms and gauges maintained by the dispatch loop;
+a scrape only snapshots and formats them.
+
+Latency histograms are exported with the coarse ``le`` buckets of
+LATENCY_BUCKETS, aggregated from the fine log-linear buckets they are
+recorded in. A bucket boundary is therefore accurate to the resolution of
+the recorded histogram, 1/16 of its value.
+
+Scrapes are served one at a time over HTTP/1.0, closing the connection
+after every response: scrapers keep their connections alive, and an idle
+one would otherwise hold the single serving thread. A client that stalls
+mid-request is disconnected after REQUEST_TIMEOUT.
+
+Classes:
+    MetricsExporter: Thread serving the Prometheus metrics endpoint.
+
+Functions:
+    render_metrics: Format a metrics snapshot in the text exposition format.
+
+Constants:
+    DEFAULT_METRICS_PORT: TCP port the metrics endpoint binds to by default.
+    LATENCY_BUCKETS: Upper bounds in seconds of the exported histogram
+        buckets.
+    METRIC_PREFIX: Prefix of every exported metric name.
+    CONTENT_TYPE: Content type of the exposition format.
+    REQUEST_TIMEOUT: Seconds a client may take to send its request.
+"""
+
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from itertools import accumulate
+from typing import Callable, Optional
+
+from mobi_marker.metrics import (
+    HistogramSnapshot,
+    Metrics,
+    MetricsSnapshot,
+    bucket_index,
+)
+from mobi_marker.status import StatusLevel, StatusRecord
+
+DEFAULT_METRICS_PORT = 15004
+LATENCY_BUCKETS = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+)
+METRIC_PREFIX = "mobi_marker_"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+REQUEST_TIMEOUT = 5.0
+
+# Index of the last fine bucket counted towards each exported bucket
+_BUCKET_CUTOFFS = tuple(bucket_index(round(le * 1e9)) for le in LATENCY_BUCKETS)
+
+
+def _render_histogram(name: str, description: str, histogram: HistogramSnapshot) -> str:
+    """Format one histogram with cumulative ``le`` buckets.
+
+    Args:
+        name: Full name of the exported metric.
+        description: Help text of the metric.
+        histogram: The histogram to export, in nanoseconds.
+
+    Returns:
+        The histogram's lines in the text exposition format.
+    """
+    cumulative = list(accumulate(histogram.counts))
+    lines = [f"# HELP {name} {description}", f"# TYPE {name} histogram"]
+    for le, cutoff in zip(LATENCY_BUCKETS, _BUCKET_CUTOFFS):
+        lines.append(f'{name}_bucket{{le="{le}"}} {cumulative[cutoff]}')
+    lines.append(f'{name}_bucket{{le="+Inf"}} {histogram.samples}')
+    lines.append(f"{name}_sum {histogram.total / 1e9}")
+    lines.append(f"{name}_count {histogram.samples}")
+    return "\n".join(lines)
+
+
+def render_metrics(metrics: Metrics, snapshot: MetricsSnapshot) -> str:
+    """Format a metrics snapshot in the text exposition format.
+
+    Args:
+        metrics: The metrics the snapshot was taken from, providing the help
+            texts.
+        snapshot: The values to export.
+
+    Returns:
+        The exposition text, ending with a newline.
+    """
+    blocks = []
+    for counter in metrics.counters:
+        name = f"{METRIC_PREFIX}{counter.name}_total"
+        blocks.append(
+            f"# HELP {name} {counter.description}\n"
+            f"# TYPE {name} counter\n"
+            f"{name} {snapshot.counters[counter.name]}"
+        )
+    for gauge in metrics.gauges:
+        name = f"{METRIC_PREFIX}{gauge.name}"
+        blocks.append(
+            f"# HELP {name} {gauge.description}\n"
+            f"# TYPE {name} gauge\n"
+            f"{name} {snapshot.gauges[gauge.name]}"
+        )
+    for histogram in metrics.histograms:
+        blocks.append(
+            _render_histogram(
+                f"{METRIC_PREFIX}{histogram.name}_seconds",
+                histogram.description,
+                snapshot.histograms[histogram.name],
+            )
+        )
+    return "\n".join(blocks) + "\n"
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Request handler for the metrics endpoint."""
+
+    protocol_version = "HTTP/1.0"
+    timeout = REQUEST_TIMEOUT
+    server: "_MetricsHTTPServer"
+
+    def log_message(self, format: str, *args: object) -> None:
+        """Discard the per-request access log."""
+
+    def do_GET(self) -> None:
+        """Serve GET /metrics."""
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        metrics = self.server.exporter.metrics
+        data = render_metrics(metrics, metrics.snapshot()).encode()
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class _MetricsHTTPServer(HTTPServer):
+    """HTTP server holding a reference to its MetricsExporter.
+
+    Attributes:
+        exporter: The thread owning this server.
+    """
+
+    exporter: "MetricsExporter"
+
+
+class MetricsExporter(threading.Thread):
+    """Thread serving the Prometheus metrics endpoint.
+
+    Attributes:
+        metrics: The metrics being exported.
+        address: The (host, port) the endpoint is bound to. The port is the
+            one actually assigned if port 0 was requested.
+        on_status: Callback receiving status records raised on the exporter
+            thread, or None to discard them.
+    """
+
+    def __init__(
+        self,
+        metrics: Metrics,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_METRICS_PORT,
+        on_status: Optional[Callable[[StatusRecord], None]] = None,
+    ) -> None:
+        """Bind the metrics endpoint.
+
+        Args:
+            metrics: The metrics to export, typically those of the engine.
+            host: Interface to bind to. Defaults to localhost only.
+            port: TCP port to bind to. 0 picks a free port.
+            on_status: Optional callback receiving status records raised on
+                the exporter thread. It is called on the exporter thread.
+
+        Raises:
+            OSError: If the endpoint cannot be bound.
+        """
+        super().__init__(name="MetricsExporter", daemon=True)
+        self.metrics = metrics
+        self.on_status = on_status
+        self._httpd = _MetricsHTTPServer((host, port), _MetricsRequestHandler)
+        self._httpd.exporter = self
+        self.address: tuple[str, int] = self._httpd.socket.getsockname()[:2]
+
+    def run(self) -> None:
+        """Serve scrapes until stop() is called."""
+        if self.on_status is not None:
+            self.on_status(
+                StatusRecord.now(
+                    StatusLevel.INFO,
+                    "Serving metrics on",
+                    f"http://{self.address[0]}:{self.address[1]}/metrics",
+                )
+            )
+        try:
+            self._httpd.serve_forever(poll_interval=0.25)
+        finally:
+            self._httpd.server_close()
+
+    def stop(self) -> None:
+        """Ask the endpoint to exit after the scrape in progress.
+
+        If the endpoint was never started, its socket is closed right away.
+        """
+        if self.ident is None:
+            self._httpd.server_close()
+        else:
+            self._httpd.shutdown()
@@ -5,22 +5,27 @@ Layer) markers. It includes a threaded LSL stream manager and a PyQt6-based
 user interface.
 
 Classes:
-    LSLStreamThread: Thread for managing the LSL stream outlet.
+    LSLStreamThread: Thread for managing the LSL stream outlet and dispatching
+        queued markers.
     MobiMarkerGUI: Main GUI window for the LSL marker application.
 
 Constants:
-    AVAILABLE_MODALITIES: List of modalities available in the END dropdown.
+    OTHER_MODALITY: Modality of the END dropdown taken from a text field.
+    STATUS_LOG_CAPACITY: Maximum number of messages kept in the status log.
+    METRICS_REFRESH_MS: Interval between two instrumentation readout updates.
 
 Functions:
+    build_stylesheet: Build the style sheet of the main window.
     main: Main entry point for the GUI application.
 """
 
+import functools
+import os
 import sys
-from datetime import datetime
-from typing import Optional
+from typing import Optional, Sequence
 
 from pylsl import StreamInfo, StreamOutlet, local_clock
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
 from PyQt6.QtGui import QCloseEvent
 from PyQt6.QtWidgets import (
     QApplication,
@@ -29,116 +34,260 @@ from PyQt6.QtWidgets import (
     QHBoxLayout,
     QLabel,
     QLineEdit,
+    QListView,
     QMainWindow,
     QPushButton,
-    QTextEdit,
     QVBoxLayout,
     QWidget,
 )
 
-# Available modalities for the END [modality] dropdown
-# Edit this list to change what appears in the dropdown menu
-AVAILABLE_MODALITIES = [
-    "EEG",
-    "fNIRS",
-    "EMG",
-    "EOG",
-    "ECG",
-    "Motion Capture",
-    "Eye Tracking",
-    "Audio",
-    "Video",
-    "Other",  # Keep "Other" as the last option
-]
+from mobi_marker.clock import ClockMonitor
+from mobi_marker.dispatch import MarkerRecord, SPSCQueue
+from mobi_marker.engine import DEFAULT_STREAM_NAME, MarkerEngine
+from mobi_marker.exporter import MetricsExporter
+from mobi_marker.hotkeys import HotkeyDispatcher, build_hotkey_table
+from mobi_marker.http_api import HTTPMarkerServer
+from mobi_marker.journal import MarkerJournal, default_journal_path
+from mobi_marker.listeners import DEFAULT_SERVER_HOST, start_listeners
+from mobi_marker.metrics import Metrics
+from mobi_marker.profile import DEFAULT_PROFILE, MarkerProfile, QuickMarker
+from mobi_marker.recorder import XDFRecorder
+from mobi_marker.scheduler import Protocol, ProtocolScheduler
+from mobi_marker.server import MarkerServer
+from mobi_marker.status import StatusLevel, StatusRecord
+from mobi_marker.status_log import StatusLogModel
+from mobi_marker.udp import UDPMarkerListener
+
+# Modality offered last in the END dropdown, with a text field
+OTHER_MODALITY = "Other"
+
+# Maximum number of messages kept in the status log; older ones are discarded
+STATUS_LOG_CAPACITY = 10000
+
+# Milliseconds between two updates of the instrumentation readout
+METRICS_REFRESH_MS = 500
+
+
+@functools.cache
+def build_stylesheet(markers: tuple[QuickMarker, ...]) -> str:
+    """Build the style sheet of the main window.
+
+    Widgets are matched by object name or by the dynamic properties set in
+    MobiMarkerGUI.init_ui(), so the whole window is styled by one style sheet
+    that Qt parses once, instead of one per widget. Style sheets are cached
+    by quick marker set.
+
+    Args:
+        markers: The quick marker buttons of the window.
+
+    Returns:
+        The style sheet, including one color rule per quick marker.
+    """
+    rules = [
+        """
+        QLabel#title {
+            font-size: 24px; font-weight: bold; margin: 20px; color: #2c3e50;
+        }
+        QLabel[section="true"] { font-weight: bold; margin-top: 20px; }
+        QLabel#modalityLabel { margin-top: 15px; }
+        QLineEdit#markerInput { font-size: 14px; padding: 5px; }
+        QPushButton[role="quickMarker"] {
+            color: white;
+            font-weight: bold;
+            padding: 8px 16px;
+            border: none;
+            border-radius: 4px;
+            min-height: 30px;
+        }
+        QWidget#modalityPanel {
+            background-color: #f8f9fa;
+            border: 1px solid #dee2e6;
+            border-radius: 8px;
+            padding: 12px;
+        }
+        QPushButton#endModalityButton {
+            background-color: #6c757d;
+            color: white;
+            font-weight: bold;
+            padding: 10px 20px;
+            border: none;
+            border-radius: 6px;
+            min-width: 60px;
+            font-size: 14px;
+        }
+        QPushButton#endModalityButton:hover { background-color: #5a6268; }
+        QPushButton#endModalityButton:pressed { background-color: #545b62; }
+        QComboBox#modalityCombo {
+            padding: 8px 12px;
+            border: 2px solid #ced4da;
+            border-radius: 6px;
+            background-color: white;
+            font-size: 14px;
+            min-width: 140px;
+        }
+        QComboBox#modalityCombo:hover { border-color: #80bdff; }
+        QComboBox#modalityCombo::drop-down { border: none; width: 30px; }
+        QComboBox#modalityCombo::down-arrow { width: 12px; height: 12px; }
+        QLineEdit#customModalityInput {
+            padding: 8px 12px;
+            border: 2px solid #ced4da;
+            border-radius: 6px;
+            font-size: 14px;
+            min-width: 150px;
+        }
+        QLineEdit#customModalityInput:focus { border-color: #80bdff; }
+        QLabel#consumerIndicator { font-weight: bold; padding: 0 8px; }
+        QLabel#consumerIndicator[connected="true"] { color: #27ae60; }
+        QLabel#consumerIndicator[connected="false"] { color: #c0392b; }
+        QPushButton#protocolButton {
+            color: white;
+            font-weight: bold;
+            padding: 8px 16px;
+            border: none;
+            border-radius: 6px;
+            min-height: 30px;
+        }
+        QPushButton#protocolButton[running="false"] { background-color: #16a085; }
+        QPushButton#protocolButton[running="true"] { background-color: #c0392b; }
+        """
+    ]
+    for marker in markers:
+        selector = f'QPushButton[marker="{_quote(marker.text)}"]'
+        # Add transparency on hover, more when pressed
+        rules.append(
+            f"{selector} {{ background-color: {marker.color}; }}\n"
+            f"{selector}:hover {{ background-color: {marker.color}CC; }}\n"
+            f"{selector}:pressed {{ background-color: {marker.color}99; }}\n"
+        )
+    return "".join(rules)
+
+
+def _quote(text: str) -> str:
+    """Escape text for use inside a double-quoted style sheet string.
+
+    Args:
+        text: The text to escape.
+
+    Returns:
+        The text with backslashes and double quotes escaped.
+    """
+    return text.replace("\\", "\\\\").replace('"', '\\"')
 
 
 class LSLStreamThread(QThread):
-    """Thread for managing the LSL stream outlet.
+    """Thread for managing the LSL stream outlet and dispatching markers.
 
-    This class handles the creation and management of an LSL stream in a
-    separate thread to keep the GUI responsive.
+    This class runs a MarkerEngine on a dedicated Qt thread: it creates the
+    LSL stream and then runs a long-lived dispatch loop that drains a bounded
+    single-producer/single-consumer queue of marker records. The GUI thread
+    only enqueues markers, so pushing samples never blocks repaint or input
+    handling.
 
     Attributes:
-        status_update: Signal emitted when status updates occur.
-        outlet: The LSL stream outlet for sending markers.
-        stream_info: Information about the LSL stream.
+        status_update: Signal emitted for status updates raised outside the
+            dispatch loop, such as a rejected send_marker() call or a UDP
+            listener message.
+        status_batch: Signal emitted by the dispatch loop with a list of
+            buffered status records, at most once per status_interval.
+        consumers_changed: Signal emitted by the dispatch loop with whether
+            the outlet has consumers, whenever that changes.
+        engine: The engine owning the outlet and the dispatch queue.
     """
 
-    status_update = pyqtSignal(str)
-
-    def __init__(self) -> None:
+    status_update = pyqtSignal(object)
+    status_batch = pyqtSignal(list)
+    consumers_changed = pyqtSignal(bool)
+
+    def __init__(
+        self,
+        queue_capacity: int = 4096,
+        max_batch_size: int = 64,
+        max_linger: float = 0.0,
+        status_interval: float = 1 / 60,
+        journal: Optional[MarkerJournal] = None,
+        metrics: Optional[Metrics] = None,
+        hold_until_consumers: bool = False,
+    ) -> None:
         """Initialize the LSL stream thread.
 
-        Sets up the thread with null outlet and stream_info attributes.
+        Args:
+            queue_capacity: Maximum number of markers that can be waiting
+                for dispatch at once.
+            max_batch_size: Maximum number of queued markers pushed together
+                as one chunk. Use 1 to push every marker individually.
+            max_linger: Seconds to wait for more markers before pushing a
+                partial batch.
+            status_interval: Minimum number of seconds between two
+                status_batch emissions. Defaults to one display frame at
+                60 Hz.
+            journal: Optional journal every pushed marker is appended to.
+                The caller owns the journal and closes it.
+            metrics: Optional instrumentation to record hot-path timings
+                and counters into.
+            hold_until_consumers: Whether to hold markers while the outlet
+                has no consumers and push them once one connects.
+
+        Raises:
+            ValueError: If max_batch_size is less than 1 or max_linger is
+                negative.
         """
         super().__init__()
-        self.outlet: Optional[StreamOutlet] = None
-        self.stream_info: Optional[StreamInfo] = None
+        self.engine = MarkerEngine(
+            queue_capacity=queue_capacity,
+            max_batch_size=max_batch_size,
+            max_linger=max_linger,
+            status_interval=status_interval,
+            journal=journal,
+            on_status=self.status_batch.emit,
+            metrics=metrics,
+            hold_until_consumers=hold_until_consumers,
+            on_consumers=self.consumers_changed.emit,
+        )
 
-    def run(self) -> None:
-        """Create and maintain the LSL stream.
+    @property
+    def outlet(self) -> Optional[StreamOutlet]:
+        """The LSL stream outlet, or None while the stream is not running."""
+        return self.engine.outlet
 
-        This method is called when the thread starts. It creates the LSL
-        stream info and outlet, then emits status updates.
+    @property
+    def stream_info(self) -> Optional[StreamInfo]:
+        """Information about the LSL stream, or None until it has started."""
+        return self.engine.stream_info
 
-        Raises:
-            Exception: If there's an error creating the LSL stream.
-        """
-        try:
-            # Create stream info
-            self.stream_info = StreamInfo(
-                name="MobiMarkerStream",
-                type="Markers",
-                channel_count=1,
-                nominal_srate=0,  # irregular sampling rate
-                channel_format="string",
-                source_id="mobi_marker_gui_v1",
-            )
+    def run(self) -> None:
+        """Create the LSL stream and dispatch queued markers until stopped.
 
-            # Create outlet
-            self.outlet = StreamOutlet(self.stream_info)
-            human_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-            lsl_time = local_clock()
-            self.status_update.emit(
-                f"[{human_time} | LSL: {lsl_time:.3f}] LSL stream started successfully"
-            )
+        This method is called when the thread starts and returns once stop()
+        has been called and the remaining markers have been pushed.
+        """
+        self.engine.run()
 
-        except Exception as e:
-            human_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-            lsl_time = local_clock()
-            self.status_update.emit(
-                f"[{human_time} | LSL: {lsl_time:.3f}] Error starting LSL stream: {e}"
-            )
+    def send_marker(self, marker: str, timestamp: Optional[float] = None) -> None:
+        """Queue a marker for dispatch through the LSL stream.
 
-    def send_marker(self, marker: str) -> None:
-        """Send a marker through the LSL stream.
+        This only enqueues the marker and wakes the dispatch loop, so it
+        returns immediately; the sample is pushed from the stream thread
+        with the given timestamp, so queueing delays do not shift it.
 
         Args:
             marker: The marker string to send through the LSL stream.
+            timestamp: LSL timestamp of the event the marker describes, as
+                returned by local_clock(). Defaults to the current time.
 
         Emits:
-            status_update: Signal with status message about the operation.
+            status_update: Signal with a status record if the stream is not
+                active or the dispatch queue is full.
         """
-        if self.outlet is not None:
-            try:
-                self.outlet.push_sample([marker])
-                human_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                lsl_time = local_clock()
-                self.status_update.emit(
-                    f"[{human_time} | LSL: {lsl_time:.3f}] Sent marker: {marker}"
-                )
-            except Exception as e:
-                human_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                lsl_time = local_clock()
-                self.status_update.emit(
-                    f"[{human_time} | LSL: {lsl_time:.3f}] Error sending marker: {e}"
-                )
-        else:
-            human_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-            lsl_time = local_clock()
-            self.status_update.emit(
-                f"[{human_time} | LSL: {lsl_time:.3f}] LSL stream not active"
-            )
+        rejection = self.engine.send_marker(marker, timestamp)
+        if rejection is not None:
+            self.status_update.emit(rejection)
+
+    def stop(self) -> None:
+        """Ask the dispatch loop to flush queued markers and exit.
+
+        Call wait() afterwards to block until the thread has finished.
+        """
+        self.engine.stop()
 
 
 class MobiMarkerGUI(QMainWindow):
@@ -149,23 +298,136 @@ class MobiMarkerGUI(QMainWindow):
     the LSL stream, and quick marker buttons for common neuroscience events.
 
     Attributes:
+        protocol_finished: Signal emitted by the protocol scheduler thread
+            when the protocol has finished or was stopped.
         lsl_thread: The LSL stream thread for handling marker transmission.
+        journal: The session journal sent markers are appended to, or None
+            if journaling is disabled or the journal could not be opened.
+        journal_path: Path of the session journal, or None for the default.
+        use_journal: Whether sent markers are journaled.
+        listeners: Running network listeners feeding markers into the
+            stream.
+        host: Interface the network listeners bind to.
+        udp_port: UDP port to receive markers on, or None to disable it.
+        tcp_port: TCP port to receive markers on, or None to disable it.
+        ws_port: WebSocket port to receive markers on, or None to disable
+            it.
+        http_port: Port of the marker HTTP API, or None to disable it.
+        metrics: Hot-path instrumentation shown in the status bar, or None
+            if instrumentation is disabled.
+        metrics_port: Port to serve Prometheus metrics on, or None to
+            disable the endpoint.
+        exporter: The running Prometheus metrics endpoint, or None.
+        record_path: Path of a new XDF file to record the marker stream
+            into, or None to disable recording.
+        record_streams: Names of other LSL streams to record along with the
+            marker stream.
+        recorder: The running XDF recorder, or None.
+        clock_monitor: Thread warning when the wall clock diverges from the
+            LSL clock, or None before the stream is started.
+        profile: Quick markers and modalities offered by the window.
+        hotkeys: Event filter sending the markers of the profile's hotkeys,
+            or None if the profile has no hotkeys.
+        hold_until_consumers: Whether markers are held while the stream has
+            no consumers.
+        protocol: Timed marker sequence run by the protocol button, or None.
+        scheduler: The running protocol scheduler, or None.
+        protocol_queue: Dispatch queue shared by all protocol runs, or None
+            until the first run.
+        protocol_button: Button starting and stopping the protocol, or None
+            without a protocol.
+        metrics_label: Status bar label showing the instrumentation
+            readout, or None if instrumentation is disabled.
+        consumer_indicator: Status bar label showing whether the stream has
+            consumers.
         marker_input: Text input field for entering custom marker text.
-        status_display: Text area for displaying status messages with both
+        status_model: Fixed-capacity model holding the status log records.
+        status_display: List view displaying status messages with both
             human-readable and LSL timestamps.
         send_button: Button for sending custom markers from the input field.
         end_modality_button: Button for sending END [modality] markers.
         modality_combo: Dropdown for selecting recording modality.
-        custom_modality_input: Text field for custom modality when "Other" is selected.
+        modality_layout: Layout of the modality section.
+        custom_modality_input: Text field for custom modality when "Other" is
+            selected, or None until "Other" is first selected.
     """
 
-    def __init__(self) -> None:
+    protocol_finished = pyqtSignal()
+
+    def __init__(
+        self,
+        journal_path: Optional[str | os.PathLike[str]] = None,
+        use_journal: bool = True,
+        host: str = DEFAULT_SERVER_HOST,
+        udp_port: Optional[int] = None,
+        tcp_port: Optional[int] = None,
+        ws_port: Optional[int] = None,
+        http_port: Optional[int] = None,
+        instrument: bool = False,
+        metrics_port: Optional[int] = None,
+        profile: MarkerProfile = DEFAULT_PROFILE,
+        record_path: Optional[str | os.PathLike[str]] = None,
+        record_streams: Sequence[str] = (),
+        hold_until_consumers: bool = False,
+        protocol: Optional[Protocol] = None,
+    ) -> None:
         """Initialize the main window.
 
         Sets up the GUI components and starts the LSL stream.
+
+        Args:
+            journal_path: Path of the session journal. Defaults to a new
+                timestamped file in the default journal directory.
+            use_journal: Whether to journal sent markers at all.
+            host: Interface the network listeners bind to.
+            udp_port: UDP port to receive markers on, or None to disable
+                UDP ingestion.
+            tcp_port: TCP port to receive newline-delimited markers on, or
+                None to disable the TCP endpoint.
+            ws_port: Port to accept WebSocket clients on, or None to
+                disable the WebSocket endpoint.
+            http_port: Port to serve the marker HTTP API on, or None to
+                disable it.
+            instrument: Whether to record hot-path timings and show them
+                in the status bar.
+            metrics_port: Port to serve Prometheus metrics on, or None to
+                disable the endpoint. Implies instrument.
+            profile: Quick markers and modalities offered by the window.
+            record_path: Path of a new XDF file to record the marker stream
+                into, or None to disable recording.
+            record_streams: Names of other LSL streams to record along with
+                the marker stream.
+            hold_until_consumers: Whether to hold markers while the stream
+                has no consumers and send them once one connects.
+            protocol: Timed marker sequence offered by a protocol button,
+                or None.
         """
         super().__init__()
         self.lsl_thread: Optional[LSLStreamThread] = None
+        self.journal: Optional[MarkerJournal] = None
+        self.journal_path = journal_path
+        self.use_journal = use_journal
+        self.listeners: list[UDPMarkerListener | MarkerServer | HTTPMarkerServer] = []
+        self.host = host
+        self.udp_port = udp_port
+        self.tcp_port = tcp_port
+        self.ws_port = ws_port
+        self.http_port = http_port
+        self.metrics_port = metrics_port
+        self.profile = profile
+        self.metrics = Metrics() if instrument or metrics_port is not None else None
+        self.exporter: Optional[MetricsExporter] = None
+        self.record_path = record_path
+        self.record_streams = tuple(record_streams)
+        self.recorder: Optional[XDFRecorder] = None
+        self.clock_monitor: Optional[ClockMonitor] = None
+        self.hold_until_consumers = hold_until_consumers
+        self.protocol = protocol
+        self.scheduler: Optional[ProtocolScheduler] = None
+        self.protocol_queue: Optional[SPSCQueue[MarkerRecord]] = None
+        self.protocol_button: Optional[QPushButton] = None
+        self.hotkeys: Optional[HotkeyDispatcher] = None
+        self.metrics_label: Optional[QLabel] = None
         self.init_ui()
         self.start_lsl_stream()
 
@@ -175,7 +437,10 @@ class MobiMarkerGUI(QMainWindow):
         Creates and configures all GUI components including input fields,
         buttons, and status display area.
         """
-        self.setWindowTitle("MoBI Marker - LSL Stream")
+        title = "MoBI Marker - LSL Stream"
+        if self.profile is not DEFAULT_PROFILE:
+            title = f"{title} - {self.profile.name}"
+        self.setWindowTitle(title)
         self.setGeometry(300, 300, 600, 400)
 
         # Central widget
@@ -185,11 +450,12 @@ class MobiMarkerGUI(QMainWindow):
         # Main layout
         layout = QVBoxLayout(central_widget)
 
+        # One stylesheet for the whole window, parsed once
+        self.setStyleSheet(build_stylesheet(self.profile.markers))
+
         # Title
         title_label = QLabel("MoBI LSL Event Marker Sender")
-        title_label.setStyleSheet(
-            "font-size: 24px; font-weight: bold; margin: 20px; color: #2c3e50;"
-        )
+        title_label.setObjectName("title")
         title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         layout.addWidget(title_label)
 
@@ -201,9 +467,9 @@ class MobiMarkerGUI(QMainWindow):
         input_layout.addWidget(input_label)
 
         self.marker_input = QLineEdit()
+        self.marker_input.setObjectName("markerInput")
         self.marker_input.setPlaceholderText("What happened...?")
         self.marker_input.setMinimumHeight(25)
-        self.marker_input.setStyleSheet("font-size: 14px; padding: 5px;")
         self.marker_input.returnPressed.connect(self.send_marker)
         input_layout.addWidget(self.marker_input)
 
@@ -216,200 +482,231 @@ class MobiMarkerGUI(QMainWindow):
 
         # Quick marker buttons
         quick_buttons_label = QLabel("Quick Markers:")
-        quick_buttons_label.setStyleSheet("font-weight: bold; margin-top: 20px;")
+        quick_buttons_label.setProperty("section", True)
         layout.addWidget(quick_buttons_label)
 
         quick_buttons_layout = QGridLayout()
-
-        # Define quick marker buttons
-        quick_markers = [
-            ("START", "#27ae60"),  # Green
-            ("END", "#e74c3c"),  # Red
-            ("PAUSE", "#f39c12"),  # Orange
-            ("RESUME", "#2ecc71"),  # Light green
-            ("ERROR", "#c0392b"),  # Dark red
-            ("NOTE", "#3498db"),  # Blue
-            ("START BREAK", "#8e44ad"),  # Purple
-            ("END BREAK", "#e67e22"),  # Dark orange
-        ]
-
-        # Create and add quick marker buttons
-        row = 0
-        col = 0
-        for marker_text, color in quick_markers:
-            button = QPushButton(marker_text)
-            button.setStyleSheet(
-                f"QPushButton {{"
-                f"    background-color: {color};"
-                f"    color: white;"
-                f"    font-weight: bold;"
-                f"    padding: 8px 16px;"
-                f"    border: none;"
-                f"    border-radius: 4px;"
-                f"    min-height: 30px;"
-                f"}}"
-                f"QPushButton:hover {{"
-                f"    background-color: {color}CC;"  # Add transparency on hover
-                f"}}"
-                f"QPushButton:pressed {{"
-                f"    background-color: {color}99;"  # More transparency when pressed
-                f"}}"
-            )
+        for index, marker in enumerate(self.profile.markers):
+            button = QPushButton(marker.text)
+            button.setProperty("role", "quickMarker")
+            button.setProperty("marker", marker.text)
+            if marker.hotkey:
+                button.setToolTip(f"Hotkey: {marker.hotkey}")
             button.clicked.connect(
-                lambda checked, text=marker_text: self.send_quick_marker(text)
+                lambda checked, text=marker.text: self.send_quick_marker(text)
             )
-            quick_buttons_layout.addWidget(button, row, col)
-
-            col += 1
-            if col > 2:  # 3 columns per row
-                col = 0
-                row += 1
+            quick_buttons_layout.addWidget(button, *divmod(index, self.profile.columns))
 
         layout.addLayout(quick_buttons_layout)
 
+        if self.protocol is not None:
+            self.protocol_button = QPushButton()
+            self.protocol_button.setObjectName("protocolButton")
+            self.protocol_button.setToolTip(
+                f"{self.protocol.name}: {self.protocol.marker_count} markers"
+            )
+            self.protocol_button.clicked.connect(self.toggle_protocol)
+            self.protocol_finished.connect(self.on_protocol_finished)
+            self.on_protocol_finished()
+            layout.addWidget(self.protocol_button)
+
         # Add separate modality section with better design
         modality_label = QLabel("End Modality:")
-        modality_label.setStyleSheet("font-weight: bold; margin-top: 15px;")
+        modality_label.setObjectName("modalityLabel")
+        modality_label.setProperty("section", True)
         layout.addWidget(modality_label)
 
         # Create a nice-looking modality section
         modality_widget = QWidget()
-        modality_widget.setStyleSheet(
-            "QWidget {"
-            "    background-color: #f8f9fa;"
-            "    border: 1px solid #dee2e6;"
-            "    border-radius: 8px;"
-            "    padding: 12px;"
-            "}"
-        )
+        modality_widget.setObjectName("modalityPanel")
+        modality_widget.setAttribute(Qt.WidgetAttribute.WA_StyledBackground)
 
-        modality_layout = QHBoxLayout(modality_widget)
-        modality_layout.setContentsMargins(12, 8, 12, 8)
-        modality_layout.setSpacing(10)
+        self.modality_layout = QHBoxLayout(modality_widget)
+        self.modality_layout.setContentsMargins(12, 8, 12, 8)
+        self.modality_layout.setSpacing(10)
 
         # END button for modality
         self.end_modality_button = QPushButton("END")
-        self.end_modality_button.setStyleSheet(
-            "QPushButton {"
-            "    background-color: #6c757d;"
-            "    color: white;"
-            "    font-weight: bold;"
-            "    padding: 10px 20px;"
-            "    border: none;"
-            "    border-radius: 6px;"
-            "    min-width: 60px;"
-            "    font-size: 14px;"
-            "}"
-            "QPushButton:hover {"
-            "    background-color: #5a6268;"
-            "}"
-            "QPushButton:pressed {"
-            "    background-color: #545b62;"
-            "}"
-        )
+        self.end_modality_button.setObjectName("endModalityButton")
         self.end_modality_button.clicked.connect(self.send_end_modality_marker)
-        modality_layout.addWidget(self.end_modality_button)
+        self.modality_layout.addWidget(self.end_modality_button)
 
         # Modality dropdown
         self.modality_combo = QComboBox()
-        self.modality_combo.addItems(AVAILABLE_MODALITIES)
-        self.modality_combo.setStyleSheet(
-            "QComboBox {"
-            "    padding: 8px 12px;"
-            "    border: 2px solid #ced4da;"
-            "    border-radius: 6px;"
-            "    background-color: white;"
-            "    font-size: 14px;"
-            "    min-width: 140px;"
-            "}"
-            "QComboBox:hover {"
-            "    border-color: #80bdff;"
-            "}"
-            "QComboBox::drop-down {"
-            "    border: none;"
-            "    width: 30px;"
-            "}"
-            "QComboBox::down-arrow {"
-            "    width: 12px;"
-            "    height: 12px;"
-            "}"
-        )
+        self.modality_combo.setObjectName("modalityCombo")
+        self.modality_combo.addItems([*self.profile.modalities, OTHER_MODALITY])
         self.modality_combo.currentTextChanged.connect(self.on_modality_changed)
-        modality_layout.addWidget(self.modality_combo)
-
-        # Custom modality input (initially hidden)
-        self.custom_modality_input = QLineEdit()
-        self.custom_modality_input.setPlaceholderText("Enter custom modality...")
-        self.custom_modality_input.setStyleSheet(
-            "QLineEdit {"
-            "    padding: 8px 12px;"
-            "    border: 2px solid #ced4da;"
-            "    border-radius: 6px;"
-            "    font-size: 14px;"
-            "    min-width: 150px;"
-            "}"
-            "QLineEdit:focus {"
-            "    border-color: #80bdff;"
-            "    outline: none;"
-            "}"
-        )
-        self.custom_modality_input.setVisible(False)
-        modality_layout.addWidget(self.custom_modality_input)
+        self.modality_layout.addWidget(self.modality_combo)
+
+        # The custom modality input is created when "Other" is first selected
+        self.custom_modality_input: Optional[QLineEdit] = None
 
         # Add stretch to center the content
-        modality_layout.addStretch()
+        self.modality_layout.addStretch()
 
         layout.addWidget(modality_widget)
 
         # Status display
         status_label = QLabel("Status Log:")
-        status_label.setStyleSheet("font-weight: bold; margin-top: 20px;")
+        status_label.setProperty("section", True)
         layout.addWidget(status_label)
 
-        self.status_display = QTextEdit()
-        self.status_display.setReadOnly(True)
+        self.status_model = StatusLogModel(
+            STATUS_LOG_CAPACITY, self, metrics=self.metrics
+        )
+        self.status_display = QListView()
+        self.status_display.setModel(self.status_model)
+        self.status_display.setUniformItemSizes(True)
+        self.status_display.setEditTriggers(QListView.EditTrigger.NoEditTriggers)
         self.status_display.setMaximumHeight(200)
         layout.addWidget(self.status_display)
 
+        status_bar = self.statusBar()
+        self.consumer_indicator = QLabel()
+        self.consumer_indicator.setObjectName("consumerIndicator")
+        self.update_consumers(False)
+        if status_bar is not None:
+            status_bar.addPermanentWidget(self.consumer_indicator)
+        if self.metrics is not None and status_bar is not None:
+            self.metrics_label = QLabel()
+            status_bar.addPermanentWidget(self.metrics_label)
+            self.update_metrics()
+            metrics_timer = QTimer(self)
+            metrics_timer.timeout.connect(self.update_metrics)
+            metrics_timer.start(METRICS_REFRESH_MS)
+
         # Focus on the input field
         self.marker_input.setFocus()
 
     def start_lsl_stream(self) -> None:
         """Start the LSL stream in a separate thread.
 
-        Creates and initializes the LSL stream thread, connecting its
-        status update signal to the GUI's status display.
+        Opens the session journal, if enabled, then creates and initializes
+        the LSL stream thread, connecting its status signals to the GUI's
+        status display. If the journal cannot be opened, markers are still
+        sent but not journaled.
         """
-        self.lsl_thread = LSLStreamThread()
+        if self.use_journal:
+            try:
+                self.journal = MarkerJournal(
+                    self.journal_path or default_journal_path()
+                )
+                self.update_status(
+                    StatusRecord.now(
+                        StatusLevel.INFO, "Journaling markers to", self.journal.path
+                    )
+                )
+            except Exception as e:
+                self.update_status(
+                    StatusRecord.now(
+                        StatusLevel.ERROR, "Error opening marker journal", e
+                    )
+                )
+
+        self.lsl_thread = LSLStreamThread(
+            journal=self.journal,
+            metrics=self.metrics,
+            hold_until_consumers=self.hold_until_consumers,
+        )
         self.lsl_thread.status_update.connect(self.update_status)
+        self.lsl_thread.status_batch.connect(self.update_status_batch)
+        self.lsl_thread.consumers_changed.connect(self.update_consumers)
         self.lsl_thread.start()
+        self.clock_monitor = ClockMonitor(
+            on_status=self.lsl_thread.status_update.emit, metrics=self.metrics
+        )
+        self.clock_monitor.start()
+
+        try:
+            self.listeners = start_listeners(
+                self.lsl_thread.engine,
+                self.host,
+                self.udp_port,
+                self.tcp_port,
+                self.ws_port,
+                self.http_port,
+                on_status=self.lsl_thread.status_update.emit,
+            )
+            if self.metrics is not None and self.metrics_port is not None:
+                self.exporter = MetricsExporter(
+                    self.metrics,
+                    self.host,
+                    self.metrics_port,
+                    on_status=self.lsl_thread.status_update.emit,
+                )
+                self.exporter.start()
+        except OSError as e:
+            self.update_status(
+                StatusRecord.now(StatusLevel.ERROR, "Error opening port", e)
+            )
+
+        if self.record_path is not None:
+            try:
+                self.recorder = XDFRecorder(
+                    self.record_path,
+                    [DEFAULT_STREAM_NAME, *self.record_streams],
+                    on_status=self.lsl_thread.status_update.emit,
+                )
+                self.recorder.start()
+                # Resolving the streams takes a while; the recorder reports
+                # "Recording to" once markers sent from here on are recorded
+                self.update_status(
+                    StatusRecord.now(
+                        StatusLevel.WARNING,
+                        "Warning: recorder not attached yet, markers sent now "
+                        "are not recorded to",
+                        self.record_path,
+                    )
+                )
+            except OSError as e:
+                self.update_status(
+                    StatusRecord.now(StatusLevel.ERROR, "Error creating recording", e)
+                )
+
+        self.install_hotkeys()
+
+    def install_hotkeys(self) -> None:
+        """Make the profile's quick marker hotkeys application-wide.
+
+        Resolves the hotkeys into a lookup table once and installs a
+        HotkeyDispatcher on the application, which queues the marker of a
+        pressed hotkey directly on the LSL stream thread. Invalid hotkeys
+        are reported in the status log.
+        """
+        table, invalid = build_hotkey_table(self.profile.markers)
+        for hotkey in invalid:
+            self.update_status(
+                StatusRecord.now(StatusLevel.ERROR, "Error: invalid hotkey", hotkey)
+            )
+        app = QApplication.instance()
+        if not table or app is None or self.lsl_thread is None:
+            return
+        self.hotkeys = HotkeyDispatcher(table, self.lsl_thread.send_marker, self)
+        app.installEventFilter(self.hotkeys)
 
     def send_marker(self) -> None:
         """Send the marker from the input field.
 
         Retrieves the text from the marker input field and sends it
         through the LSL stream. Validates that the marker text is not
-        empty and that the LSL stream is initialized.
+        empty and that the LSL stream is initialized. The marker is stamped
+        with the LSL time at which the button or Enter event fired.
         """
+        event_time = local_clock()
         marker_text = self.marker_input.text().strip()
 
         if not marker_text:
-            human_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-            lsl_time = local_clock()
             self.update_status(
-                f"[{human_time} | LSL: {lsl_time:.3f}] Error: Empty marker text"
+                StatusRecord.now(StatusLevel.ERROR, "Error: Empty marker text")
             )
             return
 
         if self.lsl_thread is not None:
-            self.lsl_thread.send_marker(marker_text)
+            self.lsl_thread.send_marker(marker_text, event_time)
             self.marker_input.clear()  # Clear input after sending
         else:
-            human_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-            lsl_time = local_clock()
             self.update_status(
-                f"[{human_time} | LSL: {lsl_time:.3f}] Error: LSL stream not "
-                "initialized"
+                StatusRecord.now(StatusLevel.ERROR, "Error: LSL stream not initialized")
             )
 
     def send_quick_marker(self, marker_text: str) -> None:
@@ -420,16 +717,15 @@ class MobiMarkerGUI(QMainWindow):
 
         Note:
             This method sends quick markers immediately without needing text input.
-            It validates that the LSL stream is initialized before sending.
+            It validates that the LSL stream is initialized before sending,
+            and stamps the marker with the LSL time of the button click.
         """
+        event_time = local_clock()
         if self.lsl_thread is not None:
-            self.lsl_thread.send_marker(marker_text)
+            self.lsl_thread.send_marker(marker_text, event_time)
         else:
-            human_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-            lsl_time = local_clock()
             self.update_status(
-                f"[{human_time} | LSL: {lsl_time:.3f}] Error: LSL stream not "
-                "initialized"
+                StatusRecord.now(StatusLevel.ERROR, "Error: LSL stream not initialized")
             )
 
     def on_modality_changed(self, modality: str) -> None:
@@ -439,12 +735,20 @@ class MobiMarkerGUI(QMainWindow):
             modality: The selected modality from the dropdown.
 
         Note:
-            Shows/hides the custom modality input field based on selection.
+            Shows/hides the custom modality input field based on selection,
+            creating it the first time "Other" is selected.
         """
-        if modality == "Other":
+        if modality == OTHER_MODALITY:
+            if self.custom_modality_input is None:
+                self.custom_modality_input = QLineEdit()
+                self.custom_modality_input.setObjectName("customModalityInput")
+                self.custom_modality_input.setPlaceholderText(
+                    "Enter custom modality..."
+                )
+                self.modality_layout.insertWidget(2, self.custom_modality_input)
             self.custom_modality_input.setVisible(True)
             self.custom_modality_input.setFocus()
-        else:
+        elif self.custom_modality_input is not None:
             self.custom_modality_input.setVisible(False)
 
     def send_end_modality_marker(self) -> None:
@@ -455,78 +759,248 @@ class MobiMarkerGUI(QMainWindow):
 
         Note:
             Uses the dropdown selection unless "Other" is selected, in which
-            case it uses the custom input field text.
+            case it uses the custom input field text. The marker is stamped
+            with the LSL time of the button click.
         """
+        event_time = local_clock()
         modality = self.modality_combo.currentText()
 
-        if modality == "Other":
-            custom_modality = self.custom_modality_input.text().strip()
-            if not custom_modality:
-                human_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-                lsl_time = local_clock()
+        if modality == OTHER_MODALITY:
+            custom_input = self.custom_modality_input
+            custom_modality = "" if custom_input is None else custom_input.text()
+            custom_modality = custom_modality.strip()
+            if custom_input is None or not custom_modality:
                 self.update_status(
-                    f"[{human_time} | LSL: {lsl_time:.3f}] Error: "
-                    "Please enter a custom modality"
+                    StatusRecord.now(
+                        StatusLevel.ERROR, "Error: Please enter a custom modality"
+                    )
                 )
                 return
             marker_text = f"END {custom_modality.upper()}"
-            self.custom_modality_input.clear()
+            custom_input.clear()
         else:
             marker_text = f"END {modality}"
 
         if self.lsl_thread is not None:
-            self.lsl_thread.send_marker(marker_text)
+            self.lsl_thread.send_marker(marker_text, event_time)
         else:
-            human_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
-            lsl_time = local_clock()
             self.update_status(
-                f"[{human_time} | LSL: {lsl_time:.3f}] Error: LSL stream not "
-                "initialized"
+                StatusRecord.now(StatusLevel.ERROR, "Error: LSL stream not initialized")
+            )
+
+    def toggle_protocol(self) -> None:
+        """Start the protocol, or stop it if it is running.
+
+        The protocol runs on its own scheduler thread and sends through a
+        dispatch queue of its own, so quick markers can still be sent while
+        it runs. The queue is registered once and reused by every run.
+        """
+        if self.scheduler is not None:
+            self.scheduler.stop()
+            return
+        if self.protocol is None or self.lsl_thread is None:
+            self.update_status(
+                StatusRecord.now(StatusLevel.ERROR, "Error: LSL stream not initialized")
             )
+            return
+        if self.protocol_queue is None:
+            self.protocol_queue = self.lsl_thread.engine.add_queue()
+        self.scheduler = ProtocolScheduler(
+            self.lsl_thread.engine,
+            self.protocol,
+            on_status=self.lsl_thread.status_update.emit,
+            on_finished=self.protocol_finished.emit,
+            metrics=self.metrics,
+            queue=self.protocol_queue,
+        )
+        self.scheduler.start()
+        if self.protocol_button is not None:
+            self.protocol_button.setText(f"Stop Protocol: {self.protocol.name}")
+            self.protocol_button.setProperty("running", "true")
+            self._repolish(self.protocol_button)
 
-    def update_status(self, message: str) -> None:
-        """Update the status display with a new message.
+    def on_protocol_finished(self) -> None:
+        """Reset the protocol button once the protocol has finished.
+
+        Called through the protocol_finished signal of the scheduler thread.
+        """
+        if self.scheduler is not None:
+            self.scheduler.join()
+            self.scheduler = None
+        if self.protocol_button is not None and self.protocol is not None:
+            self.protocol_button.setText(f"Start Protocol: {self.protocol.name}")
+            self.protocol_button.setProperty("running", "false")
+            self._repolish(self.protocol_button)
+
+    def update_status(self, record: StatusRecord) -> None:
+        """Update the status display with a new status record.
 
         Args:
-            message: The status message to display in the status log.
+            record: The status record to display in the status log.
 
         Note:
             The status display automatically scrolls to show the newest message.
+            Once the log holds STATUS_LOG_CAPACITY messages, the oldest ones
+            are discarded.
         """
-        self.status_display.append(message)
+        self.status_model.append(record)
         # Auto-scroll to bottom
-        scrollbar = self.status_display.verticalScrollBar()
-        if scrollbar is not None:
-            scrollbar.setValue(scrollbar.maximum())
+        self.status_display.scrollToBottom()
+
+    def update_status_batch(self, records: list[StatusRecord]) -> None:
+        """Append a batch of status records to the status display.
+
+        Args:
+            records: The status records to append, oldest first.
+
+        Note:
+            The batch is appended with a single model update and a single
+            scroll, so bursts from the LSL thread cost one repaint per frame.
+        """
+        self.status_model.extend(records)
+        self.status_display.scrollToBottom()
+
+    def update_consumers(self, have_consumers: bool) -> None:
+        """Show whether the LSL stream has consumers.
+
+        Called through the consumers_changed signal of the stream thread,
+        which polls the outlet, so the GUI thread never calls into LSL.
+
+        Args:
+            have_consumers: Whether the outlet has consumers.
+        """
+        indicator = self.consumer_indicator
+        if have_consumers:
+            indicator.setText("● Recording")
+        elif self.hold_until_consumers:
+            indicator.setText("○ No consumers - holding markers")
+        else:
+            indicator.setText("○ No consumers")
+        indicator.setProperty("connected", "true" if have_consumers else "false")
+        self._repolish(indicator)
+
+    @staticmethod
+    def _repolish(widget: QWidget) -> None:
+        """Re-evaluate the property selectors of the window style sheet.
+
+        Args:
+            widget: The widget whose dynamic properties changed.
+        """
+        style = widget.style()
+        if style is not None:
+            style.unpolish(widget)
+            style.polish(widget)
+
+    def update_metrics(self) -> None:
+        """Refresh the instrumentation readout in the status bar."""
+        if self.metrics is not None and self.metrics_label is not None:
+            self.metrics_label.setText(self.metrics.snapshot().readout())
 
     def closeEvent(self, event: QCloseEvent | None) -> None:
         """Handle window close event.
 
-        Properly shuts down the LSL stream thread before closing the window.
+        Stops the protocol, the network listeners, the metrics endpoint and
+        the clock monitor, then the LSL dispatch loop, letting it flush any queued
+        markers, waits for the thread to finish, then finishes the XDF
+        recording and syncs and closes the journal before closing the
+        window.
 
         Args:
             event: The close event from Qt.
         """
+        if self.scheduler is not None:
+            self.scheduler.stop()
+            self.scheduler.join()
+            self.scheduler = None
+        for listener in self.listeners:
+            listener.stop()
+        for listener in self.listeners:
+            listener.join()
+        self.listeners = []
+        app = QApplication.instance()
+        if self.hotkeys is not None and app is not None:
+            app.removeEventFilter(self.hotkeys)
+            self.hotkeys = None
+        if self.exporter is not None:
+            self.exporter.stop()
+            self.exporter.join()
+            self.exporter = None
+        if self.clock_monitor is not None:
+            self.clock_monitor.stop()
+            self.clock_monitor.join()
+            self.clock_monitor = None
         if self.lsl_thread is not None:
-            self.lsl_thread.quit()
+            self.lsl_thread.stop()
             self.lsl_thread.wait()
+        if self.recorder is not None:
+            self.recorder.stop()
+            self.recorder.join()
+            self.recorder = None
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
         if event is not None:
             event.accept()
 
 
-def main() -> None:
+def main(
+    argv: Optional[list[str]] = None,
+    journal_path: Optional[str | os.PathLike[str]] = None,
+    use_journal: bool = True,
+    host: str = DEFAULT_SERVER_HOST,
+    udp_port: Optional[int] = None,
+    tcp_port: Optional[int] = None,
+    ws_port: Optional[int] = None,
+    http_port: Optional[int] = None,
+    instrument: bool = False,
+    metrics_port: Optional[int] = None,
+    profile: MarkerProfile = DEFAULT_PROFILE,
+    record_path: Optional[str | os.PathLike[str]] = None,
+    record_streams: Sequence[str] = (),
+    hold_until_consumers: bool = False,
+    protocol: Optional[Protocol] = None,
+) -> None:
     """Main entry point for the GUI application.
 
     Creates and runs the Qt application with the MoBI Marker GUI.
     Sets up application properties and handles the application lifecycle.
 
+    Args:
+        argv: Arguments passed to QApplication, including the program name.
+            Defaults to sys.argv.
+        journal_path: Path of the session journal. Defaults to a new
+            timestamped file in the default journal directory.
+        use_journal: Whether to journal sent markers at all.
+        host: Interface the network listeners bind to.
+        udp_port: UDP port to receive markers on, or None to disable UDP
+            ingestion.
+        tcp_port: TCP port to receive newline-delimited markers on, or None
+            to disable the TCP endpoint.
+        ws_port: Port to accept WebSocket clients on, or None to disable the
+            WebSocket endpoint.
+        http_port: Port to serve the marker HTTP API on, or None to disable
+            it.
+        instrument: Whether to record hot-path timings and show them in the
+            status bar.
+        metrics_port: Port to serve Prometheus metrics on, or None to
+            disable the endpoint.
+        profile: Quick markers and modalities offered by the window.
+        record_path: Path of a new XDF file to record the marker stream
+            into, or None to disable recording.
+        record_streams: Names of other LSL streams to record along with the
+            marker stream.
+        hold_until_consumers: Whether to hold markers while the stream has
+            no consumers and send them once one connects.
+        protocol: Timed marker sequence offered by a protocol button, or
+            None.
+
     Returns:
         None
 
     Raises:
         SystemExit: When the application is closed.
     """
-    app = QApplication(sys.argv)
+    app = QApplication(sys.argv if argv is None else argv)
 
     # Set application properties
     app.setApplicationName("MoBI Marker")
@@ -534,7 +1008,22 @@ def main() -> None:
     app.setOrganizationName("MoBI Research")
 
     # Create and show the main window
-    window = MobiMarkerGUI()
+    window = MobiMarkerGUI(
+        journal_path,
+        use_journal,
+        host,
+        udp_port,
+        tcp_port,
+        ws_port,
+        http_port,
+        instrument,
+        metrics_port,
+        profile,
+        record_path,
+        record_streams,
+        hold_until_consumers,
+        protocol,
+    )
     window.show()
 
     # Run the application
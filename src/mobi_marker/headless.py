@@ -0,0 +1,255 @@
+"""Headless marker outlet for script-driven acquisition PCs.
+
+This module runs the LSL outlet and the marker dispatch engine without the
+GUI and without importing PyQt6. Markers are read from standard input, one
+per line, and each line is timestamped with local_clock() as soon as it is
+read. Status messages are written to standard error, so standard output
+stays free for the driving script. Markers can additionally be received
+over UDP, TCP and WebSocket, see mobi_marker.udp and mobi_marker.server,
+metrics can be served to Prometheus, see mobi_marker.exporter, and the
+stream can be recorded into an XDF file, see mobi_marker.recorder. A clock
+monitor warns when the wall clock diverges from the LSL clock, and a timed
+protocol can be run alongside, see mobi_marker.scheduler. Each of these
+subsystems is only imported when its option is set, so a plain stdin
+outlet starts without loading asyncio or http.server.
+
+Functions:
+    run_headless: Run the marker outlet until its input is exhausted.
+"""
+
+import os
+import signal
+import sys
+import threading
+from types import FrameType
+from typing import TYPE_CHECKING, Optional, Sequence, TextIO
+
+from pylsl import local_clock
+
+from mobi_marker.clock import ClockMonitor
+from mobi_marker.engine import DEFAULT_STREAM_NAME, MarkerEngine
+from mobi_marker.journal import MarkerJournal
+from mobi_marker.listeners import DEFAULT_SERVER_HOST, start_listeners
+from mobi_marker.metrics import Metrics
+from mobi_marker.status import StatusLevel, StatusRecord
+
+if TYPE_CHECKING:
+    from mobi_marker.exporter import MetricsExporter
+    from mobi_marker.http_api import HTTPMarkerServer
+    from mobi_marker.recorder import XDFRecorder
+    from mobi_marker.scheduler import Protocol, ProtocolScheduler
+    from mobi_marker.server import MarkerServer
+    from mobi_marker.udp import UDPMarkerListener
+
+
+def _print_status(records: list[StatusRecord]) -> None:
+    """Write status records to standard error.
+
+    Args:
+        records: The status records to write, oldest first.
+    """
+    sys.stderr.write("".join(f"{record.format()}\n" for record in records))
+    sys.stderr.flush()
+
+
+def _exit_on_sigterm(signum: int, frame: Optional[FrameType]) -> None:
+    """Turn SIGTERM into a clean exit so queued markers are flushed.
+
+    Args:
+        signum: The received signal number.
+        frame: The interrupted stack frame.
+
+    Raises:
+        SystemExit: Always.
+    """
+    raise SystemExit(0)
+
+
+def run_headless(
+    journal_path: Optional[str | os.PathLike[str]] = None,
+    markers: Optional[TextIO] = None,
+    host: str = DEFAULT_SERVER_HOST,
+    udp_port: Optional[int] = None,
+    tcp_port: Optional[int] = None,
+    ws_port: Optional[int] = None,
+    http_port: Optional[int] = None,
+    instrument: bool = False,
+    metrics_port: Optional[int] = None,
+    record_path: Optional[str | os.PathLike[str]] = None,
+    record_streams: Sequence[str] = (),
+    hold_until_consumers: bool = False,
+    protocol: Optional["Protocol"] = None,
+) -> int:
+    """Run the marker outlet until its input is exhausted.
+
+    Starts the dispatch engine on a background thread, waits for the LSL
+    outlet to be created, and then sends every non-empty input line as a
+    marker. Stops on end of input, SIGINT or SIGTERM, after pushing the
+    markers still queued. With a protocol, end of input waits for the
+    protocol to finish. With a network listener, end of input does not
+    stop the outlet; it keeps running until SIGINT or SIGTERM.
+
+    Args:
+        journal_path: Path of the session journal, or None to disable
+            journaling.
+        markers: Text stream to read markers from. Defaults to stdin.
+        host: Interface the network listeners bind to.
+        udp_port: UDP port to receive markers on, or None to disable the
+            UDP listener.
+        tcp_port: TCP port to receive newline-delimited markers on, or None
+            to disable the TCP endpoint.
+        ws_port: Port to accept WebSocket clients on, or None to disable
+            the WebSocket endpoint.
+        http_port: Port to serve the marker HTTP API on, or None to disable
+            it.
+        instrument: Whether to record hot-path timings and counters and
+            write a summary of them to standard error on exit.
+        metrics_port: Port to serve Prometheus metrics on, or None to
+            disable the endpoint. Implies instrument.
+        record_path: Path of a new XDF file to record the marker stream
+            into, or None to disable recording.
+        record_streams: Names of other LSL streams to record along with
+            the marker stream.
+        hold_until_consumers: Whether to hold markers while the stream has
+            no consumers and send them once one connects.
+        protocol: Timed marker sequence to run once the stream has started,
+            or None.
+
+    Returns:
+        The process exit status: 0 on success, 1 if a network listener or
+        the recording could not be started. A failed LSL stream is
+        re-created in the background while markers are held.
+    """
+    if markers is None:
+        markers = sys.stdin
+
+    journal: Optional[MarkerJournal] = None
+    if journal_path is not None:
+        try:
+            journal = MarkerJournal(journal_path)
+            _print_status(
+                [
+                    StatusRecord.now(
+                        StatusLevel.INFO, "Journaling markers to", journal.path
+                    )
+                ]
+            )
+        except Exception as e:
+            _print_status(
+                [StatusRecord.now(StatusLevel.ERROR, "Error opening marker journal", e)]
+            )
+
+    metrics = Metrics() if instrument or metrics_port is not None else None
+    engine = MarkerEngine(
+        journal=journal,
+        on_status=_print_status,
+        metrics=metrics,
+        hold_until_consumers=hold_until_consumers,
+    )
+    dispatcher = threading.Thread(target=engine.run, name="MarkerEngine")
+    dispatcher.start()
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, _exit_on_sigterm)
+
+    listeners: list["UDPMarkerListener | MarkerServer | HTTPMarkerServer"] = []
+    exporter: Optional["MetricsExporter"] = None
+    recorder: Optional["XDFRecorder"] = None
+    scheduler: Optional["ProtocolScheduler"] = None
+    clock_monitor = ClockMonitor(
+        on_status=lambda record: _print_status([record]), metrics=metrics
+    )
+    try:
+        engine.started.wait()
+        if engine.outlet is None and not engine.recovering:
+            return 1
+        clock_monitor.start()
+        if record_path is not None:
+            from mobi_marker.recorder import XDFRecorder
+
+            try:
+                recorder = XDFRecorder(
+                    record_path,
+                    [DEFAULT_STREAM_NAME, *record_streams],
+                    on_status=lambda record: _print_status([record]),
+                )
+            except OSError as e:
+                _print_status(
+                    [StatusRecord.now(StatusLevel.ERROR, "Error creating recording", e)]
+                )
+                return 1
+            recorder.start()
+            # Do not read markers before the recorder receives the stream
+            recorder.started.wait()
+        try:
+            listeners = start_listeners(
+                engine,
+                host,
+                udp_port,
+                tcp_port,
+                ws_port,
+                http_port,
+                on_status=lambda record: _print_status([record]),
+            )
+            if metrics is not None and metrics_port is not None:
+                from mobi_marker.exporter import MetricsExporter
+
+                exporter = MetricsExporter(
+                    metrics,
+                    host,
+                    metrics_port,
+                    on_status=lambda record: _print_status([record]),
+                )
+                exporter.start()
+        except OSError as e:
+            _print_status(
+                [StatusRecord.now(StatusLevel.ERROR, "Error opening port", e)]
+            )
+            return 1
+        if protocol is not None:
+            from mobi_marker.scheduler import ProtocolScheduler
+
+            scheduler = ProtocolScheduler(
+                engine,
+                protocol,
+                on_status=lambda record: _print_status([record]),
+                metrics=metrics,
+            )
+            scheduler.start()
+        for line in markers:
+            timestamp = local_clock()
+            marker = line.rstrip("\r\n")
+            if not marker:
+                continue
+            rejection = engine.send_marker(marker, timestamp)
+            if rejection is not None:
+                _print_status([rejection])
+        while scheduler is not None and scheduler.is_alive():
+            scheduler.join(0.5)
+        while alive := [listener for listener in listeners if listener.is_alive()]:
+            alive[0].join(0.5)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if scheduler is not None:
+            scheduler.stop()
+            scheduler.join()
+        for listener in listeners:
+            listener.stop()
+        for listener in listeners:
+            listener.join()
+        if exporter is not None:
+            exporter.stop()
+            exporter.join()
+        if clock_monitor.is_alive():
+            clock_monitor.stop()
+            clock_monitor.join()
+        engine.stop()
+        dispatcher.join()
+        if recorder is not None:
+            recorder.stop()
+            recorder.join()
+        if journal is not None:
+            journal.close()
+        if metrics is not None:
+            sys.stderr.write(f"{metrics.snapshot().readout()}\n")
+    return 0
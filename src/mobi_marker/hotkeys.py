@@ -0,0 +1,109 @@
+"""Application-wide marker hotkeys for the GUI.
+
+This module maps key presses straight to quick markers. The hotkeys of a
+profile are resolved once into a lookup table from Qt's combined key code
+to the interned marker string, and an event filter installed on the
+QApplication looks every key press up in that table. A match is stamped
+with local_clock() and queued right away, without going through a
+QShortcut or a per-button signal connection.
+
+Hotkeys work whichever widget has the focus, including the marker input
+field, so profiles should use keys that are not needed for typing, such as
+function keys or Ctrl combinations. Auto-repeated key presses are ignored,
+so holding a key down sends its marker once.
+
+Classes:
+    HotkeyDispatcher: Event filter sending the marker of a pressed hotkey.
+
+Functions:
+    build_hotkey_table: Resolve the hotkeys of quick markers into a table.
+"""
+
+import sys
+from typing import Callable, Iterable, Optional
+
+from pylsl import local_clock
+from PyQt6.QtCore import QEvent, QObject, Qt
+from PyQt6.QtGui import QKeyEvent, QKeySequence
+
+from mobi_marker.profile import QuickMarker
+
+
+def build_hotkey_table(
+    markers: Iterable[QuickMarker],
+) -> tuple[dict[int, str], list[str]]:
+    """Resolve the hotkeys of quick markers into a lookup table.
+
+    Args:
+        markers: The quick markers. Markers without a hotkey are skipped.
+
+    Returns:
+        The table from combined key code, as returned by
+        QKeyCombination.toCombined(), to interned marker string, and the
+        hotkeys that are not a single valid key combination.
+    """
+    table: dict[int, str] = {}
+    invalid: list[str] = []
+    for marker in markers:
+        if marker.hotkey is None:
+            continue
+        sequence = QKeySequence(marker.hotkey)
+        if sequence.count() != 1 or sequence[0].key() == Qt.Key.Key_unknown:
+            invalid.append(marker.hotkey)
+            continue
+        table[sequence[0].toCombined()] = sys.intern(marker.text)
+    return table, invalid
+
+
+class HotkeyDispatcher(QObject):
+    """Event filter sending the marker of a pressed hotkey.
+
+    Install it on the QApplication to make the hotkeys application-wide.
+
+    Attributes:
+        table: Lookup table from combined key code to marker string.
+        send: Callback queueing a marker with its LSL timestamp.
+    """
+
+    def __init__(
+        self,
+        table: dict[int, str],
+        send: Callable[[str, float], None],
+        parent: Optional[QObject] = None,
+    ) -> None:
+        """Initialize the dispatcher.
+
+        Args:
+            table: Lookup table from combined key code to marker string, as
+                built by build_hotkey_table().
+            send: Callback queueing a marker with its LSL timestamp, such
+                as LSLStreamThread.send_marker.
+            parent: Optional parent object.
+        """
+        super().__init__(parent)
+        self.table = table
+        self.send = send
+
+    def eventFilter(self, watched: Optional[QObject], event: Optional[QEvent]) -> bool:
+        """Send the marker of a pressed hotkey and consume the key press.
+
+        Args:
+            watched: The object the event is sent to.
+            event: The event.
+
+        Returns:
+            True if the event was a hotkey press and has been handled,
+            otherwise False so that it is delivered normally.
+        """
+        if (
+            event is None
+            or event.type() != QEvent.Type.KeyPress
+            or not isinstance(event, QKeyEvent)
+        ):
+            return False
+        marker = self.table.get(event.keyCombination().toCombined())
+        if marker is None:
+            return False
+        if not event.isAutoRepeat():
+            self.send(marker, local_clock())
+        return True
@@ -0,0 +1,289 @@
+"""Local HTTP API for batched marker submission.
+
+This module serves a minimal JSON API on the local machine:
+
+``POST /markers``
+    The body is either a single marker or a JSON array of markers. A marker
+    is a string, or an object ``{"marker": "...", "timestamp": 123.4}``
+    whose optional timestamp is an LSL time (local_clock()) supplied by the
+    client. Markers without a timestamp are stamped with the time the
+    request was received.
+
+    The response mirrors the request: an object ``{"seq": 1, "timestamp":
+    123.4}`` for a single marker, or an array of such objects, giving the
+    sequence number and LSL timestamp assigned to each marker. If the
+    stream is not active or the dispatch queue is full, the response is
+    ``503 Service Unavailable`` and no marker of the request is sent.
+
+All markers of a request are queued as one chunk and pushed to the outlet
+with a single push_chunk call, however many there are.
+
+Requests are served one at a time over HTTP/1.0: the connection is closed
+after every response, and a client that stalls mid-request is disconnected
+after REQUEST_TIMEOUT, so an idle client can never hold the server.
+
+Classes:
+    HTTPMarkerServer: Thread serving the marker HTTP API.
+
+Constants:
+    DEFAULT_HTTP_PORT: TCP port the HTTP API binds to by default.
+    MAX_REQUEST_SIZE: Largest request body accepted, in bytes.
+    REQUEST_TIMEOUT: Seconds a client may take to send its request.
+"""
+
+import json
+import math
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Callable, Optional
+
+from pylsl import local_clock
+
+from mobi_marker.engine import MarkerEngine
+from mobi_marker.status import StatusLevel, StatusRecord
+
+DEFAULT_HTTP_PORT = 15003
+MAX_REQUEST_SIZE = 64 * 1024 * 1024
+REQUEST_TIMEOUT = 5.0
+
+
+def _parse_markers(
+    payload: object, received: float
+) -> tuple[list[str], list[float], bool]:
+    """Extract markers and timestamps from a decoded request body.
+
+    Args:
+        payload: The decoded JSON request body.
+        received: LSL time the request was received, used for markers
+            without a client timestamp.
+
+    Returns:
+        The markers, their timestamps, and whether the body was a single
+        marker rather than an array.
+
+    Raises:
+        ValueError: If the body is not a marker or an array of markers.
+    """
+    if isinstance(payload, list):
+        items, single = payload, False
+    else:
+        items, single = [payload], True
+    markers: list[str] = []
+    timestamps: list[float] = []
+    for item in items:
+        timestamp: object = None
+        if isinstance(item, dict):
+            timestamp = item.get("timestamp")
+            item = item.get("marker")
+        if not isinstance(item, str) or not item:
+            raise ValueError("markers must be non-empty strings")
+        if timestamp is None:
+            timestamp = received
+        elif (
+            isinstance(timestamp, bool)
+            or not isinstance(timestamp, (int, float))
+            or not math.isfinite(timestamp)
+        ):
+            raise ValueError("timestamps must be finite numbers")
+        markers.append(item)
+        timestamps.append(float(timestamp))
+    return markers, timestamps, single
+
+
+class _MarkerRequestHandler(BaseHTTPRequestHandler):
+    """Request handler for the marker HTTP API."""
+
+    protocol_version = "HTTP/1.0"
+    timeout = REQUEST_TIMEOUT
+    server: "_MarkerHTTPServer"
+
+    def log_message(self, format: str, *args: object) -> None:
+        """Discard the per-request access log."""
+
+    def _reply(
+        self, status: HTTPStatus, body: object, headers: Optional[dict[str, str]] = None
+    ) -> None:
+        """Send a JSON response.
+
+        Args:
+            status: The response status.
+            body: The JSON-serializable response body.
+            headers: Additional response headers.
+        """
+        data = json.dumps(body, separators=(",", ":")).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(
+        self, status: HTTPStatus, message: str, headers: Optional[dict[str, str]] = None
+    ) -> None:
+        """Send a JSON error response.
+
+        Args:
+            status: The response status.
+            message: Description of the error.
+            headers: Additional response headers.
+        """
+        self._reply(status, {"error": message}, headers)
+
+    def do_POST(self) -> None:
+        """Queue the markers of a POST /markers request."""
+        received = local_clock()
+        api = self.server.api
+        if self.path.split("?", 1)[0] != "/markers":
+            self._error(HTTPStatus.NOT_FOUND, "not found")
+            return
+        try:
+            length = int(self.headers["Content-Length"])
+        except (TypeError, ValueError):
+            self._error(HTTPStatus.LENGTH_REQUIRED, "Content-Length required")
+            return
+        if length < 0:
+            self._error(HTTPStatus.BAD_REQUEST, "invalid Content-Length")
+            return
+        if length > api.max_request_size:
+            self._error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "request too large")
+            return
+
+        try:
+            body = self.rfile.read(length)
+        except OSError:
+            return
+        try:
+            payload = json.loads(body)
+            markers, timestamps, single = _parse_markers(payload, received)
+        except ValueError as e:
+            self._error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+
+        result = api.engine.send_chunk(markers, timestamps, api._queue)
+        if isinstance(result, StatusRecord):
+            api._reject(result, len(markers))
+            self._error(
+                HTTPStatus.SERVICE_UNAVAILABLE, result.message, {"Retry-After": "1"}
+            )
+            return
+        api.received += len(result)
+        api._dropping = False
+        assigned = [
+            {"seq": record.seq, "timestamp": record.timestamp} for record in result
+        ]
+        self._reply(HTTPStatus.OK, assigned[0] if single else assigned)
+
+    def _method_not_allowed(self) -> None:
+        """Reject any method other than POST."""
+        self._error(
+            HTTPStatus.METHOD_NOT_ALLOWED, "method not allowed", {"Allow": "POST"}
+        )
+
+    do_GET = do_PUT = do_DELETE = do_PATCH = _method_not_allowed
+
+
+class _MarkerHTTPServer(HTTPServer):
+    """HTTP server holding a reference to its HTTPMarkerServer.
+
+    Attributes:
+        api: The thread owning this server.
+    """
+
+    api: "HTTPMarkerServer"
+
+
+class HTTPMarkerServer(threading.Thread):
+    """Thread serving the marker HTTP API.
+
+    Requests are handled one at a time on this thread, which is therefore
+    the only producer of the chunk queue it registers with the engine. Each
+    connection carries a single request, so stop() returns within
+    REQUEST_TIMEOUT even while clients are connected.
+
+    Attributes:
+        engine: The engine markers are sent through.
+        address: The (host, port) the server is bound to. The port is the
+            one actually assigned if port 0 was requested.
+        max_request_size: Largest request body accepted, in bytes.
+        received: Number of markers received and queued.
+        dropped: Number of markers rejected by the engine.
+        on_status: Callback receiving status records raised on the server
+            thread, or None to discard them.
+    """
+
+    def __init__(
+        self,
+        engine: MarkerEngine,
+        host: str = "127.0.0.1",
+        port: int = DEFAULT_HTTP_PORT,
+        queue_capacity: int = 64,
+        max_request_size: int = MAX_REQUEST_SIZE,
+        on_status: Optional[Callable[[StatusRecord], None]] = None,
+    ) -> None:
+        """Bind the HTTP server and register its chunk queue.
+
+        Args:
+            engine: The engine markers are sent through.
+            host: Interface to bind to. Defaults to localhost only.
+            port: TCP port to bind to. 0 picks a free port.
+            queue_capacity: Maximum number of requests whose markers can be
+                waiting for dispatch at once.
+            max_request_size: Largest request body accepted, in bytes.
+            on_status: Optional callback receiving status records raised on
+                the server thread. It is called on the server thread.
+
+        Raises:
+            OSError: If the server cannot be bound.
+        """
+        super().__init__(name="HTTPMarkerServer", daemon=True)
+        self.engine = engine
+        self.max_request_size = max_request_size
+        self.on_status = on_status
+        self.received = 0
+        self.dropped = 0
+        self._dropping = False
+        self._queue = engine.add_chunk_queue(queue_capacity)
+        self._httpd = _MarkerHTTPServer((host, port), _MarkerRequestHandler)
+        self._httpd.api = self
+        self.address: tuple[str, int] = self._httpd.socket.getsockname()[:2]
+
+    def _reject(self, rejection: StatusRecord, count: int) -> None:
+        """Count rejected markers and report the first of a run.
+
+        Args:
+            rejection: The status record explaining the rejection.
+            count: Number of markers rejected.
+        """
+        self.dropped += count
+        if not self._dropping:
+            self._dropping = True
+            if self.on_status is not None:
+                self.on_status(rejection)
+
+    def run(self) -> None:
+        """Serve requests until stop() is called."""
+        if self.on_status is not None:
+            self.on_status(
+                StatusRecord.now(
+                    StatusLevel.INFO,
+                    "Serving marker HTTP API on",
+                    f"http://{self.address[0]}:{self.address[1]}/markers",
+                )
+            )
+        try:
+            self._httpd.serve_forever(poll_interval=0.25)
+        finally:
+            self._httpd.server_close()
+
+    def stop(self) -> None:
+        """Ask the server to exit after the request in progress.
+
+        If the server was never started, its socket is closed right away.
+        """
+        if self.ident is None:
+            self._httpd.server_close()
+        else:
+            self._httpd.shutdown()
@@ -0,0 +1,211 @@
+"""Append-only on-disk journal of dispatched markers.
+
+This module provides a crash-safe session record of every marker pushed to
+the LSL outlet, independent of any recorder attached to the stream. The
+journal is a binary file made of a fixed-size header followed by fixed-size
+records, so it can be appended to cheaply and scanned without parsing.
+
+File layout (all integers little-endian):
+    Header (16 bytes): magic ``b"MOBIMJ01"``, uint32 format version,
+        uint32 record size.
+    Record (256 bytes): uint64 sequence number, float64 LSL timestamp,
+        float64 wall-clock time, uint32 payload length in bytes, and the
+        UTF-8 payload padded with zeros to PAYLOAD_SIZE bytes. Payloads
+        longer than PAYLOAD_SIZE bytes are truncated; the stored length is
+        the length of the full encoded payload.
+
+Writes go through a user-space buffer and are flushed and fsync'd together
+by a background thread every ``sync_interval`` seconds, so durability does
+not cost a system call per marker.
+
+Classes:
+    MarkerJournal: Buffered, group-fsync'd writer for marker journals.
+
+Constants:
+    JOURNAL_MAGIC: Magic bytes at the start of every journal file.
+    JOURNAL_VERSION: Version of the journal file format.
+    HEADER: Struct describing the journal file header.
+    RECORD: Struct describing a single journal record.
+    PAYLOAD_SIZE: Number of payload bytes stored per record.
+    DEFAULT_JOURNAL_DIR: Directory where session journals are created.
+
+Functions:
+    default_journal_path: Path of a new journal for the current session.
+    check_header: Validate the header of an existing journal file.
+"""
+
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, Optional
+
+from mobi_marker.dispatch import MarkerRecord
+
+JOURNAL_MAGIC = b"MOBIMJ01"
+JOURNAL_VERSION = 1
+HEADER = struct.Struct("<8sII")
+RECORD = struct.Struct("<QddI228s")
+PAYLOAD_SIZE = 228
+
+# Directory where new session journals are created
+DEFAULT_JOURNAL_DIR = Path.home() / ".mobi_marker" / "journals"
+
+
+def default_journal_path() -> Path:
+    """Return the path of a new journal for the current session.
+
+    The name holds the start time to the microsecond and the process id, so
+    sessions started in the same second, in one process or side by side,
+    never append to the same journal.
+
+    Returns:
+        A timestamped path inside DEFAULT_JOURNAL_DIR.
+    """
+    started = f"{datetime.now():%Y%m%d-%H%M%S-%f}"
+    return DEFAULT_JOURNAL_DIR / f"session-{started}-{os.getpid()}.mbj"
+
+
+def check_header(path: str | os.PathLike[str]) -> None:
+    """Validate the header of an existing journal file.
+
+    Args:
+        path: Path of the journal file.
+
+    Raises:
+        ValueError: If the file is not a compatible marker journal.
+    """
+    with open(path, "rb") as existing:
+        header = existing.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path} is not a marker journal")
+    magic, version, record_size = HEADER.unpack(header)
+    if magic != JOURNAL_MAGIC or record_size != RECORD.size:
+        raise ValueError(f"{path} is not a marker journal")
+    if version != JOURNAL_VERSION:
+        raise ValueError(
+            f"{path} uses journal format version {version}, expected {JOURNAL_VERSION}"
+        )
+
+
+class MarkerJournal:
+    """Buffered, group-fsync'd writer for marker journals.
+
+    Records are appended from the dispatch thread through a buffered file.
+    A background thread flushes the buffer and fsyncs the file every
+    ``sync_interval`` seconds, so a crash loses at most that much history.
+
+    Attributes:
+        path: Path of the journal file.
+        sync_interval: Seconds between two group fsyncs. If 0, every write
+            is flushed and fsync'd before it returns.
+        records_written: Number of records written since the journal was
+            opened.
+        records_synced: Number of those records known to be on disk.
+        last_sync: time.monotonic() of the last completed fsync.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        sync_interval: float = 1.0,
+        buffer_size: int = 64 * 1024,
+    ) -> None:
+        """Open a journal for appending, creating it if needed.
+
+        Args:
+            path: Path of the journal file. Missing parent directories are
+                created.
+            sync_interval: Seconds between two group fsyncs. If 0, every
+                write is flushed and fsync'd before it returns.
+            buffer_size: Size in bytes of the user-space write buffer.
+
+        Raises:
+            ValueError: If sync_interval is negative or the file exists but
+                is not a compatible marker journal.
+            OSError: If the file cannot be opened.
+        """
+        if sync_interval < 0:
+            raise ValueError(f"sync_interval must not be negative, got {sync_interval}")
+        self.path = Path(path)
+        self.sync_interval = sync_interval
+        self.records_written = 0
+        self.records_synced = 0
+        self.last_sync = time.monotonic()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists() and self.path.stat().st_size > 0:
+            check_header(self.path)
+            self._drop_partial_record()
+        self._file = open(self.path, "ab", buffering=buffer_size)
+        if self._file.tell() == 0:
+            self._file.write(HEADER.pack(JOURNAL_MAGIC, JOURNAL_VERSION, RECORD.size))
+
+        self._sync_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._syncer: Optional[threading.Thread] = None
+        if sync_interval > 0:
+            self._syncer = threading.Thread(
+                target=self._sync_loop, name="MarkerJournalSync", daemon=True
+            )
+            self._syncer.start()
+
+    def _drop_partial_record(self) -> None:
+        """Truncate a record left half-written by a crash.
+
+        Appending after a partial record would misalign every following
+        record, so the file is cut back to the last complete record.
+        """
+        size = self.path.stat().st_size
+        excess = (size - HEADER.size) % RECORD.size
+        if excess:
+            os.truncate(self.path, size - excess)
+
+    def write(self, records: Iterable[MarkerRecord], wall_time: float) -> None:
+        """Append marker records to the journal.
+
+        Args:
+            records: The dispatched marker records.
+            wall_time: Wall-clock time of the dispatch, as returned by
+                time.time().
+        """
+        written = 0
+        for record in records:
+            payload = record.marker.encode("utf-8")
+            self._file.write(
+                RECORD.pack(
+                    record.seq, record.timestamp, wall_time, len(payload), payload
+                )
+            )
+            written += 1
+        self.records_written += written
+        if self.sync_interval == 0:
+            self.sync()
+
+    def sync(self) -> None:
+        """Flush buffered records and fsync them to disk."""
+        with self._sync_lock:
+            if self._file.closed:
+                return
+            pending = self.records_written
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.records_synced = pending
+            self.last_sync = time.monotonic()
+
+    def _sync_loop(self) -> None:
+        """Group-fsync the journal every sync_interval seconds until closed."""
+        while not self._closed.wait(self.sync_interval):
+            if self.records_synced != self.records_written:
+                self.sync()
+
+    def close(self) -> None:
+        """Sync outstanding records and close the journal."""
+        self._closed.set()
+        if self._syncer is not None:
+            self._syncer.join()
+        self.sync()
+        with self._sync_lock:
+            self._file.close()
@@ -0,0 +1,181 @@
+"""Memory-mapped reader for marker journals.
+
+This module provides fast, read-only access to journals written by
+mobi_marker.journal.MarkerJournal. The journal file is memory-mapped and its
+records are exposed as a NumPy structured array viewing the mapping directly,
+so scanning timestamps or sequence numbers of a multi-gigabyte session does
+not copy or parse the file. Payloads are only decoded when asked for.
+
+Classes:
+    JournalEntry: A single decoded journal record.
+    JournalReader: Zero-copy, memory-mapped view of a marker journal.
+
+Constants:
+    JOURNAL_DTYPE: NumPy dtype matching one journal record.
+"""
+
+import mmap
+import os
+from pathlib import Path
+from types import TracebackType
+from typing import Iterator, NamedTuple, Optional
+
+import numpy as np
+
+from mobi_marker.journal import HEADER, PAYLOAD_SIZE, RECORD, check_header
+
+JOURNAL_DTYPE = np.dtype(
+    [
+        ("seq", "<u8"),
+        ("lsl_time", "<f8"),
+        ("wall_time", "<f8"),
+        ("length", "<u4"),
+        ("payload", f"S{PAYLOAD_SIZE}"),
+    ]
+)
+assert JOURNAL_DTYPE.itemsize == RECORD.size
+
+
+class JournalEntry(NamedTuple):
+    """A single decoded journal record.
+
+    Attributes:
+        seq: Sequence number of the marker.
+        lsl_time: LSL timestamp the marker was pushed with.
+        wall_time: Wall-clock time the marker was dispatched.
+        marker: The decoded marker payload.
+    """
+
+    seq: int
+    lsl_time: float
+    wall_time: float
+    marker: str
+
+
+class JournalReader:
+    """Zero-copy, memory-mapped view of a marker journal.
+
+    Only complete records are exposed; a record left half-written by a
+    crash is ignored. Array views returned by this class reference the
+    mapping directly; one still held after close() keeps the mapping alive
+    until it is garbage collected.
+
+    Attributes:
+        path: Path of the journal file.
+        records: Structured array of all records, with the fields of
+            JOURNAL_DTYPE.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        """Open and memory-map a journal.
+
+        Args:
+            path: Path of the journal file.
+
+        Raises:
+            ValueError: If the file is not a compatible marker journal.
+            OSError: If the file cannot be opened.
+        """
+        self.path = Path(path)
+        check_header(self.path)
+        with open(self.path, "rb") as journal_file:
+            self._mmap = mmap.mmap(journal_file.fileno(), 0, access=mmap.ACCESS_READ)
+        count = (len(self._mmap) - HEADER.size) // RECORD.size
+        self.records: np.ndarray = np.frombuffer(
+            self._mmap, dtype=JOURNAL_DTYPE, count=count, offset=HEADER.size
+        )
+
+    def __len__(self) -> int:
+        """Return the number of complete records in the journal."""
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[JournalEntry]:
+        """Iterate over all records, decoding payloads one at a time.
+
+        Yields:
+            The journal entries in file order.
+        """
+        for index in range(len(self.records)):
+            yield self.entry(index)
+
+    def __enter__(self) -> "JournalReader":
+        """Return the reader for use as a context manager."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Close the reader when leaving the context."""
+        self.close()
+
+    @property
+    def seq(self) -> np.ndarray:
+        """Sequence numbers of all records, as a view into the mapping."""
+        return self.records["seq"]
+
+    @property
+    def lsl_time(self) -> np.ndarray:
+        """LSL timestamps of all records, as a view into the mapping."""
+        return self.records["lsl_time"]
+
+    @property
+    def wall_time(self) -> np.ndarray:
+        """Wall-clock dispatch times of all records, as a view into the mapping."""
+        return self.records["wall_time"]
+
+    def truncated(self, index: int) -> bool:
+        """Return whether a record's payload was truncated when journaled.
+
+        Args:
+            index: Index of the record.
+
+        Returns:
+            True if the original payload was longer than PAYLOAD_SIZE bytes.
+        """
+        return bool(self.records["length"][index] > PAYLOAD_SIZE)
+
+    def payload(self, index: int) -> str:
+        """Decode the marker payload of a single record.
+
+        Args:
+            index: Index of the record.
+
+        Returns:
+            The decoded marker. A truncated payload is cut at the last
+            complete UTF-8 character.
+        """
+        record = self.records[index]
+        length = min(int(record["length"]), PAYLOAD_SIZE)
+        return bytes(record["payload"][:length]).decode("utf-8", errors="ignore")
+
+    def entry(self, index: int) -> JournalEntry:
+        """Return a single decoded record.
+
+        Args:
+            index: Index of the record.
+
+        Returns:
+            The journal entry.
+        """
+        record = self.records[index]
+        return JournalEntry(
+            int(record["seq"]),
+            float(record["lsl_time"]),
+            float(record["wall_time"]),
+            self.payload(index),
+        )
+
+    def close(self) -> None:
+        """Release the array views and unmap the journal.
+
+        If the caller still holds a view, the journal is unmapped once the
+        last view is garbage collected instead.
+        """
+        self.records = np.empty(0, dtype=JOURNAL_DTYPE)
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass
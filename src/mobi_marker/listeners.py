@@ -0,0 +1,84 @@
+"""Start the network listeners that receive markers.
+
+This module opens the UDP listener, the TCP and WebSocket server and the
+HTTP API on request. Each of them is only imported when its port is set, so
+enabling the UDP listener alone does not load asyncio or http.server.
+
+Functions:
+    start_listeners: Open and start the requested network listeners.
+
+Constants:
+    DEFAULT_SERVER_HOST: Interface the listeners bind to by default.
+"""
+
+from typing import TYPE_CHECKING, Callable, Optional
+
+from mobi_marker.engine import MarkerEngine
+from mobi_marker.status import StatusRecord
+
+if TYPE_CHECKING:
+    from mobi_marker.http_api import HTTPMarkerServer
+    from mobi_marker.server import MarkerServer
+    from mobi_marker.udp import UDPMarkerListener
+
+# Only accept clients from the local machine unless told otherwise
+DEFAULT_SERVER_HOST = "127.0.0.1"
+
+
+def start_listeners(
+    engine: MarkerEngine,
+    host: str = DEFAULT_SERVER_HOST,
+    udp_port: Optional[int] = None,
+    tcp_port: Optional[int] = None,
+    ws_port: Optional[int] = None,
+    http_port: Optional[int] = None,
+    on_status: Optional[Callable[[StatusRecord], None]] = None,
+) -> list["UDPMarkerListener | MarkerServer | HTTPMarkerServer"]:
+    """Open and start the requested network listeners.
+
+    Args:
+        engine: The engine received markers are sent through.
+        host: Interface the listeners bind to.
+        udp_port: UDP port, or None to disable the UDP listener.
+        tcp_port: TCP port, or None to disable the TCP endpoint.
+        ws_port: WebSocket port, or None to disable the WebSocket endpoint.
+        http_port: HTTP port, or None to disable the HTTP API.
+        on_status: Optional callback receiving status records raised on the
+            listener threads.
+
+    Returns:
+        The started listeners, to be stopped and joined by the caller.
+
+    Raises:
+        OSError: If a port cannot be opened. Listeners opened before the
+            failure are closed again.
+    """
+    listeners: list[UDPMarkerListener | MarkerServer | HTTPMarkerServer] = []
+    try:
+        if udp_port is not None:
+            from mobi_marker import udp
+
+            listeners.append(
+                udp.UDPMarkerListener(engine, host, udp_port, on_status=on_status)
+            )
+        if tcp_port is not None or ws_port is not None:
+            from mobi_marker import server
+
+            listeners.append(
+                server.MarkerServer(
+                    engine, host, tcp_port, ws_port, on_status=on_status
+                )
+            )
+        if http_port is not None:
+            from mobi_marker import http_api
+
+            listeners.append(
+                http_api.HTTPMarkerServer(engine, host, http_port, on_status=on_status)
+            )
+    except OSError:
+        for listener in listeners:
+            listener.stop()
+        raise
+    for listener in listeners:
+        listener.start()
+    return listeners
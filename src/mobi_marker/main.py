@@ -1,13 +1,206 @@
-"""Main entry point for the MoBI Marker GUI application.
+"""Main entry point for the MoBI Marker application.
 
 This module serves as the command-line entry point for the MoBI Marker
-GUI application. It imports and executes the main GUI function.
+application. It parses the command line and launches either the GUI or,
+with ``--headless``, the marker outlet without any GUI. Neither PyQt6 nor
+the GUI module is imported in headless mode.
 
 Functions:
-    main: Entry point that launches the GUI application.
+    build_parser: Build the command-line argument parser.
+    main: Entry point that launches the GUI or headless application.
 """
 
-from mobi_marker.gui import main
+import argparse
+import sys
+from typing import Optional, Sequence
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line argument parser.
+
+    Returns:
+        The argument parser for the mobi-marker command.
+    """
+    parser = argparse.ArgumentParser(
+        prog="mobi-marker",
+        description="Send LSL event markers from a GUI or a script.",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="run the LSL outlet without a GUI, reading one marker per line "
+        "from standard input",
+    )
+    journal = parser.add_mutually_exclusive_group()
+    journal.add_argument(
+        "--journal",
+        metavar="PATH",
+        help="path of the session journal (default: a new file in "
+        "~/.mobi_marker/journals)",
+    )
+    journal.add_argument(
+        "--no-journal", action="store_true", help="do not journal sent markers"
+    )
+    parser.add_argument(
+        "--udp-port",
+        type=int,
+        metavar="PORT",
+        help="also receive markers as UDP datagrams on this port, one marker "
+        "per datagram",
+    )
+    parser.add_argument(
+        "--tcp-port",
+        type=int,
+        metavar="PORT",
+        help="also accept newline-delimited markers from TCP clients on this port",
+    )
+    parser.add_argument(
+        "--ws-port",
+        type=int,
+        metavar="PORT",
+        help="also accept markers from WebSocket clients on this port, one "
+        "marker per text message",
+    )
+    parser.add_argument(
+        "--http-port",
+        type=int,
+        metavar="PORT",
+        help="also serve the marker HTTP API (POST /markers) on this port",
+    )
+    parser.add_argument(
+        "--host",
+        default="127.0.0.1",
+        help="interface the network listeners bind to (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--hold-until-consumers",
+        action="store_true",
+        help="hold markers while no recorder is connected to the stream and "
+        "send them as soon as one connects",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="PATH",
+        help="record the marker stream into this new XDF file",
+    )
+    parser.add_argument(
+        "--record-stream",
+        action="append",
+        default=[],
+        metavar="NAME",
+        help="also record the LSL stream with this name; may be repeated",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="NAME_OR_PATH",
+        help="marker profile (TOML or JSON) configuring the quick markers, "
+        "hotkeys and modalities; a name is looked up in ~/.mobi_marker/profiles",
+    )
+    parser.add_argument(
+        "--protocol",
+        metavar="PATH",
+        help="timed marker protocol (TOML or JSON) to run; headless mode runs "
+        "it right away, the GUI when it is started",
+    )
+    parser.add_argument(
+        "--instrument",
+        action="store_true",
+        help="record hot-path latency histograms and counters, shown in the "
+        "status bar or, in headless mode, on exit",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="serve Prometheus metrics (GET /metrics) on this port; implies "
+        "--instrument",
+    )
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Entry point that launches the GUI or headless application.
+
+    Args:
+        argv: Command-line arguments, excluding the program name. Defaults
+            to sys.argv[1:]. Arguments not recognized here are passed on to
+            Qt in GUI mode.
+
+    Raises:
+        SystemExit: When the application exits.
+    """
+    parser = build_parser()
+    args, qt_args = parser.parse_known_args(argv)
+    if args.record_stream and not args.record:
+        parser.error("--record-stream requires --record")
+
+    protocol = None
+    if args.protocol:
+        from mobi_marker.scheduler import load_protocol
+
+        try:
+            protocol = load_protocol(args.protocol)
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+
+    if args.headless:
+        if qt_args:
+            parser.error(f"unrecognized arguments: {' '.join(qt_args)}")
+        if args.profile:
+            parser.error("--profile is only used by the GUI")
+
+        from mobi_marker.headless import run_headless
+        from mobi_marker.journal import default_journal_path
+
+        journal_path = None
+        if not args.no_journal:
+            journal_path = args.journal or default_journal_path()
+        sys.exit(
+            run_headless(
+                journal_path,
+                host=args.host,
+                udp_port=args.udp_port,
+                tcp_port=args.tcp_port,
+                ws_port=args.ws_port,
+                http_port=args.http_port,
+                instrument=args.instrument,
+                metrics_port=args.metrics_port,
+                record_path=args.record,
+                record_streams=args.record_stream,
+                hold_until_consumers=args.hold_until_consumers,
+                protocol=protocol,
+            )
+        )
+
+    from mobi_marker.profile import DEFAULT_PROFILE, load_profile, resolve_profile
+
+    profile = DEFAULT_PROFILE
+    if args.profile:
+        try:
+            profile = load_profile(resolve_profile(args.profile))
+        except (OSError, ValueError) as e:
+            parser.error(str(e))
+
+    from mobi_marker.gui import main as gui_main
+
+    gui_main(
+        [sys.argv[0], *qt_args],
+        args.journal,
+        not args.no_journal,
+        host=args.host,
+        udp_port=args.udp_port,
+        tcp_port=args.tcp_port,
+        ws_port=args.ws_port,
+        http_port=args.http_port,
+        instrument=args.instrument,
+        metrics_port=args.metrics_port,
+        profile=profile,
+        record_path=args.record,
+        record_streams=args.record_stream,
+        hold_until_consumers=args.hold_until_consumers,
+        protocol=protocol,
+    )
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,433 @@
+"""Optional hot-path instrumentation for the LSL marker application.
+
+This module provides fixed-bucket, HDR-style latency histograms and
+monotonic counters for the points where marker time is spent: enqueueing a
+marker, waiting for dispatch, pushing to the outlet, formatting status
+lines and firing protocol markers on time, plus gauges sampled by the
+dispatch loop and the clock monitor.
+Histograms use log-linear buckets - 16 linear sub-buckets per power of two,
+so any recorded value is off by at most 1/16 - stored in a preallocated
+array, so recording a value is a few integer operations and never grows
+any storage.
+
+Instrumentation is optional. Components take a ``metrics`` argument that
+defaults to None; without it they skip every timing call, and the engine
+does not even wrap send_marker().
+
+Histograms and counters are not locked. A value recorded concurrently from
+two threads can very rarely be lost, which is acceptable for diagnostics
+but means counts are not exact under heavy multi-producer load.
+
+Classes:
+    Counter: Monotonic event counter.
+    Gauge: Most recently sampled value of a quantity.
+    Histogram: Fixed-bucket log-linear histogram of nanosecond durations.
+    HistogramSnapshot: Immutable copy of a histogram's state.
+    MetricsSnapshot: Immutable copy of all instrumentation data.
+    Metrics: The application's histograms and counters.
+
+Functions:
+    bucket_index: Return the histogram bucket holding a value.
+    bucket_lower_bound: Return the smallest value stored in a bucket.
+
+Constants:
+    SUB_BUCKETS: Number of linear sub-buckets per power of two.
+    BUCKET_COUNT: Total number of histogram buckets.
+"""
+
+import math
+import time
+from array import array
+from typing import NamedTuple
+
+_SUB_BITS = 4
+SUB_BUCKETS = 1 << _SUB_BITS
+# Enough powers of two to cover durations of up to 2**40 ns (about 18 min)
+BUCKET_COUNT = SUB_BUCKETS * 40
+_NO_MIN = 1 << 62
+
+
+def bucket_index(value: int) -> int:
+    """Return the histogram bucket holding a value.
+
+    Args:
+        value: A non-negative duration in nanoseconds.
+
+    Returns:
+        The bucket index, clamped to the last bucket.
+    """
+    if value < SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - _SUB_BITS - 1
+    index = ((shift + 1) << _SUB_BITS) + (value >> shift) - SUB_BUCKETS
+    return index if index < BUCKET_COUNT else BUCKET_COUNT - 1
+
+
+def bucket_lower_bound(index: int) -> int:
+    """Return the smallest value stored in a histogram bucket.
+
+    Args:
+        index: The bucket index.
+
+    Returns:
+        The bucket's inclusive lower bound in nanoseconds.
+    """
+    if index < SUB_BUCKETS:
+        return index
+    shift = (index >> _SUB_BITS) - 1
+    return (SUB_BUCKETS + (index & (SUB_BUCKETS - 1))) << shift
+
+
+# Largest value a histogram records; larger values are clamped to it
+_MAX_VALUE = bucket_lower_bound(BUCKET_COUNT) - 1
+
+
+class Counter:
+    """Monotonic event counter.
+
+    Attributes:
+        name: Name of the counter.
+        description: What the counter counts.
+        value: Number of events counted so far.
+    """
+
+    __slots__ = ("description", "name", "value")
+
+    def __init__(self, name: str, description: str) -> None:
+        """Initialize the counter at zero.
+
+        Args:
+            name: Name of the counter.
+            description: What the counter counts.
+        """
+        self.name = name
+        self.description = description
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        """Count events.
+
+        Args:
+            amount: Number of events to add.
+        """
+        self.value += amount
+
+
+class Gauge:
+    """Most recently sampled value of a quantity.
+
+    Attributes:
+        name: Name of the gauge.
+        description: What the gauge measures.
+        value: The most recently sampled value.
+    """
+
+    __slots__ = ("description", "name", "value")
+
+    def __init__(self, name: str, description: str) -> None:
+        """Initialize the gauge at zero.
+
+        Args:
+            name: Name of the gauge.
+            description: What the gauge measures.
+        """
+        self.name = name
+        self.description = description
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        """Store a newly sampled value.
+
+        Args:
+            value: The sampled value.
+        """
+        self.value = value
+
+
+class HistogramSnapshot(NamedTuple):
+    """Immutable copy of a histogram's state.
+
+    Attributes:
+        samples: Number of recorded values.
+        total: Sum of all recorded values, in nanoseconds.
+        min: Smallest recorded value, or 0 if there is none.
+        max: Largest recorded value, or 0 if there is none.
+        counts: Number of values in each bucket.
+    """
+
+    samples: int
+    total: int
+    min: int
+    max: int
+    counts: tuple[int, ...]
+
+    @property
+    def mean(self) -> float:
+        """Mean of the recorded values in nanoseconds, or 0 if empty."""
+        return self.total / self.samples if self.samples else 0.0
+
+    def percentile(self, percent: float) -> int:
+        """Return a percentile of the recorded values.
+
+        Args:
+            percent: The percentile to compute, between 0 and 100.
+
+        Returns:
+            The highest value equivalent to the percentile's bucket, in
+            nanoseconds and clamped to the recorded range, or 0 if the
+            histogram is empty.
+        """
+        if not self.samples:
+            return 0
+        rank = max(1, -(-self.samples * percent // 100))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                upper = bucket_lower_bound(index + 1) - 1
+                return max(self.min, min(upper, self.max))
+        return self.max
+
+
+class Histogram:
+    """Fixed-bucket log-linear histogram of nanosecond durations.
+
+    Attributes:
+        name: Name of the histogram.
+        description: What the histogram measures.
+        counts: Preallocated number of values in each bucket.
+        samples: Number of recorded values.
+        total: Sum of all recorded values, in nanoseconds.
+        min: Smallest recorded value.
+        max: Largest recorded value.
+    """
+
+    __slots__ = ("counts", "description", "max", "min", "name", "samples", "total")
+
+    def __init__(self, name: str, description: str) -> None:
+        """Initialize an empty histogram.
+
+        Args:
+            name: Name of the histogram.
+            description: What the histogram measures.
+        """
+        self.name = name
+        self.description = description
+        self.counts = array("Q", bytes(8 * BUCKET_COUNT))
+        self.samples = 0
+        self.total = 0
+        self.min = _NO_MIN
+        self.max = 0
+
+    def record(self, value: int) -> None:
+        """Record a duration.
+
+        Args:
+            value: The duration in nanoseconds. Negative values, e.g. from
+                clock adjustments, are recorded as 0, and values beyond the
+                last bucket as the largest value it holds.
+        """
+        if value < 0:
+            value = 0
+        elif value > _MAX_VALUE:
+            value = _MAX_VALUE
+        self.counts[bucket_index(value)] += 1
+        self.samples += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        if value < self.min:
+            self.min = value
+
+    def record_seconds(self, seconds: float) -> None:
+        """Record a duration measured in seconds.
+
+        Durations computed from timestamps supplied by clients can be
+        anything, so NaN is skipped and infinities are clamped like any
+        other out-of-range value, instead of raising.
+
+        Args:
+            seconds: The duration in seconds.
+        """
+        if math.isnan(seconds):
+            return
+        self.record(int(max(0.0, min(seconds, _MAX_VALUE / 1e9)) * 1e9))
+
+    def snapshot(self) -> HistogramSnapshot:
+        """Return an immutable copy of the histogram's state."""
+        return HistogramSnapshot(
+            self.samples,
+            self.total,
+            self.min if self.samples else 0,
+            self.max,
+            tuple(self.counts),
+        )
+
+
+class MetricsSnapshot(NamedTuple):
+    """Immutable copy of all instrumentation data.
+
+    Attributes:
+        time: time.monotonic() at which the snapshot was taken.
+        counters: Value of every counter, by name.
+        gauges: Value of every gauge, by name.
+        histograms: Snapshot of every histogram, by name.
+    """
+
+    time: float
+    counters: dict[str, int]
+    gauges: dict[str, float]
+    histograms: dict[str, HistogramSnapshot]
+
+    def readout(self) -> str:
+        """Summarize the snapshot on one line, e.g. for a status bar.
+
+        Returns:
+            Markers sent, errors and the main latency percentiles.
+        """
+        push = self.histograms["push"]
+        dispatch = self.histograms["dispatch"]
+        return (
+            f"Sent {self.counters['markers_sent']:,} | "
+            f"Rejected {self.counters['markers_rejected']:,} | "
+            f"Errors {self.counters['send_errors']:,} | "
+            f"push p50 {_format_duration(push.percentile(50))} "
+            f"p99 {_format_duration(push.percentile(99))} | "
+            f"event-to-push p99 {_format_duration(dispatch.percentile(99))}"
+        )
+
+
+def _format_duration(nanoseconds: int) -> str:
+    """Format a duration with a readable unit.
+
+    Args:
+        nanoseconds: The duration in nanoseconds.
+
+    Returns:
+        The duration in µs below one millisecond, otherwise in ms.
+    """
+    if nanoseconds < 1_000_000:
+        return f"{nanoseconds / 1000:.1f} µs"
+    return f"{nanoseconds / 1_000_000:.2f} ms"
+
+
+class Metrics:
+    """The application's histograms and counters.
+
+    Attributes:
+        enqueue: Duration of send_marker() calls on the producer threads.
+        dispatch: Delay from each marker's event timestamp to its push.
+        push: Duration of push_sample() and push_chunk() calls.
+        status_format: Duration of formatting a status log line.
+        schedule: Delay from a protocol marker's deadline to its sending.
+        markers_enqueued: Markers accepted by send_marker().
+        markers_rejected: Markers rejected by send_marker().
+        markers_sent: Markers pushed to the outlet.
+        pushes: push_sample() and push_chunk() calls.
+        send_errors: Failed push_sample() and push_chunk() calls.
+        queue_depth: Markers and chunks found waiting in the dispatch
+            queues when the dispatch loop last woke up.
+        have_consumers: 1 if the outlet had consumers when last sampled,
+            otherwise 0.
+        journal_fsync_lag: Seconds since the journal was last fsync'd while
+            it holds records not yet on disk, otherwise 0.
+        clock_divergence: Change of the wall-clock to LSL clock offset since
+            the clock monitor started, in seconds.
+        clock_drift: Fitted drift of the wall clock against the LSL clock,
+            in parts per million.
+        clock_jitter: Standard deviation of the wall-clock to LSL clock
+            offset around the fitted drift, in seconds.
+    """
+
+    def __init__(self) -> None:
+        """Create empty histograms and zeroed counters."""
+        self.enqueue = Histogram("enqueue", "Duration of send_marker() calls")
+        self.dispatch = Histogram(
+            "dispatch", "Delay from a marker's event timestamp to its push"
+        )
+        self.push = Histogram("push", "Duration of push_sample() and push_chunk()")
+        self.status_format = Histogram(
+            "status_format", "Duration of formatting a status log line"
+        )
+        self.schedule = Histogram(
+            "schedule", "Delay from a protocol marker's deadline to its sending"
+        )
+        self.markers_enqueued = Counter(
+            "markers_enqueued", "Markers accepted by send_marker()"
+        )
+        self.markers_rejected = Counter(
+            "markers_rejected", "Markers rejected by send_marker()"
+        )
+        self.markers_sent = Counter("markers_sent", "Markers pushed to the outlet")
+        self.pushes = Counter("pushes", "push_sample() and push_chunk() calls")
+        self.send_errors = Counter(
+            "send_errors", "Failed push_sample() and push_chunk() calls"
+        )
+        self.queue_depth = Gauge(
+            "queue_depth", "Markers and chunks waiting in the dispatch queues"
+        )
+        self.have_consumers = Gauge(
+            "have_consumers", "Whether the LSL outlet has consumers"
+        )
+        self.journal_fsync_lag = Gauge(
+            "journal_fsync_lag_seconds",
+            "Seconds since the last journal fsync while writes are pending",
+        )
+        self.clock_divergence = Gauge(
+            "clock_divergence_seconds",
+            "Change of the wall-clock to LSL clock offset since startup",
+        )
+        self.clock_drift = Gauge(
+            "clock_drift_ppm", "Drift of the wall clock against the LSL clock"
+        )
+        self.clock_jitter = Gauge(
+            "clock_jitter_seconds",
+            "Jitter of the wall-clock to LSL clock offset around its drift",
+        )
+
+    @property
+    def histograms(self) -> tuple[Histogram, ...]:
+        """All histograms."""
+        return (
+            self.enqueue,
+            self.dispatch,
+            self.push,
+            self.status_format,
+            self.schedule,
+        )
+
+    @property
+    def counters(self) -> tuple[Counter, ...]:
+        """All counters."""
+        return (
+            self.markers_enqueued,
+            self.markers_rejected,
+            self.markers_sent,
+            self.pushes,
+            self.send_errors,
+        )
+
+    @property
+    def gauges(self) -> tuple[Gauge, ...]:
+        """All gauges."""
+        return (
+            self.queue_depth,
+            self.have_consumers,
+            self.journal_fsync_lag,
+            self.clock_divergence,
+            self.clock_drift,
+            self.clock_jitter,
+        )
+
+    def snapshot(self) -> MetricsSnapshot:
+        """Return an immutable copy of all histograms, counters and gauges.
+
+        Safe to call from any thread; values recorded while the snapshot is
+        taken may or may not be included.
+        """
+        return MetricsSnapshot(
+            time.monotonic(),
+            {counter.name: counter.value for counter in self.counters},
+            {gauge.name: gauge.value for gauge in self.gauges},
+            {histogram.name: histogram.snapshot() for histogram in self.histograms},
+        )
@@ -0,0 +1,217 @@
+"""Several concurrent LSL marker streams, each with its own dispatch thread.
+
+This module lets one process publish separate marker streams per subsystem,
+e.g. behavioral events, hardware sync pulses and operator notes. Each
+stream is a MarkerEngine with its own outlet, dispatch queues and dispatch
+thread, so a burst of markers or a slow push on one stream never delays
+another. Markers are routed to a stream by its key. The manager is meant
+for scripts; the GUI and headless mode publish a single stream.
+
+Example:
+    Publishing two streams from a script::
+
+        manager = OutletManager(
+            [
+                StreamSpec("behavior", "MobiBehavior"),
+                StreamSpec("sync", "MobiSync"),
+            ]
+        )
+        manager.start()
+        manager.wait_started()
+        manager.send_marker("sync", "PULSE")
+        manager.stop()
+
+Classes:
+    StreamSpec: Configuration of one marker stream.
+    OutletManager: Marker engines of several streams, routed by key.
+"""
+
+import functools
+import threading
+import time
+from typing import Callable, Iterable, Mapping, NamedTuple, Optional
+
+from mobi_marker.dispatch import MarkerRecord, SPSCQueue
+from mobi_marker.engine import DEFAULT_SOURCE_ID, MarkerEngine
+from mobi_marker.journal import MarkerJournal
+from mobi_marker.metrics import Metrics
+from mobi_marker.status import StatusLevel, StatusRecord
+
+
+class StreamSpec(NamedTuple):
+    """Configuration of one marker stream.
+
+    Attributes:
+        key: Key markers are routed to the stream by.
+        name: Name of the LSL stream.
+        source_id: Source ID of the LSL stream, or None to derive a unique
+            one from the key.
+        journal: Journal the stream's pushed markers are appended to, or
+            None. Every stream needs a journal of its own.
+        metrics: Instrumentation the stream's timings are recorded into, or
+            None. Every stream needs metrics of its own, since the gauges
+            describe a single engine.
+    """
+
+    key: str
+    name: str
+    source_id: Optional[str] = None
+    journal: Optional[MarkerJournal] = None
+    metrics: Optional[Metrics] = None
+
+
+class OutletManager:
+    """Marker engines of several streams, routed by key.
+
+    start() runs every engine on a dedicated thread. Producers send markers
+    with send_marker(), naming the stream by its key. Like a single engine's
+    default queue, each stream's default queue serves one producer thread;
+    other producers register queues on the stream's engine with
+    MarkerEngine.add_queue() and pass them to send_marker().
+
+    Attributes:
+        engines: The engine of each stream, by key, in the given order.
+        on_status: Callback receiving the key of a stream and lists of
+            status records raised on its dispatch thread, or None.
+    """
+
+    def __init__(
+        self,
+        streams: Iterable[StreamSpec],
+        on_status: Optional[Callable[[str, list[StatusRecord]], None]] = None,
+        queue_capacity: int = 4096,
+        max_batch_size: int = 64,
+        max_linger: float = 0.0,
+        status_interval: float = 1 / 60,
+    ) -> None:
+        """Create an engine for every stream.
+
+        Args:
+            streams: The streams to publish.
+            on_status: Optional callback receiving the key of a stream and
+                lists of status records raised on its dispatch thread. It
+                is called on that stream's dispatch thread, so it may be
+                called from several threads at once.
+            queue_capacity: Capacity of each stream's default queue.
+            max_batch_size: Maximum number of markers each engine pushes as
+                one chunk.
+            max_linger: Seconds each engine may wait to fill a batch.
+            status_interval: Minimum number of seconds between two status
+                deliveries of one stream.
+
+        Raises:
+            ValueError: If there are no streams, or two streams share a key,
+                a name or a source ID.
+        """
+        streams = list(streams)
+        if not streams:
+            raise ValueError("At least one stream is required")
+        source_ids = [
+            spec.source_id or f"{DEFAULT_SOURCE_ID}_{spec.key}" for spec in streams
+        ]
+        for field, values in (
+            ("key", [spec.key for spec in streams]),
+            ("name", [spec.name for spec in streams]),
+            ("source ID", source_ids),
+        ):
+            if len(set(values)) != len(values):
+                raise ValueError(f"Every stream needs a unique {field}")
+
+        self.on_status = on_status
+        self.engines: Mapping[str, MarkerEngine] = {
+            spec.key: MarkerEngine(
+                queue_capacity=queue_capacity,
+                max_batch_size=max_batch_size,
+                max_linger=max_linger,
+                status_interval=status_interval,
+                journal=spec.journal,
+                on_status=functools.partial(self._deliver_status, spec.key),
+                stream_name=spec.name,
+                source_id=source_id,
+                metrics=spec.metrics,
+            )
+            for spec, source_id in zip(streams, source_ids)
+        }
+        self._threads: list[threading.Thread] = []
+
+    def _deliver_status(self, key: str, records: list[StatusRecord]) -> None:
+        """Forward a stream's status records to on_status.
+
+        Args:
+            key: Key of the stream that raised the records.
+            records: The status records, oldest first.
+        """
+        if self.on_status is not None:
+            self.on_status(key, records)
+
+    def start(self) -> None:
+        """Start the dispatch thread of every stream.
+
+        Raises:
+            RuntimeError: If the manager was already started.
+        """
+        if self._threads:
+            raise RuntimeError("The outlet manager was already started")
+        self._threads = [
+            threading.Thread(target=engine.run, name=f"MarkerEngine-{key}")
+            for key, engine in self.engines.items()
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def wait_started(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every engine has tried to create its outlet.
+
+        Args:
+            timeout: Seconds to wait for all engines together, or None to
+                wait indefinitely.
+
+        Returns:
+            Whether every stream's outlet was created within the timeout.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for engine in self.engines.values():
+            remaining = (
+                None if deadline is None else max(0.0, deadline - time.monotonic())
+            )
+            if not engine.started.wait(remaining) or engine.outlet is None:
+                return False
+        return True
+
+    def send_marker(
+        self,
+        key: str,
+        marker: str,
+        timestamp: Optional[float] = None,
+        queue: Optional[SPSCQueue[MarkerRecord]] = None,
+    ) -> Optional[StatusRecord]:
+        """Queue a marker for dispatch through one stream.
+
+        Args:
+            key: Key of the stream to send the marker through.
+            marker: The marker string.
+            timestamp: LSL timestamp of the event the marker describes, as
+                returned by local_clock(). Defaults to the current time.
+            queue: The calling producer's queue from the stream engine's
+                add_queue(). Defaults to the stream's default queue.
+
+        Returns:
+            None if the marker was queued, otherwise a status record
+            explaining why it was rejected: the stream is unknown or not
+            active, or its dispatch queue is full.
+        """
+        engine = self.engines.get(key)
+        if engine is None:
+            return StatusRecord.now(StatusLevel.ERROR, "Error: unknown stream", key)
+        return engine.send_marker(marker, timestamp, queue)
+
+    def stop(self) -> None:
+        """Stop every engine and wait for its dispatch thread to exit.
+
+        Markers still queued on a stream are pushed before its thread exits.
+        """
+        for engine in self.engines.values():
+            engine.stop()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
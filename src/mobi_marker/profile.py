@@ -0,0 +1,330 @@
+"""Marker profiles configuring the GUI's quick markers and modalities.
+
+A profile is a TOML or JSON file describing the quick marker buttons - their
+text, color and optional hotkey - and the modalities offered in the END
+dropdown, so a study protocol can be changed without editing source::
+
+    name = "Walking study"
+    columns = 3
+    modalities = ["EEG", "Motion Capture", "Eye Tracking"]
+
+    [[markers]]
+    text = "START"
+    color = "#27ae60"
+    hotkey = "F1"
+
+    [[markers]]
+    text = "TURN"
+    color = "#3498db"
+
+A JSON profile has the same structure. Every key is optional and defaults
+to the value of DEFAULT_PROFILE.
+
+Parsed profiles are cached next to their source file, as ``.<file>.cache``
+in the marshal format, keyed by the source's modification time and size.
+Loading a profile whose cache is current skips parsing and validation, and
+profiles loaded before in the same process are not even read again.
+
+Classes:
+    QuickMarker: A quick marker button.
+    MarkerProfile: Quick markers and modalities of a study protocol.
+
+Functions:
+    parse_profile: Build a profile from a decoded TOML or JSON document.
+    load_profile: Load a profile file, using its cache when current.
+    resolve_profile: Find a profile by path or by name.
+
+Constants:
+    DEFAULT_PROFILE: Quick markers and modalities used without a profile.
+    DEFAULT_PROFILE_DIR: Directory searched for profiles given by name.
+    PROFILE_SUFFIXES: File extensions of profile files.
+"""
+
+import json
+import marshal
+import os
+import re
+import tomllib
+from pathlib import Path
+from typing import Any, NamedTuple, Optional
+
+# Version of the cache layout; caches of other versions are ignored
+_CACHE_VERSION = 1
+_COLOR = re.compile(r"#[0-9a-fA-F]{6}")
+PROFILE_SUFFIXES = (".toml", ".json")
+
+# Directory searched for profiles given by name
+DEFAULT_PROFILE_DIR = Path.home() / ".mobi_marker" / "profiles"
+
+
+class QuickMarker(NamedTuple):
+    """A quick marker button.
+
+    Attributes:
+        text: The marker sent by the button.
+        color: Background color of the button, as ``#rrggbb``.
+        hotkey: Key sequence sending the marker, e.g. ``"F1"`` or
+            ``"Ctrl+1"``, or None.
+    """
+
+    text: str
+    color: str
+    hotkey: Optional[str] = None
+
+
+class MarkerProfile(NamedTuple):
+    """Quick markers and modalities of a study protocol.
+
+    Attributes:
+        name: Name of the profile.
+        markers: The quick marker buttons, in grid order.
+        modalities: Modalities offered in the END dropdown, before "Other".
+        columns: Number of columns of the quick marker grid.
+    """
+
+    name: str
+    markers: tuple[QuickMarker, ...]
+    modalities: tuple[str, ...]
+    columns: int = 3
+
+
+DEFAULT_PROFILE = MarkerProfile(
+    name="Default",
+    markers=(
+        QuickMarker("START", "#27ae60"),  # Green
+        QuickMarker("END", "#e74c3c"),  # Red
+        QuickMarker("PAUSE", "#f39c12"),  # Orange
+        QuickMarker("RESUME", "#2ecc71"),  # Light green
+        QuickMarker("ERROR", "#c0392b"),  # Dark red
+        QuickMarker("NOTE", "#3498db"),  # Blue
+        QuickMarker("START BREAK", "#8e44ad"),  # Purple
+        QuickMarker("END BREAK", "#e67e22"),  # Dark orange
+    ),
+    modalities=(
+        "EEG",
+        "fNIRS",
+        "EMG",
+        "EOG",
+        "ECG",
+        "Motion Capture",
+        "Eye Tracking",
+        "Audio",
+        "Video",
+    ),
+)
+
+# Profiles loaded by this process, by path, with the (mtime_ns, size) key
+_loaded: dict[Path, tuple[tuple[int, int], MarkerProfile]] = {}
+
+
+def _parse_marker(item: object, index: int) -> QuickMarker:
+    """Build a quick marker from one entry of a profile's markers array.
+
+    Args:
+        item: The decoded entry.
+        index: Position of the entry, for error messages.
+
+    Returns:
+        The quick marker.
+
+    Raises:
+        ValueError: If the entry is not a valid quick marker.
+    """
+    if not isinstance(item, dict):
+        raise ValueError(f"markers[{index}] must be a table")
+    text = item.get("text")
+    color = item.get("color", "#3498db")
+    hotkey = item.get("hotkey")
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError(f"markers[{index}].text must be a non-empty string")
+    if not isinstance(color, str) or not _COLOR.fullmatch(color):
+        raise ValueError(f"markers[{index}].color must be a color like #27ae60")
+    if hotkey is not None and (not isinstance(hotkey, str) or not hotkey):
+        raise ValueError(f"markers[{index}].hotkey must be a non-empty string")
+    return QuickMarker(text.strip(), color.lower(), hotkey)
+
+
+def parse_profile(document: dict[str, Any], default_name: str) -> MarkerProfile:
+    """Build a profile from a decoded TOML or JSON document.
+
+    Args:
+        document: The decoded profile file.
+        default_name: Name of the profile if the document does not set one.
+
+    Returns:
+        The validated profile.
+
+    Raises:
+        ValueError: If the document is not a valid profile.
+    """
+    name = document.get("name", default_name)
+    if not isinstance(name, str):
+        raise ValueError("name must be a string")
+
+    markers = DEFAULT_PROFILE.markers
+    if "markers" in document:
+        if not isinstance(document["markers"], list):
+            raise ValueError("markers must be an array")
+        markers = tuple(
+            _parse_marker(item, index) for index, item in enumerate(document["markers"])
+        )
+        texts = [marker.text for marker in markers]
+        if len(set(texts)) != len(texts):
+            raise ValueError("marker texts must be unique")
+        hotkeys = [marker.hotkey for marker in markers if marker.hotkey]
+        if len(set(hotkeys)) != len(hotkeys):
+            raise ValueError("marker hotkeys must be unique")
+
+    modalities = DEFAULT_PROFILE.modalities
+    if "modalities" in document:
+        items = document["modalities"]
+        if not isinstance(items, list) or not all(
+            isinstance(item, str) and item.strip() for item in items
+        ):
+            raise ValueError("modalities must be an array of non-empty strings")
+        # "Other" is always offered last, with a text field
+        modalities = tuple(
+            dict.fromkeys(item.strip() for item in items if item.strip() != "Other")
+        )
+
+    columns = document.get("columns", DEFAULT_PROFILE.columns)
+    if isinstance(columns, bool) or not isinstance(columns, int) or columns < 1:
+        raise ValueError("columns must be a positive integer")
+
+    return MarkerProfile(name, markers, modalities, columns)
+
+
+def _cache_path(path: Path) -> Path:
+    """Return the path of a profile's cache file.
+
+    Args:
+        path: Path of the profile file.
+
+    Returns:
+        The hidden cache file next to the profile.
+    """
+    return path.with_name(f".{path.name}.cache")
+
+
+def _read_cache(path: Path, key: tuple[int, int]) -> Optional[MarkerProfile]:
+    """Read a profile from its cache if the cache is current.
+
+    Args:
+        path: Path of the profile file.
+        key: Modification time in nanoseconds and size of the profile file.
+
+    Returns:
+        The cached profile, or None if there is no current, readable cache.
+    """
+    try:
+        data = marshal.loads(_cache_path(path).read_bytes())
+        version, cached_key, name, markers, modalities, columns = data
+        if version != _CACHE_VERSION or tuple(cached_key) != key:
+            return None
+        return MarkerProfile(
+            name,
+            tuple(QuickMarker(*marker) for marker in markers),
+            tuple(modalities),
+            columns,
+        )
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+
+
+def _write_cache(path: Path, key: tuple[int, int], profile: MarkerProfile) -> None:
+    """Cache a parsed profile next to its source file.
+
+    The cache is written to a temporary file and renamed into place, so a
+    concurrent reader never sees a partial cache. Failing to write the cache,
+    e.g. in a read-only directory, is not an error.
+
+    Args:
+        path: Path of the profile file.
+        key: Modification time in nanoseconds and size of the profile file.
+        profile: The parsed profile.
+    """
+    data = marshal.dumps(
+        (
+            _CACHE_VERSION,
+            key,
+            profile.name,
+            tuple(tuple(marker) for marker in profile.markers),
+            profile.modalities,
+            profile.columns,
+        )
+    )
+    cache = _cache_path(path)
+    temporary = cache.with_name(f"{cache.name}.{os.getpid()}")
+    try:
+        temporary.write_bytes(data)
+        os.replace(temporary, cache)
+    except OSError:
+        temporary.unlink(missing_ok=True)
+
+
+def load_profile(path: str | os.PathLike[str]) -> MarkerProfile:
+    """Load a profile file, using its cache when current.
+
+    Args:
+        path: Path of a ``.toml`` or ``.json`` profile.
+
+    Returns:
+        The profile.
+
+    Raises:
+        OSError: If the profile cannot be read.
+        ValueError: If the file is not a valid profile.
+    """
+    path = Path(path).resolve()
+    stat = path.stat()
+    key = (stat.st_mtime_ns, stat.st_size)
+    loaded = _loaded.get(path)
+    if loaded is not None and loaded[0] == key:
+        return loaded[1]
+
+    if path.suffix not in PROFILE_SUFFIXES:
+        raise ValueError(f"{path} is not a .toml or .json profile")
+    profile = _read_cache(path, key)
+    if profile is None:
+        try:
+            if path.suffix == ".toml":
+                with open(path, "rb") as source:
+                    document = tomllib.load(source)
+            else:
+                with open(path, encoding="utf-8") as source:
+                    document = json.load(source)
+            if not isinstance(document, dict):
+                raise ValueError("the profile must be a table")
+            profile = parse_profile(document, path.stem)
+        except ValueError as e:
+            raise ValueError(f"Invalid profile {path}: {e}") from e
+        _write_cache(path, key, profile)
+    _loaded[path] = (key, profile)
+    return profile
+
+
+def resolve_profile(
+    name_or_path: str | os.PathLike[str], directory: Path = DEFAULT_PROFILE_DIR
+) -> Path:
+    """Find a profile by path or by name.
+
+    Args:
+        name_or_path: Path of a profile file, or the name of a profile in
+            the profile directory, with or without its extension.
+        directory: Directory searched for profiles given by name.
+
+    Returns:
+        Path of the profile file.
+
+    Raises:
+        FileNotFoundError: If no such profile exists.
+    """
+    path = Path(name_or_path)
+    if path.is_file():
+        return path
+    candidates = [directory / path]
+    candidates += [directory / f"{path}{suffix}" for suffix in PROFILE_SUFFIXES]
+    for candidate in candidates:
+        if candidate.is_file():
+            return candidate
+    raise FileNotFoundError(f"No profile {name_or_path} in {directory}")
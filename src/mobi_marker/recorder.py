@@ -0,0 +1,507 @@
+"""Built-in recording of the marker stream into an XDF file.
+
+This module records LSL streams without running LabRecorder alongside the
+application. A recorder thread resolves the marker stream, plus optionally
+other streams by name, pulls their samples with pull_chunk() and appends
+them to an XDF file as it goes. Memory use does not grow with the length
+of the recording: every pulled chunk is written right away through a
+buffered file, and only per-stream sample counts and first and last
+timestamps are kept for the stream footers.
+
+The file follows the XDF 1.0 specification, so it can be loaded with
+pyxdf, EEGLAB or MNE like a LabRecorder recording. Every few seconds the
+recorder also writes each stream's clock offset, for synchronizing streams
+from other machines, and a boundary chunk, so readers can recover the
+samples written before a crash.
+
+Example:
+    Recording the marker stream and an EEG stream from a script::
+
+        recorder = XDFRecorder("session.xdf", [DEFAULT_STREAM_NAME, "EEG"])
+        recorder.start()
+        ...
+        recorder.stop()
+        recorder.join()
+
+Classes:
+    XDFWriter: Streaming writer of XDF files.
+    XDFRecorder: Thread recording LSL streams into an XDF file.
+
+Constants:
+    BOUNDARY_INTERVAL: Seconds between two boundary chunks.
+    CLOCK_OFFSET_INTERVAL: Seconds between two clock offset measurements.
+"""
+
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+from pylsl import (
+    ContinuousResolver,
+    StreamInfo,
+    StreamInlet,
+    cf_double64,
+    cf_float32,
+    cf_int8,
+    cf_int16,
+    cf_int32,
+    cf_int64,
+    cf_string,
+    local_clock,
+)
+
+from mobi_marker.engine import DEFAULT_STREAM_NAME
+from mobi_marker.status import StatusLevel, StatusRecord
+
+BOUNDARY_INTERVAL = 10.0
+CLOCK_OFFSET_INTERVAL = 5.0
+
+_MAGIC = b"XDF:"
+_TAG_FILE_HEADER = 1
+_TAG_STREAM_HEADER = 2
+_TAG_SAMPLES = 3
+_TAG_CLOCK_OFFSET = 4
+_TAG_BOUNDARY = 5
+_TAG_STREAM_FOOTER = 6
+_BOUNDARY_UUID = bytes.fromhex("43a546dccbf5410fb30ed5467383cbe4")
+_FILE_HEADER = '<?xml version="1.0"?><info><version>1.0</version></info>'
+# Struct codes of the numeric LSL channel formats
+_VALUE_CODES = {
+    cf_float32: "f",
+    cf_double64: "d",
+    cf_int8: "b",
+    cf_int16: "h",
+    cf_int32: "i",
+    cf_int64: "q",
+}
+_STREAM_ID = struct.Struct("<I")
+_CLOCK_OFFSET = struct.Struct("<Idd")
+# Every sample carries its timestamp: 8 timestamp bytes, then the value
+_TIMESTAMP = struct.Struct("<Bd")
+
+
+def _varlen(value: int) -> bytes:
+    """Encode an XDF variable-length integer.
+
+    Args:
+        value: The non-negative integer.
+
+    Returns:
+        The number of bytes of the integer, followed by the integer in that
+        many little-endian bytes.
+    """
+    if value < 1 << 8:
+        return struct.pack("<BB", 1, value)
+    if value < 1 << 32:
+        return struct.pack("<BI", 4, value)
+    return struct.pack("<BQ", 8, value)
+
+
+class _StreamState:
+    """Encoding and footer statistics of one recorded stream.
+
+    Attributes:
+        sample: Struct of one timestamped sample, or None for strings.
+        first_timestamp: Timestamp of the first recorded sample.
+        last_timestamp: Timestamp of the last recorded sample.
+        sample_count: Number of recorded samples.
+    """
+
+    def __init__(self, sample: Optional[struct.Struct]) -> None:
+        """Initialize the stream state.
+
+        Args:
+            sample: Struct of one timestamped sample, or None for strings.
+        """
+        self.sample = sample
+        self.first_timestamp = 0.0
+        self.last_timestamp = 0.0
+        self.sample_count = 0
+
+
+class XDFWriter:
+    """Streaming writer of XDF files.
+
+    Chunks are written through a buffered file as they are produced, so the
+    writer's memory use does not depend on the length of the recording.
+    close() writes a footer for every stream.
+
+    Attributes:
+        path: Path of the XDF file.
+    """
+
+    def __init__(
+        self, path: str | os.PathLike[str], buffer_size: int = 1 << 16
+    ) -> None:
+        """Create the file and write the XDF file header.
+
+        Args:
+            path: Path of the new XDF file. An existing file is never
+                overwritten.
+            buffer_size: Size in bytes of the write buffer.
+
+        Raises:
+            OSError: If the file exists or cannot be created.
+        """
+        self.path = Path(path)
+        self._file = open(self.path, "xb", buffering=buffer_size)
+        self._streams: dict[int, _StreamState] = {}
+        self._file.write(_MAGIC)
+        self._write_chunk(_TAG_FILE_HEADER, _FILE_HEADER.encode("utf-8"))
+
+    def _write_chunk(self, tag: int, content: bytes) -> None:
+        """Write one chunk.
+
+        Args:
+            tag: The chunk tag.
+            content: The chunk content after the tag.
+        """
+        self._file.write(_varlen(len(content) + 2) + struct.pack("<H", tag) + content)
+
+    def add_stream(
+        self, stream_id: int, info_xml: str, channel_format: int, channel_count: int
+    ) -> None:
+        """Write the header of a stream.
+
+        Args:
+            stream_id: Identifier of the stream within the file.
+            info_xml: The stream's full LSL info, as returned by
+                StreamInfo.as_xml().
+            channel_format: The stream's LSL channel format, e.g. cf_string.
+            channel_count: The stream's number of channels.
+
+        Raises:
+            ValueError: If the stream ID is taken or the channel format is
+                not supported.
+        """
+        if stream_id in self._streams:
+            raise ValueError(f"Stream ID {stream_id} is already used")
+        if channel_format == cf_string:
+            sample = None
+        elif channel_format in _VALUE_CODES:
+            sample = struct.Struct(
+                f"{_TIMESTAMP.format}{channel_count}{_VALUE_CODES[channel_format]}"
+            )
+        else:
+            raise ValueError(f"Unsupported channel format {channel_format}")
+        self._streams[stream_id] = _StreamState(sample)
+        self._write_chunk(
+            _TAG_STREAM_HEADER, _STREAM_ID.pack(stream_id) + info_xml.encode("utf-8")
+        )
+
+    def write_samples(
+        self,
+        stream_id: int,
+        samples: Sequence[Sequence[object]],
+        timestamps: Sequence[float],
+    ) -> None:
+        """Write a chunk of samples of a stream.
+
+        Args:
+            stream_id: Identifier of the stream, as passed to add_stream().
+            samples: The samples, each a sequence of channel values, as
+                returned by StreamInlet.pull_chunk().
+            timestamps: Timestamp of each sample.
+        """
+        if not timestamps:
+            return
+        state = self._streams[stream_id]
+        parts = [_STREAM_ID.pack(stream_id), _varlen(len(timestamps))]
+        if state.sample is None:
+            for sample, timestamp in zip(samples, timestamps):
+                parts.append(_TIMESTAMP.pack(8, timestamp))
+                for value in sample:
+                    data = str(value).encode("utf-8")
+                    parts.append(_varlen(len(data)))
+                    parts.append(data)
+        else:
+            pack = state.sample.pack
+            parts.extend(
+                pack(8, timestamp, *sample)
+                for sample, timestamp in zip(samples, timestamps)
+            )
+        self._write_chunk(_TAG_SAMPLES, b"".join(parts))
+        if state.sample_count == 0:
+            state.first_timestamp = timestamps[0]
+        state.last_timestamp = timestamps[-1]
+        state.sample_count += len(timestamps)
+
+    def write_clock_offset(
+        self, stream_id: int, collection_time: float, offset: float
+    ) -> None:
+        """Write a clock offset measurement of a stream.
+
+        Args:
+            stream_id: Identifier of the stream.
+            collection_time: Local LSL time of the measurement.
+            offset: Offset to add to the stream's timestamps to map them
+                to the local clock, as returned by time_correction().
+        """
+        self._write_chunk(
+            _TAG_CLOCK_OFFSET, _CLOCK_OFFSET.pack(stream_id, collection_time, offset)
+        )
+
+    def write_boundary(self) -> None:
+        """Write a boundary chunk and flush the buffered chunks to disk."""
+        self._write_chunk(_TAG_BOUNDARY, _BOUNDARY_UUID)
+        self._file.flush()
+
+    def close(self) -> None:
+        """Write the footer of every stream and close the file."""
+        if self._file.closed:
+            return
+        for stream_id, state in self._streams.items():
+            footer = (
+                '<?xml version="1.0"?><info>'
+                f"<first_timestamp>{state.first_timestamp!r}</first_timestamp>"
+                f"<last_timestamp>{state.last_timestamp!r}</last_timestamp>"
+                f"<sample_count>{state.sample_count}</sample_count>"
+                "</info>"
+            )
+            self._write_chunk(
+                _TAG_STREAM_FOOTER, _STREAM_ID.pack(stream_id) + footer.encode("utf-8")
+            )
+        self._file.close()
+
+
+class XDFRecorder(threading.Thread):
+    """Thread recording LSL streams into an XDF file.
+
+    The thread resolves the streams by name, then polls their inlets with
+    non-blocking pull_chunk() calls and writes every pulled chunk to the
+    file. Streams that are not found within the resolve timeout, or that
+    fail to open, are skipped with a status message; the others are still
+    recorded.
+
+    Attributes:
+        writer: The XDF file being written.
+        stream_names: Names of the streams to record.
+        resolve_timeout: Seconds to wait for the streams to appear.
+        max_chunk: Maximum number of samples pulled and written at once.
+        poll_interval: Seconds to sleep when no stream had new samples.
+        drain_timeout: Seconds to keep pulling after stop() for samples
+            still in flight. Recording ends after it even if a stream is
+            still producing.
+        samples_recorded: Number of samples written so far.
+        started: Event set once stream resolution has finished; samples
+            pushed after it are recorded.
+        on_status: Callback receiving status records raised on the
+            recorder thread, or None to discard them.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        stream_names: Sequence[str] = (DEFAULT_STREAM_NAME,),
+        resolve_timeout: float = 10.0,
+        max_chunk: int = 1024,
+        poll_interval: float = 0.05,
+        drain_timeout: float = 0.5,
+        on_status: Optional[Callable[[StatusRecord], None]] = None,
+    ) -> None:
+        """Create the XDF file.
+
+        Args:
+            path: Path of the new XDF file.
+            stream_names: Names of the streams to record. Defaults to the
+                marker stream.
+            resolve_timeout: Seconds to wait for the streams to appear.
+            max_chunk: Maximum number of samples pulled and written at once.
+            poll_interval: Seconds to sleep when no stream had new samples.
+                Samples are timestamped by their outlet, so polling delays
+                writing them but not their recorded time.
+            drain_timeout: Seconds to keep pulling after stop() for samples
+                still in flight.
+            on_status: Optional callback receiving status records raised on
+                the recorder thread. It is called on the recorder thread.
+
+        Raises:
+            OSError: If the file exists or cannot be created.
+        """
+        super().__init__(name="XDFRecorder", daemon=True)
+        self.writer = XDFWriter(path)
+        self.stream_names = tuple(dict.fromkeys(stream_names))
+        self.resolve_timeout = resolve_timeout
+        self.max_chunk = max_chunk
+        self.poll_interval = poll_interval
+        self.drain_timeout = drain_timeout
+        self.samples_recorded = 0
+        self.on_status = on_status
+        self.started = threading.Event()
+        self._stop_requested = threading.Event()
+
+    def _report(self, record: StatusRecord) -> None:
+        """Deliver a status record to on_status, if set.
+
+        Args:
+            record: The status record.
+        """
+        if self.on_status is not None:
+            self.on_status(record)
+
+    def _open(self, info: StreamInfo, stream_id: int) -> StreamInlet:
+        """Open a resolved stream and write its header.
+
+        Args:
+            info: The resolved stream.
+            stream_id: Identifier of the stream within the file.
+
+        Returns:
+            The inlet of the stream, already receiving samples.
+
+        Raises:
+            ValueError: If the stream's channel format is not supported.
+            Exception: Any error of liblsl opening the stream, such as a
+                TimeoutError. The inlet is closed before it is raised.
+        """
+        inlet = StreamInlet(info, max_buflen=360, recover=True)
+        try:
+            inlet.open_stream(timeout=self.resolve_timeout)
+            full = inlet.info(timeout=self.resolve_timeout)
+            self.writer.add_stream(
+                stream_id, full.as_xml(), full.channel_format(), full.channel_count()
+            )
+        except Exception:
+            inlet.close_stream()
+            raise
+        self._report(
+            StatusRecord.now(StatusLevel.INFO, "Recording stream", full.name())
+        )
+        return inlet
+
+    def _resolve(self) -> list[StreamInlet]:
+        """Resolve and open the streams to record.
+
+        Every stream is opened as soon as it is found, so its inlet buffers
+        its samples while other streams are still being resolved.
+
+        Returns:
+            An inlet for every stream found, in the order they were found.
+        """
+        resolvers = {
+            name: ContinuousResolver(prop="name", value=name)
+            for name in self.stream_names
+        }
+        deadline = time.monotonic() + self.resolve_timeout
+        inlets: list[StreamInlet] = []
+        while resolvers and not self._stop_requested.is_set():
+            for name, resolver in list(resolvers.items()):
+                infos = resolver.results()
+                if not infos:
+                    continue
+                del resolvers[name]
+                for info in infos:
+                    try:
+                        inlets.append(self._open(info, len(inlets) + 1))
+                    except Exception as e:
+                        self._report(
+                            StatusRecord.now(
+                                StatusLevel.ERROR, "Error recording stream", e
+                            )
+                        )
+            if time.monotonic() >= deadline:
+                break
+            self._stop_requested.wait(self.poll_interval)
+        for name in resolvers:
+            self._report(
+                StatusRecord.now(
+                    StatusLevel.WARNING, "Stream not found, not recording", name
+                )
+            )
+        return inlets
+
+    def _pull(self, inlets: list[StreamInlet]) -> int:
+        """Pull and write the pending samples of every stream.
+
+        Args:
+            inlets: The inlets, whose stream IDs are their positions plus 1.
+
+        Returns:
+            Number of samples written.
+        """
+        pulled = 0
+        for stream_id, inlet in enumerate(inlets, 1):
+            samples, timestamps = inlet.pull_chunk(
+                timeout=0.0, max_samples=self.max_chunk
+            )
+            if timestamps:
+                self.writer.write_samples(stream_id, samples, timestamps)
+                pulled += len(timestamps)
+        self.samples_recorded += pulled
+        return pulled
+
+    def _write_clock_offsets(self, inlets: list[StreamInlet]) -> None:
+        """Measure and write the clock offset of every stream.
+
+        Args:
+            inlets: The inlets, whose stream IDs are their positions plus 1.
+        """
+        for stream_id, inlet in enumerate(inlets, 1):
+            try:
+                offset = inlet.time_correction(timeout=1.0)
+            except Exception:
+                # Measured again at the next interval
+                continue
+            self.writer.write_clock_offset(stream_id, local_clock(), offset)
+
+    def run(self) -> None:
+        """Record the streams until stop() is called, then close the file."""
+        inlets: list[StreamInlet] = []
+        try:
+            inlets = self._resolve()
+            self.started.set()
+            if not inlets:
+                self._report(
+                    StatusRecord.now(
+                        StatusLevel.WARNING,
+                        "Warning: no streams found, nothing recorded to",
+                        self.writer.path,
+                    )
+                )
+                return
+            self._report(
+                StatusRecord.now(StatusLevel.INFO, "Recording to", self.writer.path)
+            )
+            next_offsets = time.monotonic()
+            next_boundary = next_offsets + BOUNDARY_INTERVAL
+            while not self._stop_requested.is_set():
+                now = time.monotonic()
+                if now >= next_offsets:
+                    self._write_clock_offsets(inlets)
+                    next_offsets = now + CLOCK_OFFSET_INTERVAL
+                if now >= next_boundary:
+                    self.writer.write_boundary()
+                    next_boundary = now + BOUNDARY_INTERVAL
+                if not self._pull(inlets):
+                    self._stop_requested.wait(self.poll_interval)
+            # Samples pushed just before stop() may still be in flight; a
+            # stream that never runs dry is cut off at the deadline
+            deadline = time.monotonic() + self.drain_timeout
+            while True:
+                pulled = self._pull(inlets)
+                if time.monotonic() >= deadline:
+                    break
+                if not pulled:
+                    time.sleep(self.poll_interval)
+            self._write_clock_offsets(inlets)
+        except Exception as e:
+            self._report(StatusRecord.now(StatusLevel.ERROR, "Error recording", e))
+        finally:
+            self.started.set()
+            self.writer.close()
+        if inlets:
+            self._report(
+                StatusRecord.now(
+                    StatusLevel.INFO, "Recording saved to", self.writer.path
+                )
+            )
+
+    def stop(self) -> None:
+        """Ask the recorder to write the remaining samples and close the file.
+
+        run() returns shortly after; join() the thread to wait for it.
+        """
+        self._stop_requested.set()
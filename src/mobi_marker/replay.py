@@ -0,0 +1,135 @@
+"""Command-line tool for replaying marker journals.
+
+This module replays a journal written by the marker application back through
+an LSL StreamOutlet, either with the original spacing between markers or
+with the spacing scaled by a speed factor. It is meant for exercising
+recording and analysis pipelines without rerunning a session.
+
+Functions:
+    replay: Replay a journal through an LSL outlet.
+    main: Command-line entry point of the replay tool.
+"""
+
+import argparse
+import sys
+import time
+from typing import Optional, Sequence
+
+from pylsl import StreamInfo, StreamOutlet, local_clock
+
+from mobi_marker.journal_reader import JournalReader
+
+
+def replay(
+    reader: JournalReader,
+    outlet: StreamOutlet,
+    speed: float = 1.0,
+    verbose: bool = False,
+) -> int:
+    """Replay a journal through an LSL outlet.
+
+    Markers are pushed with timestamps re-based onto the current LSL clock,
+    preserving the original spacing divided by ``speed``. Each marker is
+    stamped with its scheduled time, so sleep overshoot does not distort
+    the replayed timing.
+
+    Args:
+        reader: The journal to replay.
+        outlet: The outlet to push the markers to.
+        speed: Playback speed factor; 2.0 replays twice as fast. 0 pushes
+            all markers immediately, keeping their relative timestamps.
+        verbose: Print each marker to stdout as it is pushed.
+
+    Returns:
+        The number of markers pushed.
+
+    Raises:
+        ValueError: If speed is negative.
+    """
+    if speed < 0:
+        raise ValueError(f"speed must not be negative, got {speed}")
+    if len(reader) == 0:
+        return 0
+
+    lsl_time = reader.lsl_time
+    first = float(lsl_time[0])
+    start = local_clock()
+    for index in range(len(reader)):
+        offset = float(lsl_time[index]) - first
+        if speed > 0:
+            due = start + offset / speed
+            delay = due - local_clock()
+            if delay > 0:
+                time.sleep(delay)
+        else:
+            due = start + offset
+        marker = reader.payload(index)
+        outlet.push_sample([marker], due)
+        if verbose:
+            print(f"{due:.6f}\t{marker}")
+    return len(reader)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Command-line entry point of the replay tool.
+
+    Args:
+        argv: Command-line arguments, excluding the program name. Defaults
+            to sys.argv[1:].
+
+    Raises:
+        SystemExit: On invalid arguments or an unreadable journal.
+    """
+    parser = argparse.ArgumentParser(
+        prog="mobi-marker-replay",
+        description="Replay a MoBI Marker journal through an LSL outlet.",
+    )
+    parser.add_argument("journal", help="path of the journal file to replay")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="playback speed factor; 0 pushes everything at once (default: 1.0)",
+    )
+    parser.add_argument(
+        "--stream-name",
+        default="MobiMarkerReplay",
+        help="name of the replay LSL stream (default: MobiMarkerReplay)",
+    )
+    parser.add_argument(
+        "--wait",
+        type=float,
+        default=0.0,
+        metavar="SECONDS",
+        help="wait up to this long for a consumer before replaying (default: 0)",
+    )
+    parser.add_argument(
+        "--verbose", action="store_true", help="print each marker as it is pushed"
+    )
+    args = parser.parse_args(argv)
+    if args.speed < 0:
+        parser.error("--speed must not be negative")
+
+    try:
+        reader = JournalReader(args.journal)
+    except (OSError, ValueError) as e:
+        parser.exit(1, f"mobi-marker-replay: error: {e}\n")
+
+    with reader:
+        stream_info = StreamInfo(
+            name=args.stream_name,
+            type="Markers",
+            channel_count=1,
+            nominal_srate=0,  # irregular sampling rate
+            channel_format="string",
+            source_id=f"mobi_marker_replay_{reader.path.stem}",
+        )
+        outlet = StreamOutlet(stream_info)
+        if args.wait > 0:
+            outlet.wait_for_consumers(args.wait)
+        pushed = replay(reader, outlet, args.speed, args.verbose)
+    print(f"Replayed {pushed} markers from {args.journal}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,539 @@
+"""Protocol scheduler firing timed marker sequences.
+
+A protocol is a TOML or JSON file describing a sequence of markers, each
+sent a relative offset after the previous one, optionally with random
+jitter, and loops repeating a block of steps::
+
+    name = "Oddball"
+    seed = 1234
+
+    [[steps]]
+    marker = "START"
+
+    [[steps]]
+    repeat = 100
+    steps = [
+        { marker = "STIMULUS", offset = 1.0, jitter = 0.25 },
+        { marker = "RESPONSE WINDOW", offset = 0.3 },
+    ]
+
+    [[steps]]
+    marker = "END"
+    offset = 2.0
+
+offset defaults to 0 and jitter, a random extra delay drawn uniformly from
+[0, jitter], to no jitter. A seed makes the jitter reproducible. Offsets
+are measured from the previous marker's deadline, not from the time it was
+actually sent, so scheduling errors do not accumulate over a session.
+
+ProtocolScheduler fires the markers from a dedicated thread. It waits for
+each local_clock() deadline by sleeping until shortly before it and then
+spinning, since sleeping alone overshoots by tens to hundreds of
+microseconds, and stamps each marker with the LSL time it was sent at.
+
+Classes:
+    ProtocolStep: A marker sent after a relative offset.
+    ProtocolLoop: A block of steps repeated several times.
+    Protocol: A timed marker sequence.
+    ScheduledMarker: A marker and its offset from the protocol start.
+    FiredMarker: A marker sent by the scheduler, with its timing.
+    ProtocolScheduler: Thread firing the markers of a protocol on time.
+
+Functions:
+    parse_protocol: Build a protocol from a decoded TOML or JSON document.
+    load_protocol: Load a protocol file.
+    schedule: Expand a protocol into its markers and offsets.
+    clock_offset: Measure the offset of the LSL clock from perf_counter().
+    wait_until: Wait for an LSL clock deadline with a hybrid sleep and spin.
+
+Constants:
+    SPIN_THRESHOLD: Time before a deadline from which wait_until() spins.
+    LATE_THRESHOLD: Scheduling error above which a marker is reported late.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+import tomllib
+from pathlib import Path
+from typing import Any, Callable, Iterator, NamedTuple, Optional, Union
+
+from pylsl import local_clock
+
+from mobi_marker.dispatch import MarkerRecord, SPSCQueue
+from mobi_marker.engine import MarkerEngine
+from mobi_marker.metrics import Metrics
+from mobi_marker.status import StatusLevel, StatusRecord
+
+# Seconds before a deadline from which wait_until() spins instead of sleeping
+SPIN_THRESHOLD = 0.002
+# Seconds after its deadline from which a fired marker is reported late
+LATE_THRESHOLD = 0.001
+_PROTOCOL_SUFFIXES = (".toml", ".json")
+
+
+class ProtocolStep(NamedTuple):
+    """A marker sent after a relative offset.
+
+    Attributes:
+        marker: The marker string.
+        offset: Seconds after the previous marker's deadline.
+        jitter: Largest random extra delay, in seconds.
+    """
+
+    marker: str
+    offset: float = 0.0
+    jitter: float = 0.0
+
+
+class ProtocolLoop(NamedTuple):
+    """A block of steps repeated several times.
+
+    Attributes:
+        steps: The repeated steps, in order.
+        repeat: Number of times the steps are run.
+    """
+
+    steps: tuple[Union[ProtocolStep, "ProtocolLoop"], ...]
+    repeat: int
+
+
+class Protocol(NamedTuple):
+    """A timed marker sequence.
+
+    Attributes:
+        name: Name of the protocol.
+        steps: The protocol's steps and loops, in order.
+        seed: Seed of the jitter's random number generator, or None for a
+            different sequence every run.
+    """
+
+    name: str
+    steps: tuple[ProtocolStep | ProtocolLoop, ...]
+    seed: Optional[int] = None
+
+    @property
+    def marker_count(self) -> int:
+        """Number of markers the protocol sends, counting loop repetitions."""
+        return _count(self.steps)
+
+
+class ScheduledMarker(NamedTuple):
+    """A marker and its offset from the protocol start.
+
+    Attributes:
+        offset: Seconds from the start of the protocol.
+        marker: The marker string.
+    """
+
+    offset: float
+    marker: str
+
+
+class FiredMarker(NamedTuple):
+    """A marker sent by the scheduler, with its timing.
+
+    Attributes:
+        marker: The marker string.
+        deadline: LSL time the marker was scheduled for.
+        fired_at: LSL time the marker was sent at, and its timestamp.
+    """
+
+    marker: str
+    deadline: float
+    fired_at: float
+
+
+def _count(steps: tuple[ProtocolStep | ProtocolLoop, ...]) -> int:
+    """Count the markers sent by a sequence of steps.
+
+    Args:
+        steps: The steps and loops.
+
+    Returns:
+        The number of markers, counting loop repetitions.
+    """
+    return sum(
+        1 if isinstance(step, ProtocolStep) else step.repeat * _count(step.steps)
+        for step in steps
+    )
+
+
+def _parse_seconds(item: dict[str, Any], key: str, where: str) -> float:
+    """Read an optional non-negative number of seconds from a step.
+
+    Args:
+        item: The decoded step.
+        key: The key to read.
+        where: Location of the step, for error messages.
+
+    Returns:
+        The number of seconds, 0 if the key is missing.
+
+    Raises:
+        ValueError: If the value is not a non-negative number.
+    """
+    value = item.get(key, 0.0)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0:
+        raise ValueError(f"{where}.{key} must be a non-negative number")
+    return float(value)
+
+
+def _parse_steps(items: object, where: str) -> tuple[ProtocolStep | ProtocolLoop, ...]:
+    """Build the steps of a protocol or loop from its decoded steps array.
+
+    Args:
+        items: The decoded steps array.
+        where: Location of the array, for error messages.
+
+    Returns:
+        The steps and loops.
+
+    Raises:
+        ValueError: If the array or one of its steps is invalid.
+    """
+    if not isinstance(items, list) or not items:
+        raise ValueError(f"{where} must be a non-empty array")
+    steps: list[ProtocolStep | ProtocolLoop] = []
+    for index, item in enumerate(items):
+        here = f"{where}[{index}]"
+        if not isinstance(item, dict):
+            raise ValueError(f"{here} must be a table")
+        if "repeat" in item:
+            repeat = item["repeat"]
+            if isinstance(repeat, bool) or not isinstance(repeat, int) or repeat < 1:
+                raise ValueError(f"{here}.repeat must be a positive integer")
+            steps.append(
+                ProtocolLoop(_parse_steps(item.get("steps"), f"{here}.steps"), repeat)
+            )
+            continue
+        marker = item.get("marker")
+        if not isinstance(marker, str) or not marker.strip():
+            raise ValueError(f"{here}.marker must be a non-empty string")
+        steps.append(
+            ProtocolStep(
+                marker.strip(),
+                _parse_seconds(item, "offset", here),
+                _parse_seconds(item, "jitter", here),
+            )
+        )
+    return tuple(steps)
+
+
+def parse_protocol(document: dict[str, Any], default_name: str) -> Protocol:
+    """Build a protocol from a decoded TOML or JSON document.
+
+    Args:
+        document: The decoded protocol file.
+        default_name: Name of the protocol if the document does not set one.
+
+    Returns:
+        The validated protocol.
+
+    Raises:
+        ValueError: If the document is not a valid protocol.
+    """
+    name = document.get("name", default_name)
+    if not isinstance(name, str):
+        raise ValueError("name must be a string")
+    seed = document.get("seed")
+    if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int)):
+        raise ValueError("seed must be an integer")
+    return Protocol(name, _parse_steps(document.get("steps"), "steps"), seed)
+
+
+def load_protocol(path: str | os.PathLike[str]) -> Protocol:
+    """Load a protocol file.
+
+    Args:
+        path: Path of a ``.toml`` or ``.json`` protocol.
+
+    Returns:
+        The protocol.
+
+    Raises:
+        OSError: If the protocol cannot be read.
+        ValueError: If the file is not a valid protocol.
+    """
+    path = Path(path)
+    if path.suffix not in _PROTOCOL_SUFFIXES:
+        raise ValueError(f"{path} is not a .toml or .json protocol")
+    try:
+        if path.suffix == ".toml":
+            with open(path, "rb") as source:
+                document = tomllib.load(source)
+        else:
+            with open(path, encoding="utf-8") as source:
+                document = json.load(source)
+        if not isinstance(document, dict):
+            raise ValueError("the protocol must be a table")
+        return parse_protocol(document, path.stem)
+    except ValueError as e:
+        raise ValueError(f"Invalid protocol {path}: {e}") from e
+
+
+def schedule(protocol: Protocol, rng: random.Random) -> Iterator[ScheduledMarker]:
+    """Expand a protocol into its markers and offsets.
+
+    Loops are expanded lazily, so long protocols take constant memory.
+
+    Args:
+        protocol: The protocol.
+        rng: Random number generator drawing the jitter.
+
+    Yields:
+        Every marker of the protocol with its offset from the start, in
+        order.
+    """
+    elapsed = 0.0
+
+    def expand(
+        steps: tuple[ProtocolStep | ProtocolLoop, ...],
+    ) -> Iterator[ScheduledMarker]:
+        nonlocal elapsed
+        for step in steps:
+            if isinstance(step, ProtocolLoop):
+                for _ in range(step.repeat):
+                    yield from expand(step.steps)
+                continue
+            elapsed += step.offset
+            if step.jitter > 0:
+                elapsed += rng.uniform(0.0, step.jitter)
+            yield ScheduledMarker(elapsed, step.marker)
+
+    return expand(protocol.steps)
+
+
+def clock_offset(samples: int = 5) -> float:
+    """Measure the offset of the LSL clock from time.perf_counter().
+
+    Both clocks run at the same rate, but local_clock() is a ctypes call
+    that releases the GIL, so a single reading can be delayed by another
+    thread. Each sample brackets local_clock() between two perf_counter()
+    readings, and the tightest bracket wins.
+
+    Args:
+        samples: Number of readings to take.
+
+    Returns:
+        local_clock() minus time.perf_counter(), in seconds.
+    """
+    best_gap = float("inf")
+    offset = 0.0
+    for _ in range(samples):
+        before = time.perf_counter()
+        lsl_time = local_clock()
+        after = time.perf_counter()
+        if after - before < best_gap:
+            best_gap = after - before
+            offset = lsl_time - (before + after) / 2
+    return offset
+
+
+def wait_until(
+    deadline: float,
+    spin: float = SPIN_THRESHOLD,
+    interrupt: Optional[threading.Event] = None,
+    offset: Optional[float] = None,
+) -> bool:
+    """Wait for an LSL clock deadline with a hybrid sleep and spin.
+
+    Sleeps until spin seconds before the deadline, then spins. The deadline
+    is converted to time.perf_counter(), which is read without a ctypes
+    call, so the spinning thread keeps the GIL instead of handing it to
+    other threads right before the deadline.
+
+    Args:
+        deadline: The local_clock() time to wait for.
+        spin: Seconds before the deadline from which to spin.
+        interrupt: Optional event ending the wait early when set.
+        offset: Offset of the LSL clock from perf_counter(), as returned by
+            clock_offset(). Measured on every call if None.
+
+    Returns:
+        False if the wait was interrupted, otherwise True. Deadlines in the
+        past return immediately.
+    """
+    if offset is None:
+        offset = clock_offset()
+    end = deadline - offset
+    remaining = end - time.perf_counter()
+    while remaining > spin:
+        if interrupt is None:
+            time.sleep(remaining - spin)
+        elif interrupt.wait(remaining - spin):
+            return False
+        remaining = end - time.perf_counter()
+    while time.perf_counter() < end:
+        pass
+    return True
+
+
+class ProtocolScheduler(threading.Thread):
+    """Thread firing the markers of a protocol on time.
+
+    The scheduler sends through a dispatch queue of its own, so it can run
+    alongside the GUI and network producers. Schedulers run one after
+    another should share a queue, since the engine never forgets one. The
+    protocol starts as soon as the thread does; each marker is stamped with
+    the LSL time it was sent at, which is at most a few tens of
+    microseconds after its deadline on an idle machine. The offset between
+    the LSL clock and perf_counter() is measured once per run, so firing a
+    marker does not call into liblsl.
+
+    Attributes:
+        engine: The engine the markers are sent through.
+        protocol: The protocol being run.
+        seed: Seed of the jitter's random number generator, or None.
+        spin: Seconds before each deadline from which the thread spins.
+        on_status: Callback receiving status records raised on the
+            scheduler thread, or None to discard them.
+        on_fired: Callback receiving every sent marker with its timing, or
+            None.
+        on_finished: Callback called when the protocol has finished or was
+            stopped, or None.
+        metrics: Instrumentation the scheduling errors are recorded into, or
+            None.
+        fired: Number of markers sent so far.
+        late: Number of markers sent more than LATE_THRESHOLD seconds after
+            their deadline.
+        max_error: Largest delay of a sent marker after its deadline, in
+            seconds.
+    """
+
+    def __init__(
+        self,
+        engine: MarkerEngine,
+        protocol: Protocol,
+        seed: Optional[int] = None,
+        spin: float = SPIN_THRESHOLD,
+        on_status: Optional[Callable[[StatusRecord], None]] = None,
+        on_fired: Optional[Callable[[FiredMarker], None]] = None,
+        on_finished: Optional[Callable[[], None]] = None,
+        metrics: Optional[Metrics] = None,
+        queue: Optional[SPSCQueue[MarkerRecord]] = None,
+    ) -> None:
+        """Initialize the scheduler and its dispatch queue.
+
+        Args:
+            engine: The engine to send the markers through.
+            protocol: The protocol to run.
+            seed: Seed of the jitter's random number generator. Defaults to
+                the protocol's seed.
+            spin: Seconds before each deadline from which to spin.
+            on_status: Optional callback receiving status records raised on
+                the scheduler thread. It is called on the scheduler thread.
+            on_fired: Optional callback receiving every sent marker with its
+                timing. It is called on the scheduler thread, after the
+                marker was queued.
+            on_finished: Optional callback called on the scheduler thread
+                when the protocol has finished or was stopped.
+            metrics: Optional instrumentation to record the scheduling error
+                of every marker into.
+            queue: Dispatch queue from engine.add_queue() to send through.
+                No other thread may produce into it while the scheduler
+                runs. Defaults to a new queue registered with the engine.
+
+        Raises:
+            ValueError: If spin is negative.
+        """
+        if spin < 0:
+            raise ValueError(f"spin must not be negative, got {spin}")
+        super().__init__(name="ProtocolScheduler", daemon=True)
+        self.engine = engine
+        self.protocol = protocol
+        self.seed = protocol.seed if seed is None else seed
+        self.spin = spin
+        self.on_status = on_status
+        self.on_fired = on_fired
+        self.on_finished = on_finished
+        self.metrics = metrics
+        self.fired = 0
+        self.late = 0
+        self.max_error = 0.0
+        self._queue = engine.add_queue() if queue is None else queue
+        self._stop_requested = threading.Event()
+
+    def _report(self, record: StatusRecord) -> None:
+        """Deliver a status record to on_status, if set.
+
+        Args:
+            record: The status record.
+        """
+        if self.on_status is not None:
+            self.on_status(record)
+
+    def run(self) -> None:
+        """Fire the protocol's markers until it ends or stop() is called."""
+        total = self.protocol.marker_count
+        self._report(
+            StatusRecord.now(
+                StatusLevel.INFO,
+                "Protocol started",
+                f"{self.protocol.name} ({total} markers)",
+            )
+        )
+        offset = clock_offset()
+        start = time.perf_counter() + offset
+        try:
+            for scheduled in schedule(self.protocol, random.Random(self.seed)):
+                deadline = start + scheduled.offset
+                if self._stop_requested.is_set() or not wait_until(
+                    deadline, self.spin, self._stop_requested, offset
+                ):
+                    self._report(
+                        StatusRecord.now(
+                            StatusLevel.WARNING,
+                            "Warning: protocol stopped",
+                            f"{self.fired} of {total} markers sent",
+                        )
+                    )
+                    return
+                self._fire(scheduled.marker, deadline, time.perf_counter() + offset)
+            self._report(
+                StatusRecord.now(
+                    StatusLevel.INFO,
+                    "Protocol finished",
+                    f"{self.fired} markers, {self.late} late, "
+                    f"max error {self.max_error * 1000:.3f} ms",
+                )
+            )
+        finally:
+            if self.on_finished is not None:
+                self.on_finished()
+
+    def _fire(self, marker: str, deadline: float, fired_at: float) -> None:
+        """Send a marker whose deadline has come.
+
+        Args:
+            marker: The marker string.
+            deadline: LSL time the marker was scheduled for.
+            fired_at: LSL time the deadline was met at, the marker's
+                timestamp.
+        """
+        rejection = self.engine.send_marker(marker, fired_at, self._queue)
+        error = fired_at - deadline
+        if rejection is not None:
+            self._report(rejection)
+            return
+        self.fired += 1
+        self.max_error = max(self.max_error, error)
+        if self.metrics is not None:
+            self.metrics.schedule.record_seconds(error)
+        if error > LATE_THRESHOLD:
+            self.late += 1
+            self._report(
+                StatusRecord.now(
+                    StatusLevel.WARNING,
+                    "Warning: protocol marker late",
+                    f"{marker} ({error * 1000:.3f} ms)",
+                )
+            )
+        if self.on_fired is not None:
+            self.on_fired(FiredMarker(marker, deadline, fired_at))
+
+    def stop(self) -> None:
+        """Ask the scheduler to stop; join() the thread to wait for it."""
+        self._stop_requested.set()
@@ -0,0 +1,497 @@
+"""asyncio marker server with TCP and WebSocket endpoints.
+
+This module serves any number of concurrent marker clients from a single
+thread running an asyncio event loop. Two endpoints are offered:
+
+- TCP: newline-delimited UTF-8 markers, one marker per line.
+- WebSocket: one marker per text message (RFC 6455, no extensions or
+  subprotocols), for browser and tablet user interfaces.
+
+Every marker is timestamped with local_clock() as soon as it has been read
+and is queued through MarkerEngine.send_marker(), the same path the GUI and
+the other listeners use. Each connection is served by one coroutine, so a
+client's markers are queued in the order it sent them. When the engine's
+queue is full, connections stop reading instead of dropping markers, and
+TCP flow control pushes back on the clients.
+
+Classes:
+    MarkerServer: Thread running the TCP and WebSocket marker endpoints.
+
+Constants:
+    DEFAULT_TCP_PORT: TCP port the newline-delimited endpoint binds to.
+    DEFAULT_WS_PORT: TCP port the WebSocket endpoint binds to.
+    MAX_MARKER_SIZE: Largest marker accepted, in bytes.
+"""
+
+import asyncio
+import base64
+import hashlib
+import socket
+import threading
+from typing import Callable, Optional
+
+from pylsl import local_clock
+
+from mobi_marker.engine import MarkerEngine
+from mobi_marker.listeners import DEFAULT_SERVER_HOST
+from mobi_marker.status import StatusLevel, StatusRecord
+
+DEFAULT_TCP_PORT = 15001
+DEFAULT_WS_PORT = 15002
+MAX_MARKER_SIZE = 64 * 1024
+
+# Key suffix defined by RFC 6455 for computing Sec-WebSocket-Accept
+_WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+_WS_CONTINUATION = 0x0
+_WS_TEXT = 0x1
+_WS_BINARY = 0x2
+_WS_CLOSE = 0x8
+_WS_PING = 0x9
+_WS_PONG = 0xA
+# Seconds between checks for queue space while clients are held back; the
+# interval doubles from the first to the second while the queue stays full
+_BACKPRESSURE_MIN_INTERVAL = 0.001
+_BACKPRESSURE_MAX_INTERVAL = 0.05
+
+
+class _WebSocketError(Exception):
+    """A client violated the WebSocket protocol.
+
+    Attributes:
+        code: Close status code sent to the client.
+    """
+
+    def __init__(self, code: int, reason: str) -> None:
+        """Initialize the error.
+
+        Args:
+            code: Close status code sent to the client.
+            reason: Description of the violation.
+        """
+        super().__init__(reason)
+        self.code = code
+
+
+def _ws_frame(opcode: int, payload: bytes = b"") -> bytes:
+    """Build an unmasked, unfragmented WebSocket frame.
+
+    Args:
+        opcode: The frame opcode.
+        payload: The frame payload.
+
+    Returns:
+        The encoded frame.
+    """
+    length = len(payload)
+    if length < 126:
+        header = bytes((0x80 | opcode, length))
+    elif length < 1 << 16:
+        header = bytes((0x80 | opcode, 126)) + length.to_bytes(2, "big")
+    else:
+        header = bytes((0x80 | opcode, 127)) + length.to_bytes(8, "big")
+    return header + payload
+
+
+def _ws_unmask(payload: bytes, mask: bytes) -> bytes:
+    """Unmask a client frame payload.
+
+    The payload is XORed with the repeated mask as one big integer, which
+    is much faster in Python than a byte-by-byte loop.
+
+    Args:
+        payload: The masked payload.
+        mask: The 4-byte masking key.
+
+    Returns:
+        The unmasked payload.
+    """
+    length = len(payload)
+    if not length:
+        return payload
+    key = (mask * (length // 4 + 1))[:length]
+    unmasked = int.from_bytes(payload, "little") ^ int.from_bytes(key, "little")
+    return unmasked.to_bytes(length, "little")
+
+
+async def _ws_read_frame(
+    reader: asyncio.StreamReader, max_size: int
+) -> tuple[bool, int, bytes]:
+    """Read a single client WebSocket frame.
+
+    Args:
+        reader: The connection's stream reader.
+        max_size: Largest payload accepted, in bytes.
+
+    Returns:
+        The FIN flag, the opcode and the unmasked payload.
+
+    Raises:
+        _WebSocketError: If the frame is unmasked or too large.
+        asyncio.IncompleteReadError: If the connection closes mid-frame.
+    """
+    head = await reader.readexactly(2)
+    fin = bool(head[0] & 0x80)
+    opcode = head[0] & 0x0F
+    length = head[1] & 0x7F
+    if length == 126:
+        length = int.from_bytes(await reader.readexactly(2), "big")
+    elif length == 127:
+        length = int.from_bytes(await reader.readexactly(8), "big")
+    if not head[1] & 0x80:
+        raise _WebSocketError(1002, "client frames must be masked")
+    if length > max_size:
+        raise _WebSocketError(1009, "message too large")
+    mask = await reader.readexactly(4)
+    payload = await reader.readexactly(length)
+    return fin, opcode, _ws_unmask(payload, mask)
+
+
+class MarkerServer(threading.Thread):
+    """Thread running the TCP and WebSocket marker endpoints.
+
+    All connections are served by one asyncio event loop on this thread, so
+    hundreds of clients cost no extra threads. The server owns a dedicated
+    dispatch queue registered with the engine; since only the event loop
+    enqueues to it, it stays single-producer.
+
+    The listening sockets are bound when the server is created, so port
+    conflicts are raised to the caller rather than on the server thread.
+
+    Attributes:
+        engine: The engine markers are sent through.
+        tcp_address: The (host, port) of the TCP endpoint, or None if it is
+            disabled.
+        ws_address: The (host, port) of the WebSocket endpoint, or None if
+            it is disabled.
+        received: Number of markers received and queued.
+        dropped: Number of markers rejected by the engine.
+        on_status: Callback receiving status records raised on the server
+            thread, or None to discard them.
+        ready: Event set once the server accepts connections.
+    """
+
+    def __init__(
+        self,
+        engine: MarkerEngine,
+        host: str = DEFAULT_SERVER_HOST,
+        tcp_port: Optional[int] = DEFAULT_TCP_PORT,
+        ws_port: Optional[int] = DEFAULT_WS_PORT,
+        queue_capacity: int = 65536,
+        max_marker_size: int = MAX_MARKER_SIZE,
+        on_status: Optional[Callable[[StatusRecord], None]] = None,
+    ) -> None:
+        """Bind the listening sockets and register the server's queue.
+
+        Args:
+            engine: The engine markers are sent through.
+            host: Interface to bind to. Defaults to localhost only.
+            tcp_port: Port of the newline-delimited TCP endpoint, 0 to pick
+                a free port, or None to disable it.
+            ws_port: Port of the WebSocket endpoint, 0 to pick a free port,
+                or None to disable it.
+            queue_capacity: Maximum number of received markers that can be
+                waiting for dispatch at once. Clients are held back while
+                it is full.
+            max_marker_size: Largest marker accepted, in bytes. Clients
+                sending larger markers are disconnected.
+            on_status: Optional callback receiving status records raised on
+                the server thread. It is called on the server thread.
+
+        Raises:
+            OSError: If a listening socket cannot be bound.
+        """
+        super().__init__(name="MarkerServer", daemon=True)
+        self.engine = engine
+        self.on_status = on_status
+        self.max_marker_size = max_marker_size
+        self.received = 0
+        self.dropped = 0
+        self.ready = threading.Event()
+        self._queue = engine.add_queue(queue_capacity)
+        self._dropping = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Task[None]] = None
+        self._stop_requested = False
+        self._writers: set[asyncio.StreamWriter] = set()
+
+        self._tcp_socket: Optional[socket.socket] = None
+        self._ws_socket: Optional[socket.socket] = None
+        try:
+            if tcp_port is not None:
+                self._tcp_socket = socket.create_server((host, tcp_port))
+            if ws_port is not None:
+                self._ws_socket = socket.create_server((host, ws_port))
+        except OSError:
+            for sock in (self._tcp_socket, self._ws_socket):
+                if sock is not None:
+                    sock.close()
+            raise
+        self.tcp_address: Optional[tuple[str, int]] = (
+            self._tcp_socket.getsockname()[:2] if self._tcp_socket else None
+        )
+        self.ws_address: Optional[tuple[str, int]] = (
+            self._ws_socket.getsockname()[:2] if self._ws_socket else None
+        )
+
+    @property
+    def clients(self) -> int:
+        """Number of currently connected clients."""
+        return len(self._writers)
+
+    def _report(self, record: StatusRecord) -> None:
+        """Pass a status record to on_status.
+
+        Args:
+            record: The status record to report.
+        """
+        if self.on_status is not None:
+            self.on_status(record)
+
+    def run(self) -> None:
+        """Run the event loop until stop() is called."""
+        asyncio.run(self.serve())
+
+    async def serve(self) -> None:
+        """Serve both endpoints on the running event loop until stopped.
+
+        This can also be awaited directly to embed the server in an existing
+        asyncio application instead of starting the thread.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._closing = asyncio.Event()
+        if self._stop_requested:
+            self._closing.set()
+        limit = self.max_marker_size + 1
+        servers: list[asyncio.Server] = []
+        if self._tcp_socket is not None:
+            servers.append(
+                await asyncio.start_server(
+                    self._handle_tcp, sock=self._tcp_socket, limit=limit
+                )
+            )
+        if self._ws_socket is not None:
+            servers.append(
+                await asyncio.start_server(
+                    self._handle_ws, sock=self._ws_socket, limit=limit
+                )
+            )
+        for name, address in (
+            ("TCP", self.tcp_address),
+            ("WebSocket", self.ws_address),
+        ):
+            if address is not None:
+                self._report(
+                    StatusRecord.now(
+                        StatusLevel.INFO,
+                        f"Listening for {name} markers on",
+                        f"{address[0]}:{address[1]}",
+                    )
+                )
+        self.ready.set()
+
+        await self._closing.wait()
+        for server in servers:
+            server.close()
+        for writer in list(self._writers):
+            writer.close()
+        for server in servers:
+            await server.wait_closed()
+
+    def stop(self) -> None:
+        """Ask the server to disconnect all clients and exit.
+
+        Safe to call from any thread. If the server was never started, the
+        listening sockets are closed right away.
+        """
+        self._stop_requested = True
+        if self.ident is None and self._loop is None:
+            for sock in (self._tcp_socket, self._ws_socket):
+                if sock is not None:
+                    sock.close()
+        if self._loop is not None and self._closing is not None:
+            self._loop.call_soon_threadsafe(self._closing.set)
+
+    async def _submit(self, data: bytes, timestamp: float) -> None:
+        """Queue a received marker, waiting while the dispatch queue is full.
+
+        Args:
+            data: The UTF-8 encoded marker.
+            timestamp: LSL time at which the marker was received.
+        """
+        marker = data.decode("utf-8", errors="replace")
+        if not marker:
+            return
+        queue = self._queue
+        # This coroutine is the queue's only producer, so space seen here
+        # cannot be taken by anyone else before the put below.
+        while len(queue) >= queue.capacity:
+            if self._stop_requested:
+                return
+            if self._space is None:
+                self._space = asyncio.create_task(self._wait_for_space())
+            await asyncio.shield(self._space)
+        rejection = self.engine.send_marker(marker, timestamp, queue)
+        if rejection is None:
+            self.received += 1
+            self._dropping = False
+            return
+        self.dropped += 1
+        # Report only the first of a run of rejections, so the status log is
+        # not flooded while the stream is down.
+        if not self._dropping:
+            self._dropping = True
+            self._report(rejection)
+
+    async def _wait_for_space(self) -> None:
+        """Wait until the dispatch queue has space or the server stops.
+
+        All held-back connections await the same task, so the loop wakes up
+        for one check however many clients are waiting. The check interval
+        backs off exponentially while the engine stays saturated.
+        """
+        interval = _BACKPRESSURE_MIN_INTERVAL
+        try:
+            queue = self._queue
+            while len(queue) >= queue.capacity and not self._stop_requested:
+                await asyncio.sleep(interval)
+                interval = min(interval * 2, _BACKPRESSURE_MAX_INTERVAL)
+        finally:
+            self._space = None
+
+    async def _handle_tcp(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve a newline-delimited TCP client.
+
+        Args:
+            reader: The connection's stream reader.
+            writer: The connection's stream writer.
+        """
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b"\n")
+                except asyncio.IncompleteReadError as e:
+                    # Accept a last marker without a trailing newline
+                    if e.partial:
+                        await self._submit(e.partial.rstrip(b"\r"), local_clock())
+                    return
+                timestamp = local_clock()
+                await self._submit(line.rstrip(b"\r\n"), timestamp)
+        except asyncio.LimitOverrunError:
+            self._report(
+                StatusRecord.now(
+                    StatusLevel.ERROR,
+                    "Error: TCP marker too large, disconnected client",
+                    writer.get_extra_info("peername"),
+                )
+            )
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _handle_ws(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve a WebSocket client.
+
+        Args:
+            reader: The connection's stream reader.
+            writer: The connection's stream writer.
+        """
+        self._writers.add(writer)
+        try:
+            if not await self._ws_handshake(reader, writer):
+                return
+            message: list[bytes] = []
+            size = 0
+            while True:
+                fin, opcode, payload = await _ws_read_frame(
+                    reader, self.max_marker_size
+                )
+                if opcode == _WS_PING:
+                    writer.write(_ws_frame(_WS_PONG, payload))
+                    continue
+                if opcode == _WS_PONG:
+                    continue
+                if opcode == _WS_CLOSE:
+                    writer.write(_ws_frame(_WS_CLOSE, payload[:2]))
+                    await writer.drain()
+                    return
+                if opcode == _WS_BINARY:
+                    raise _WebSocketError(1003, "only text messages are accepted")
+                if opcode == _WS_TEXT:
+                    message = []
+                    size = 0
+                elif opcode != _WS_CONTINUATION:
+                    raise _WebSocketError(1002, f"unknown opcode {opcode}")
+                size += len(payload)
+                if size > self.max_marker_size:
+                    raise _WebSocketError(1009, "message too large")
+                message.append(payload)
+                if fin:
+                    await self._submit(b"".join(message), local_clock())
+        except _WebSocketError as e:
+            writer.write(_ws_frame(_WS_CLOSE, e.code.to_bytes(2, "big")))
+            self._report(
+                StatusRecord.now(
+                    StatusLevel.ERROR,
+                    "Error: WebSocket protocol violation, disconnected client",
+                    e,
+                )
+            )
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+            pass
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _ws_handshake(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> bool:
+        """Answer the HTTP upgrade request opening a WebSocket connection.
+
+        Args:
+            reader: The connection's stream reader.
+            writer: The connection's stream writer.
+
+        Returns:
+            True if the connection was upgraded, False if the request was
+            rejected.
+        """
+        request = await reader.readuntil(b"\r\n\r\n")
+        lines = request.decode("latin-1").split("\r\n")
+        headers = {}
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        key = headers.get("sec-websocket-key")
+        if (
+            not lines[0].startswith("GET ")
+            or headers.get("upgrade", "").lower() != "websocket"
+            or not key
+        ):
+            writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            await writer.drain()
+            return False
+        if headers.get("sec-websocket-version") != "13":
+            writer.write(
+                b"HTTP/1.1 426 Upgrade Required\r\n"
+                b"Sec-WebSocket-Version: 13\r\nContent-Length: 0\r\n\r\n"
+            )
+            await writer.drain()
+            return False
+        accept = base64.b64encode(hashlib.sha1(key.encode() + _WS_GUID).digest())
+        writer.write(
+            b"HTTP/1.1 101 Switching Protocols\r\n"
+            b"Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n"
+        )
+        await writer.drain()
+        return True
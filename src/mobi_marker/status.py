@@ -0,0 +1,91 @@
+"""Status records for the LSL marker application.
+
+This module provides the compact record type used for status log entries.
+Records hold raw timestamps and unformatted details; they are only turned
+into text when a row is displayed or the log is exported, so the marker hot
+path does not pay for date formatting and string building.
+
+Classes:
+    StatusLevel: Severity of a status record.
+    StatusRecord: A single, lazily formatted status log entry.
+"""
+
+import time
+from datetime import datetime
+from enum import IntEnum
+from typing import NamedTuple, Optional
+
+from pylsl import local_clock
+
+
+class StatusLevel(IntEnum):
+    """Severity of a status record."""
+
+    INFO = 0
+    WARNING = 1
+    ERROR = 2
+
+
+class StatusRecord(NamedTuple):
+    """A single, lazily formatted status log entry.
+
+    Attributes:
+        wall_time: Wall-clock time of the entry, as returned by time.time().
+        lsl_time: LSL time of the entry, as returned by local_clock().
+        level: Severity of the entry.
+        message: Static message text, e.g. "Sent marker".
+        detail: Optional detail appended to the message when formatted: a
+            marker string, a tuple of markers, or an exception.
+        delay: Optional event-to-push delay in seconds.
+    """
+
+    wall_time: float
+    lsl_time: float
+    level: StatusLevel
+    message: str
+    detail: object = None
+    delay: Optional[float] = None
+
+    @classmethod
+    def now(
+        cls,
+        level: StatusLevel,
+        message: str,
+        detail: object = None,
+        lsl_time: Optional[float] = None,
+        delay: Optional[float] = None,
+    ) -> "StatusRecord":
+        """Create a record stamped with the current wall-clock time.
+
+        Args:
+            level: Severity of the entry.
+            message: Static message text.
+            detail: Optional detail appended to the message when formatted.
+            lsl_time: LSL time of the entry. Defaults to local_clock().
+            delay: Optional event-to-push delay in seconds.
+
+        Returns:
+            The new status record.
+        """
+        if lsl_time is None:
+            lsl_time = local_clock()
+        return cls(time.time(), lsl_time, level, message, detail, delay)
+
+    def format(self) -> str:
+        """Format the record as a status log line.
+
+        Returns:
+            The line with both human-readable and LSL timestamps, e.g.
+            "[2025-01-01 12:00:00.000 | LSL: 1234.567] Sent marker: START".
+        """
+        human_time = datetime.fromtimestamp(self.wall_time).strftime(
+            "%Y-%m-%d %H:%M:%S.%f"
+        )[:-3]
+        text = self.message
+        if isinstance(self.detail, tuple):
+            text = f"{text} ({len(self.detail)}): {', '.join(self.detail)}"
+        elif self.detail is not None:
+            text = f"{text}: {self.detail}"
+        if self.delay is not None:
+            text = f"{text} (event-to-push: {self.delay * 1000:.3f} ms)"
+        return f"[{human_time} | LSL: {self.lsl_time:.3f}] {text}"
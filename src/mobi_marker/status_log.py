@@ -0,0 +1,177 @@
+"""Status log model for the LSL marker application.
+
+This module provides a fixed-capacity list model for the status log. Status
+records are kept in a preallocated ring buffer, so memory use stays constant
+over long sessions, and the model is rendered through a QListView, which only
+asks for the rows that are currently visible. Records are formatted to text
+only when a row is displayed or the log is exported.
+
+Classes:
+    StatusLogModel: Ring-buffer backed list model holding status records.
+"""
+
+import time
+from typing import Iterable, Optional
+
+from PyQt6.QtCore import QAbstractListModel, QModelIndex, QObject, Qt
+from PyQt6.QtGui import QColor
+
+from mobi_marker.metrics import Metrics
+from mobi_marker.status import StatusLevel, StatusRecord
+
+# Text colors for status levels above INFO
+LEVEL_COLORS = {
+    StatusLevel.WARNING: QColor("#e67e22"),
+    StatusLevel.ERROR: QColor("#c0392b"),
+}
+
+
+class StatusLogModel(QAbstractListModel):
+    """Ring-buffer backed list model holding status records.
+
+    Once the model holds ``capacity`` records, appending a record discards
+    the oldest one. Row 0 is always the oldest retained record.
+
+    Attributes:
+        capacity: Maximum number of records retained by the model.
+        metrics: Instrumentation the time spent formatting rows is recorded
+            into, or None.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 10000,
+        parent: QObject | None = None,
+        metrics: Optional[Metrics] = None,
+    ) -> None:
+        """Initialize the status log model.
+
+        Args:
+            capacity: Maximum number of records retained by the model.
+            parent: Optional parent object.
+            metrics: Optional instrumentation to record the time spent
+                formatting rows into.
+
+        Raises:
+            ValueError: If capacity is not a positive integer.
+        """
+        super().__init__(parent)
+        if capacity < 1:
+            raise ValueError(f"Status log capacity must be positive, got {capacity}")
+        self.capacity = capacity
+        self.metrics = metrics
+        self._buffer: list[Optional[StatusRecord]] = [None] * capacity
+        self._start = 0  # buffer index of row 0
+        self._count = 0
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        """Return the number of retained records.
+
+        Args:
+            parent: Parent index; list models only have top-level rows.
+
+        Returns:
+            The number of rows in the model.
+        """
+        if parent.isValid():
+            return 0
+        return self._count
+
+    def data(
+        self, index: QModelIndex, role: int = Qt.ItemDataRole.DisplayRole
+    ) -> str | QColor | None:
+        """Return the data shown in a given row.
+
+        The record is formatted only here, when the view asks for a row it
+        is about to paint.
+
+        Args:
+            index: Index of the requested row.
+            role: The data role requested by the view.
+
+        Returns:
+            The formatted record for the display role, the level color for
+            the foreground role of warnings and errors, otherwise None.
+        """
+        if not index.isValid():
+            return None
+        row = index.row()
+        if not 0 <= row < self._count:
+            return None
+        record = self._buffer[(self._start + row) % self.capacity]
+        if record is None:
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            if self.metrics is None:
+                return record.format()
+            start = time.perf_counter_ns()
+            text = record.format()
+            self.metrics.status_format.record(time.perf_counter_ns() - start)
+            return text
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return LEVEL_COLORS.get(record.level)
+        return None
+
+    def append(self, record: StatusRecord) -> None:
+        """Append a single record to the log.
+
+        Args:
+            record: The status record to append.
+        """
+        self.extend((record,))
+
+    def extend(self, records: Iterable[StatusRecord]) -> None:
+        """Append several records to the log at once.
+
+        The oldest records are discarded as needed to stay within capacity,
+        with one row removal and one row insertion notification per call.
+
+        Args:
+            records: The status records to append, oldest first.
+        """
+        new = list(records)[-self.capacity :]
+        if not new:
+            return
+
+        overflow = self._count + len(new) - self.capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            self._start = (self._start + overflow) % self.capacity
+            self._count -= overflow
+            self.endRemoveRows()
+
+        first = self._count
+        self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+        for offset, record in enumerate(new):
+            self._buffer[(self._start + first + offset) % self.capacity] = record
+        self._count += len(new)
+        self.endInsertRows()
+
+    def clear(self) -> None:
+        """Remove all records from the log."""
+        self.beginResetModel()
+        self._buffer = [None] * self.capacity
+        self._start = 0
+        self._count = 0
+        self.endResetModel()
+
+    def records(self) -> list[StatusRecord]:
+        """Return all retained records, oldest first.
+
+        Returns:
+            A list of the retained status records.
+        """
+        records = []
+        for row in range(self._count):
+            record = self._buffer[(self._start + row) % self.capacity]
+            if record is not None:
+                records.append(record)
+        return records
+
+    def export_text(self) -> str:
+        """Format all retained records as status log text.
+
+        Returns:
+            One formatted line per retained record, oldest first.
+        """
+        return "\n".join(record.format() for record in self.records())
@@ -0,0 +1,157 @@
+"""Local UDP ingestion of markers.
+
+This module lets stimulus software on the same machine send markers without
+going through the GUI: every datagram received on a UDP socket is one
+marker, encoded as UTF-8. A trailing newline is ignored. Datagrams are
+timestamped with local_clock() as soon as they are received and enqueued
+straight into the dispatch engine from the listener thread.
+
+Example:
+    Sending a marker from Python::
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        sock.sendto(b"STIM_ONSET", ("127.0.0.1", DEFAULT_UDP_PORT))
+
+Classes:
+    UDPMarkerListener: Thread receiving markers over UDP.
+
+Constants:
+    DEFAULT_UDP_HOST: Interface the listener binds to by default.
+    DEFAULT_UDP_PORT: UDP port the listener binds to by default.
+    MAX_DATAGRAM_SIZE: Largest datagram accepted as a marker.
+"""
+
+import socket
+import threading
+from typing import Callable, Optional
+
+from pylsl import local_clock
+
+from mobi_marker.engine import MarkerEngine
+from mobi_marker.status import StatusLevel, StatusRecord
+
+# Only accept markers from the local machine unless told otherwise
+DEFAULT_UDP_HOST = "127.0.0.1"
+DEFAULT_UDP_PORT = 15000
+MAX_DATAGRAM_SIZE = 65535
+
+
+class UDPMarkerListener(threading.Thread):
+    """Thread receiving markers over UDP.
+
+    The listener owns a dedicated dispatch queue registered with the engine,
+    so it enqueues without locks alongside other producers. Receiving blocks
+    in the kernel, so a datagram is timestamped as soon as the thread is
+    woken for it.
+
+    Attributes:
+        engine: The engine markers are sent through.
+        address: The (host, port) the socket is bound to. The port is the
+            one actually assigned if port 0 was requested.
+        received: Number of markers received and queued.
+        dropped: Number of markers rejected by the engine.
+        on_status: Callback receiving status records raised on the listener
+            thread, or None to discard them.
+    """
+
+    def __init__(
+        self,
+        engine: MarkerEngine,
+        host: str = DEFAULT_UDP_HOST,
+        port: int = DEFAULT_UDP_PORT,
+        queue_capacity: int = 65536,
+        on_status: Optional[Callable[[StatusRecord], None]] = None,
+        poll_interval: float = 0.25,
+    ) -> None:
+        """Bind the UDP socket and register the listener's dispatch queue.
+
+        Args:
+            engine: The engine markers are sent through.
+            host: Interface to bind to. Defaults to localhost only.
+            port: UDP port to bind to. 0 picks a free port.
+            queue_capacity: Maximum number of received markers that can be
+                waiting for dispatch at once.
+            on_status: Optional callback receiving status records raised on
+                the listener thread. It is called on the listener thread.
+            poll_interval: Seconds between two checks for a stop request
+                while no datagram arrives. Does not affect ingest latency.
+
+        Raises:
+            OSError: If the socket cannot be bound.
+        """
+        super().__init__(name="UDPMarkerListener", daemon=True)
+        self.engine = engine
+        self.on_status = on_status
+        self.received = 0
+        self.dropped = 0
+        self._queue = engine.add_queue(queue_capacity)
+        self._stop_requested = threading.Event()
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            # Absorb bursts while the listener thread is not scheduled
+            self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1 << 20)
+            self._socket.bind((host, port))
+        except OSError:
+            self._socket.close()
+            raise
+        self._socket.settimeout(poll_interval)
+        self.address: tuple[str, int] = self._socket.getsockname()
+
+    def _report(self, record: StatusRecord) -> None:
+        """Pass a status record to on_status.
+
+        Args:
+            record: The status record to report.
+        """
+        if self.on_status is not None:
+            self.on_status(record)
+
+    def run(self) -> None:
+        """Receive datagrams and queue them as markers until stopped."""
+        self._report(
+            StatusRecord.now(
+                StatusLevel.INFO,
+                "Listening for UDP markers on",
+                f"{self.address[0]}:{self.address[1]}",
+            )
+        )
+        recv = self._socket.recv
+        send_marker = self.engine.send_marker
+        queue = self._queue
+        dropping = False
+        while not self._stop_requested.is_set():
+            try:
+                data = recv(MAX_DATAGRAM_SIZE)
+            except TimeoutError:
+                continue
+            except OSError as e:
+                self._report(
+                    StatusRecord.now(StatusLevel.ERROR, "Error receiving UDP marker", e)
+                )
+                break
+            timestamp = local_clock()
+            marker = data.decode("utf-8", errors="replace").rstrip("\r\n")
+            if not marker:
+                continue
+            rejection = send_marker(marker, timestamp, queue)
+            if rejection is None:
+                self.received += 1
+                dropping = False
+                continue
+            self.dropped += 1
+            # Report only the first of a run of rejections, so an overloaded
+            # listener does not also flood the status log.
+            if not dropping:
+                dropping = True
+                self._report(rejection)
+        self._socket.close()
+
+    def stop(self) -> None:
+        """Ask the listener to close its socket and exit.
+
+        The thread exits within poll_interval seconds. If the thread was
+        never started, the socket is closed right away.
+        """
+        self._stop_requested.set()
+        if self.ident is None:
+            self._socket.close()
@@ -0,0 +1,189 @@
+"""Test suite for the benchmarks.
+
+This module contains tests for the statistics and the JSON report shared by
+the benchmarks, and runs every benchmark once on a small workload in a
+fresh interpreter, checking the report it writes.
+
+Functions:
+    test_summaries: Tests the statistics of every benchmark.
+    test_write_report: Tests the common report format.
+    test_benchmark_run: Tests a small real run of each benchmark.
+"""
+
+import json
+import math
+import os
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pytest
+
+from mobi_marker.bench import hotkeys, latency, scheduler, startup, write_report
+from mobi_marker.scheduler import FiredMarker
+
+
+def test_summaries() -> None:
+    """Test the statistics of every benchmark.
+
+    Verifies that each benchmark reports the median of its measurements in
+    its unit, and how it handles a case without measurements: latency
+    reports NaN, the others reject the case.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If a statistic is wrong.
+    """
+    seconds = np.arange(1, 101) / 1e6
+
+    result = latency.summarize(seconds, 500.0, 16, 100, 2.0)
+    assert result.received == 100
+    assert math.isclose(result.p50_ms, 0.0505)
+    assert result.throughput == 50.0
+    assert math.isnan(latency.summarize(np.empty(0), 0.0, 16, 10, 1.0).p50_ms)
+
+    result_path = hotkeys.summarize("hotkey", seconds)
+    assert result_path.samples == 100
+    assert math.isclose(result_path.p50_ms, 0.0505)
+    with pytest.raises(ValueError):
+        hotkeys.summarize("click", np.empty(0))
+
+    phases = startup.summarize(
+        [{phase: value for phase in startup.PHASES} for value in seconds]
+    )
+    assert [phase.phase for phase in phases] == list(startup.PHASES)
+    assert math.isclose(phases[0].median_ms, 0.0505)
+    with pytest.raises(ValueError):
+        startup.summarize([])
+
+    fired = [
+        FiredMarker("A", index * 0.01, index * 0.01 + value)
+        for index, value in enumerate(seconds)
+    ]
+    schedule = scheduler.summarize(0.01, 0.002, fired)
+    assert schedule.markers == 100
+    assert math.isclose(schedule.p50_us, 50.5, rel_tol=1e-6)
+    assert schedule.late == 0.0
+    with pytest.raises(ValueError):
+        scheduler.summarize(0.01, 0.0, fired[:1])
+
+
+def test_write_report(tmp_path: Path) -> None:
+    """Test the common report format.
+
+    Verifies that the report names the benchmark, its parameters and the
+    versions of the requested packages, and that statistics which could not
+    be computed are written as null, keeping the report valid JSON.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the report is malformed.
+    """
+    path = tmp_path / "report.json"
+
+    write_report(
+        "test",
+        {"count": 2},
+        [{"p50_ms": float("nan"), "max_ms": float("inf"), "samples": 2}],
+        ["pylsl"],
+        str(path),
+    )
+
+    report = json.loads(path.read_text())
+    assert report["benchmark"] == "test"
+    assert report["parameters"] == {"count": 2}
+    assert {"mobi_marker", "pylsl", "python", "platform"} <= set(report["environment"])
+    assert report["results"] == [{"p50_ms": None, "max_ms": None, "samples": 2}]
+
+
+@pytest.mark.parametrize(
+    ("benchmark", "arguments", "parameters", "results"),
+    [
+        (
+            "latency",
+            ["--rate", "0", "--payload-size", "16", "--count", "20", "--warmup", "0"],
+            {"count": 20, "warmup": 0, "max_batch_size": 64},
+            [{"rate": 0.0, "payload_size": 16, "sent": 20, "received": 20}],
+        ),
+        (
+            "scheduler",
+            ["--interval", "0.005", "--spin", "0.002", "--count", "5"],
+            {"count": 5},
+            [{"interval_ms": 5.0, "spin_ms": 2.0, "markers": 5}],
+        ),
+        (
+            "hotkeys",
+            ["--count", "5", "--warmup", "1"],
+            {"count": 5, "warmup": 1},
+            [{"path": "hotkey", "samples": 5}, {"path": "click", "samples": 5}],
+        ),
+        (
+            "startup",
+            ["--count", "1"],
+            {"count": 1},
+            [{"phase": phase, "samples": 1} for phase in startup.PHASES],
+        ),
+    ],
+)
+def test_benchmark_run(
+    tmp_path: Path,
+    benchmark: str,
+    arguments: list[str],
+    parameters: dict[str, Any],
+    results: list[dict[str, Any]],
+) -> None:
+    """Test a small real run of a benchmark.
+
+    Runs the benchmark from the command line in a fresh interpreter, with a
+    real LSL outlet and an offscreen Qt platform, and verifies its report:
+    the parameters, the case fields, and that every measured statistic is
+    a finite number.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+        benchmark: Module name of the benchmark.
+        arguments: Command-line arguments selecting a small workload.
+        parameters: Expected parameters of the report.
+        results: Expected case fields of every result, in order.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the run fails or its report is wrong.
+    """
+    path = tmp_path / "report.json"
+    subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            f"mobi_marker.bench.{benchmark}",
+            *arguments,
+            "--output",
+            str(path),
+        ],
+        env={**os.environ, "QT_QPA_PLATFORM": "offscreen"},
+        capture_output=True,
+        check=True,
+        timeout=120,
+    )
+
+    report = json.loads(path.read_text())
+    assert report["benchmark"] == benchmark
+    assert report["parameters"] == parameters
+    assert len(report["results"]) == len(results)
+    for result, expected in zip(report["results"], results):
+        assert result.items() >= expected.items()
+        for name, value in result.items():
+            if name not in expected:
+                assert isinstance(value, (int, float))
+                assert math.isfinite(value)
@@ -0,0 +1,202 @@
+"""Test suite for the clock drift monitor.
+
+This module contains tests for the incremental drift regression and the
+monitor warning about wall-clock to LSL clock divergence and jitter. Clock
+readings are injected, so the tests do not depend on the host's clocks.
+
+Functions:
+    test_drift_fit: Tests the incremental linear regression.
+    test_monitor_estimates_drift: Tests the drift estimate and gauges.
+    test_monitor_warns_on_divergence: Tests the divergence warning.
+    test_monitor_warns_on_jitter: Tests the jitter warning.
+    test_monitor_rearms_jitter_warning: Tests that the jitter warning is
+        raised again after a wall-clock step has aged out of the fit.
+    test_monitor_thread: Tests sampling the real clocks on a thread.
+"""
+
+import math
+import time
+
+import pytest
+
+from mobi_marker.clock import MIN_FIT_SAMPLES, ClockMonitor, DriftFit
+from mobi_marker.metrics import Metrics
+from mobi_marker.status import StatusLevel, StatusRecord
+
+
+def test_drift_fit() -> None:
+    """Test the incremental linear regression.
+
+    Verifies that points on a line are fitted exactly, without residual,
+    that scattered points leave the expected residual deviation, and that a
+    windowed fit follows a line that changed slope.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the fitted line or residual is wrong.
+    """
+    fit = DriftFit()
+    assert fit.slope == 0.0
+    assert fit.residual_std == 0.0
+
+    for x in range(100):
+        fit.add(float(x), 2.0 + 0.5 * x)
+
+    assert fit.samples == 100
+    assert math.isclose(fit.slope, 0.5)
+    assert math.isclose(fit.intercept, 2.0)
+    assert fit.residual_std == pytest.approx(0.0, abs=1e-9)
+
+    scattered = DriftFit()
+    for x in range(100):
+        scattered.add(float(x), 1.0 if x % 2 else -1.0)
+
+    assert scattered.slope == pytest.approx(0.0, abs=1e-3)
+    assert scattered.residual_std == pytest.approx(math.sqrt(100 / 98), rel=1e-3)
+
+    windowed = DriftFit(window=10)
+    for x in range(300):
+        windowed.add(float(x), 0.5 * x if x < 50 else 25.0 + 2.0 * (x - 50))
+
+    assert windowed.slope == pytest.approx(2.0, rel=1e-6)
+    assert windowed.residual_std == pytest.approx(0.0, abs=1e-3)
+    with pytest.raises(ValueError):
+        DriftFit(window=0)
+
+
+def test_monitor_estimates_drift() -> None:
+    """Test the drift estimate and the clock gauges.
+
+    Verifies that a wall clock running 20 ppm fast is estimated as such,
+    that the divergence is the offset change since the first sample, and
+    that the metrics gauges follow the estimate.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the estimate or a gauge is wrong.
+    """
+    metrics = Metrics()
+    monitor = ClockMonitor(metrics=metrics)
+    for second in range(101):
+        monitor.sample(1e9 + second * (1 + 20e-6), 1000.0 + second)
+
+    estimate = monitor.estimate()
+
+    assert estimate.samples == 101
+    assert estimate.drift_ppm == pytest.approx(20.0, rel=1e-3)
+    assert estimate.divergence == pytest.approx(2e-3, rel=1e-3)
+    assert estimate.jitter == pytest.approx(0.0, abs=1e-6)
+    assert metrics.clock_drift.value == estimate.drift_ppm
+    assert metrics.clock_divergence.value == estimate.divergence
+
+
+def test_monitor_warns_on_divergence() -> None:
+    """Test that a wall-clock step raises one divergence warning.
+
+    Verifies that the warning is raised when the offset changes by more
+    than max_divergence, is not repeated while the clocks stay diverged,
+    and is raised again after they have been back in step.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If warnings are missing or repeated.
+    """
+    statuses: list[StatusRecord] = []
+    monitor = ClockMonitor(max_divergence=0.010, on_status=statuses.append)
+    steps = [0.0, 0.0, 0.020, 0.020, 0.0, 0.030]
+
+    for second, step in enumerate(steps):
+        monitor.sample(1e9 + second + step, 1000.0 + second)
+
+    assert len(statuses) == 2
+    assert all(record.level == StatusLevel.WARNING for record in statuses)
+    assert "diverged" in statuses[0].message
+    assert str(statuses[0].detail).startswith("+20.000 ms")
+
+
+def test_monitor_warns_on_jitter() -> None:
+    """Test that a jittery offset raises a warning once enough samples exist.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the warning is raised too early or not at all.
+    """
+    statuses: list[StatusRecord] = []
+    monitor = ClockMonitor(
+        max_divergence=1.0, max_jitter=0.001, on_status=statuses.append
+    )
+
+    for second in range(MIN_FIT_SAMPLES - 1):
+        monitor.sample(1e9 + second + (0.005 if second % 2 else 0.0), 1000.0 + second)
+    assert statuses == []
+
+    for second in range(MIN_FIT_SAMPLES - 1, 2 * MIN_FIT_SAMPLES):
+        monitor.sample(1e9 + second + (0.005 if second % 2 else 0.0), 1000.0 + second)
+
+    assert len(statuses) == 1
+    assert "jittery" in statuses[0].message
+
+
+def test_monitor_rearms_jitter_warning() -> None:
+    """Test that the jitter warning is raised again after a later step.
+
+    Verifies that a wall-clock step makes the offset jittery around the
+    fit, that the jitter settles once the step has aged out of the window,
+    and that a second step raises a second warning.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the jitter does not settle or no second warning
+            is raised.
+    """
+    statuses: list[StatusRecord] = []
+    monitor = ClockMonitor(
+        max_divergence=1.0, max_jitter=0.001, window=10, on_status=statuses.append
+    )
+    step = 0.0
+
+    for second in range(200):
+        if second in (20, 120):
+            step += 0.020
+        monitor.sample(1e9 + second + step, 1000.0 + second)
+        if second == 119:
+            assert monitor.estimate().jitter < 0.001
+
+    assert len(statuses) == 2
+    assert all("jittery" in record.message for record in statuses)
+
+
+def test_monitor_thread() -> None:
+    """Test sampling the real clocks on the monitor thread.
+
+    Verifies that the monitor samples right away, stops promptly, and that
+    the host's clocks show no divergence over a short run.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the monitor does not sample or stop.
+    """
+    with pytest.raises(ValueError):
+        ClockMonitor(interval=0)
+    monitor = ClockMonitor(interval=0.01)
+
+    monitor.start()
+    while monitor.estimate().samples < 3:
+        time.sleep(0.001)
+    monitor.stop()
+    monitor.join(5.0)
+
+    assert not monitor.is_alive()
+    assert abs(monitor.estimate().divergence) < 0.010
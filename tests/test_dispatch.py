@@ -0,0 +1,108 @@
+"""Test suite for the marker dispatch queue.
+
+This module contains tests for the bounded single-producer/single-consumer
+queue used to hand markers to the LSL dispatch worker.
+
+Functions:
+    test_spsc_queue_fifo_order: Tests that items come out in insertion order.
+    test_spsc_queue_bounded: Tests that a full queue rejects new items.
+    test_spsc_queue_wraparound: Tests reuse of slots after draining.
+    test_spsc_queue_threaded: Tests a concurrent producer and consumer.
+"""
+
+import threading
+import time
+
+import pytest
+
+from mobi_marker.dispatch import SPSCQueue
+
+
+def test_spsc_queue_fifo_order() -> None:
+    """Test that items are dequeued in the order they were enqueued.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If items are reordered or lost.
+    """
+    queue: SPSCQueue[int] = SPSCQueue(8)
+    for item in range(5):
+        assert queue.put(item)
+
+    assert len(queue) == 5
+    assert queue.get() == 0
+    assert queue.drain() == [1, 2, 3, 4]
+    assert queue.get() is None
+    assert len(queue) == 0
+
+
+def test_spsc_queue_bounded() -> None:
+    """Test that a full queue rejects new items instead of growing.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the queue accepts more items than its capacity.
+    """
+    queue: SPSCQueue[str] = SPSCQueue(2)
+
+    assert queue.put("a")
+    assert queue.put("b")
+    assert not queue.put("c")
+    assert queue.drain(max_items=1) == ["a"]
+    assert queue.put("c")
+    assert queue.drain() == ["b", "c"]
+
+    with pytest.raises(ValueError):
+        SPSCQueue(0)
+
+
+def test_spsc_queue_wraparound() -> None:
+    """Test that slots are reused correctly once the indices wrap around.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If items are corrupted after wraparound.
+    """
+    queue: SPSCQueue[int] = SPSCQueue(3)
+    received = []
+    for item in range(10):
+        assert queue.put(item)
+        if item % 2:
+            received.extend(queue.drain())
+    received.extend(queue.drain())
+
+    assert received == list(range(10))
+
+
+def test_spsc_queue_threaded() -> None:
+    """Test a producer and a consumer running on separate threads.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If any item is lost, duplicated or reordered.
+    """
+    queue: SPSCQueue[int] = SPSCQueue(16)
+    total = 5000
+    received: list[int] = []
+
+    def consume() -> None:
+        while len(received) < total:
+            received.extend(queue.drain())
+            time.sleep(0)
+
+    consumer = threading.Thread(target=consume)
+    consumer.start()
+    for item in range(total):
+        while not queue.put(item):
+            time.sleep(0)
+    consumer.join(timeout=10)
+
+    assert received == list(range(total))
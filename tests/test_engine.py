@@ -0,0 +1,523 @@
+"""Test suite for the marker dispatch engine.
+
+This module contains tests for the Qt-independent engine that owns the LSL
+outlet and runs the marker dispatch loop.
+
+Functions:
+    test_engine_send_marker_enqueues: Tests that sending only enqueues the
+        marker.
+    test_engine_run_dispatches_queue: Tests that the dispatch loop pushes
+        queued markers.
+    test_engine_batches_with_push_chunk: Tests that queued markers are
+        coalesced into one push_chunk call.
+    test_engine_linger_fills_batch: Tests that a partial batch waits for more
+        markers within the linger time.
+    test_engine_coalesces_status: Tests that status records are delivered in
+        rate-limited batches.
+    test_engine_journals_pushed_markers: Tests that pushed markers are
+        appended to the journal.
+    test_engine_rejects_marker_without_outlet: Tests rejected markers.
+    test_engine_merges_producer_queues: Tests that markers from several
+        producer queues are pushed together in timestamp order.
+    test_engine_send_chunk: Tests that a queued chunk is pushed whole.
+    test_engine_records_metrics: Tests that the hot path is instrumented only
+        when metrics are enabled.
+    test_engine_holds_until_consumers: Tests that markers are held until a
+        consumer connects.
+    test_engine_recovers_outlet: Tests that a failed outlet is re-created and
+        held markers are replayed.
+    test_engine_journals_markers_while_down: Tests that markers held while
+        the outlet is down are journaled on shutdown.
+"""
+
+import threading
+import time
+from unittest.mock import Mock, call, patch
+
+from mobi_marker.dispatch import MarkerRecord
+from mobi_marker.engine import MarkerEngine
+from mobi_marker.metrics import Metrics
+from mobi_marker.status import StatusLevel, StatusRecord
+
+
+def test_engine_send_marker_enqueues() -> None:
+    """Test that send_marker only enqueues the marker for the dispatch loop.
+
+    Verifies that calling send_marker from a producer thread does not push
+    to the outlet directly, and that the queued marker is pushed once the
+    dispatch loop drains the queue.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the marker is pushed synchronously or not at all.
+    """
+    engine = MarkerEngine()
+    engine.outlet = Mock()
+
+    assert engine.send_marker("START", 42.0) is None
+
+    engine.outlet.push_sample.assert_not_called()
+    assert len(engine.queue) == 1
+
+    engine._dispatch_pending()
+
+    engine.outlet.push_sample.assert_called_once_with(["START"], 42.0)
+    assert engine.last_push_delay is not None
+    assert len(engine.queue) == 0
+
+
+def test_engine_run_dispatches_queue() -> None:
+    """Test that the dispatch loop flushes queued markers before exiting.
+
+    Verifies that run() creates the outlet and pushes every marker still
+    queued when stop() was requested, in order.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If queued markers are dropped or reordered.
+    """
+    with (
+        patch("mobi_marker.engine.StreamInfo"),
+        patch("mobi_marker.engine.StreamOutlet") as mock_outlet_cls,
+    ):
+        engine = MarkerEngine(max_batch_size=1)
+        engine.queue.put(MarkerRecord(1, "START", 10.0))
+        engine.queue.put(MarkerRecord(2, "END", 11.0))
+        engine.stop()
+
+        engine.run()
+
+        outlet = mock_outlet_cls.return_value
+        assert outlet.push_sample.call_args_list == [
+            call(["START"], 10.0),
+            call(["END"], 11.0),
+        ]
+        outlet.push_chunk.assert_not_called()
+        assert len(engine.queue) == 0
+
+
+def test_engine_batches_with_push_chunk() -> None:
+    """Test that queued markers are coalesced into a single push_chunk call.
+
+    Verifies that a burst of queued markers is split into chunks of at most
+    max_batch_size samples, each pushed with per-sample timestamps.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the markers are not chunked as configured.
+    """
+    engine = MarkerEngine(max_batch_size=3)
+    engine.outlet = Mock()
+    for seq in range(1, 6):
+        engine.queue.put(MarkerRecord(seq, f"M{seq}", float(seq)))
+
+    engine._dispatch_pending()
+
+    assert engine.outlet.push_chunk.call_args_list == [
+        call([["M1"], ["M2"], ["M3"]], [1.0, 2.0, 3.0]),
+        call([["M4"], ["M5"]], [4.0, 5.0]),
+    ]
+    engine.outlet.push_sample.assert_not_called()
+
+
+def test_engine_linger_fills_batch() -> None:
+    """Test that a partial batch lingers for markers queued shortly after.
+
+    Verifies that with a linger time configured, a marker queued while the
+    dispatch loop is waiting is pushed in the same chunk as the first one.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the lingering batch is pushed before it fills.
+    """
+    engine = MarkerEngine(max_batch_size=2, max_linger=5.0)
+    engine.outlet = Mock()
+    engine.send_marker("A", 1.0)
+
+    dispatcher = threading.Thread(target=engine._dispatch_pending)
+    dispatcher.start()
+    time.sleep(0.01)
+    engine.send_marker("B", 2.0)
+    dispatcher.join(timeout=5)
+
+    assert not dispatcher.is_alive()
+    engine.outlet.push_chunk.assert_called_once_with([["A"], ["B"]], [1.0, 2.0])
+
+
+def test_engine_coalesces_status() -> None:
+    """Test that status records are delivered in rate-limited batches.
+
+    Verifies that status records raised while dispatching are buffered and
+    delivered together, and that no second batch is delivered before the
+    status interval has elapsed unless a flush is forced.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If status records are delivered one by one or lost.
+    """
+    batches: list[list[StatusRecord]] = []
+    engine = MarkerEngine(
+        max_batch_size=1, status_interval=60.0, on_status=batches.append
+    )
+    engine.outlet = Mock()
+
+    for marker in ("A", "B", "C"):
+        engine.send_marker(marker, 1.0)
+    engine._dispatch_pending()
+    engine._flush_status()
+
+    assert len(batches) == 1
+    assert [record.detail for record in batches[0]] == ["A", "B", "C"]
+
+    engine.send_marker("D", 2.0)
+    engine._dispatch_pending()
+    engine._flush_status()
+    assert len(batches) == 1
+    assert engine._status_flush_timeout() is not None
+
+    engine._flush_status(force=True)
+    assert len(batches) == 2
+    assert batches[1][0].detail == "D"
+
+
+def test_engine_journals_pushed_markers() -> None:
+    """Test that pushed markers are appended to the journal.
+
+    Verifies that a pushed batch is journaled with its records, and that a
+    batch the outlet fails to push is not journaled as sent.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the journal does not match the pushed markers.
+    """
+    journal = Mock()
+    engine = MarkerEngine(journal=journal)
+    engine.outlet = Mock()
+    engine.send_marker("A", 1.0)
+    engine.send_marker("B", 2.0)
+
+    engine._dispatch_pending()
+
+    journal.write.assert_called_once()
+    records = journal.write.call_args.args[0]
+    assert [record.marker for record in records] == ["A", "B"]
+
+    engine.outlet.push_sample.side_effect = RuntimeError("outlet gone")
+    engine.send_marker("C", 3.0)
+    engine._dispatch_pending()
+
+    journal.write.assert_called_once()
+
+
+def test_engine_rejects_marker_without_outlet() -> None:
+    """Test that markers are rejected with a status record when inactive.
+
+    Verifies that send_marker returns an error record instead of queueing
+    when the outlet has not been created, and when the queue is full.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If a marker is queued while it cannot be sent.
+    """
+    engine = MarkerEngine(queue_capacity=1)
+
+    rejection = engine.send_marker("START", 1.0)
+
+    assert rejection is not None
+    assert rejection.level == StatusLevel.ERROR
+    assert len(engine.queue) == 0
+
+    engine.outlet = Mock()
+    assert engine.send_marker("A", 1.0) is None
+    rejection = engine.send_marker("B", 2.0)
+    assert rejection is not None
+    assert rejection.detail == "B"
+
+
+def test_engine_merges_producer_queues() -> None:
+    """Test that markers from several producer queues are merged.
+
+    Verifies that markers queued by different producers through their own
+    queues are pushed in one chunk, ordered by timestamp, and that a
+    producer's markers keep their order even if their timestamps do not.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the markers are not merged in timestamp order.
+    """
+    engine = MarkerEngine()
+    engine.outlet = Mock()
+    other = engine.add_queue(16)
+
+    engine.send_marker("GUI 1", 1.0)
+    engine.send_marker("UDP 1", 2.0, other)
+    engine.send_marker("UDP 2", 4.0, other)
+    engine.send_marker("GUI 2", 3.0)
+    engine._dispatch_pending()
+
+    engine.outlet.push_chunk.assert_called_once_with(
+        [["GUI 1"], ["UDP 1"], ["GUI 2"], ["UDP 2"]], [1.0, 2.0, 3.0, 4.0]
+    )
+
+    engine.send_marker("UDP 3", 7.0, other)
+    engine.send_marker("UDP 4", 5.0, other)
+    engine.send_marker("GUI 3", 6.0)
+    engine._dispatch_pending()
+
+    engine.outlet.push_chunk.assert_called_with(
+        [["GUI 3"], ["UDP 3"], ["UDP 4"]], [6.0, 7.0, 5.0]
+    )
+
+
+def test_engine_send_chunk() -> None:
+    """Test that a queued chunk is pushed whole.
+
+    Verifies that send_chunk assigns sequence numbers and fills in missing
+    timestamps, that the chunk is pushed with one push_chunk call even if it
+    exceeds max_batch_size, and that a full chunk queue rejects the chunk.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the chunk is split or not rejected.
+    """
+    engine = MarkerEngine(max_batch_size=2)
+    engine.outlet = Mock()
+    chunks = engine.add_chunk_queue(1)
+
+    with patch("mobi_marker.engine.local_clock", return_value=9.0):
+        queued = engine.send_chunk(["A", "B", "C"], [1.0, None, 3.0], chunks)
+    rejection = engine.send_chunk(["D"], [4.0], chunks)
+
+    assert queued == [
+        MarkerRecord(1, "A", 1.0),
+        MarkerRecord(2, "B", 9.0),
+        MarkerRecord(3, "C", 3.0),
+    ]
+    assert isinstance(rejection, StatusRecord)
+    engine._dispatch_pending()
+    engine.outlet.push_chunk.assert_called_once_with(
+        [["A"], ["B"], ["C"]], [1.0, 9.0, 3.0]
+    )
+
+
+def test_engine_records_metrics() -> None:
+    """Test that the hot path is instrumented only when metrics are enabled.
+
+    Verifies that send_marker is left unwrapped without metrics, and that with
+    metrics the enqueue, push and dispatch histograms and the marker counters
+    are updated, including for a marker rejected by a full queue. Also
+    verifies that non-finite timestamps do not stop dispatch.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If timings or counters are missing or wrong.
+    """
+    assert "send_marker" not in MarkerEngine().__dict__
+
+    metrics = Metrics()
+    engine = MarkerEngine(queue_capacity=2, metrics=metrics)
+    engine.outlet = Mock()
+
+    assert engine.send_marker("A", 1.0) is None
+    assert engine.send_marker("B", 1.5) is None
+    assert engine.send_marker("C", 2.0) is not None
+    with patch("mobi_marker.engine.local_clock", return_value=3.0):
+        engine._dispatch_pending()
+
+    snapshot = metrics.snapshot()
+    assert snapshot.counters["markers_enqueued"] == 2
+    assert snapshot.counters["markers_rejected"] == 1
+    assert snapshot.counters["markers_sent"] == 2
+    assert snapshot.counters["pushes"] == 1
+    assert snapshot.counters["send_errors"] == 0
+    assert snapshot.histograms["enqueue"].samples == 3
+    assert snapshot.histograms["push"].samples == 1
+    dispatch = snapshot.histograms["dispatch"]
+    assert dispatch.samples == 2
+    assert dispatch.min == 1_500_000_000
+    assert dispatch.max == 2_000_000_000
+
+    for timestamp in (float("nan"), float("-inf"), -1e300):
+        assert engine.send_marker("X", timestamp) is None
+        engine._dispatch_pending()
+    assert metrics.markers_sent.value == 5
+    assert metrics.dispatch.samples == 4
+
+
+def test_engine_holds_until_consumers() -> None:
+    """Test that markers are held until a consumer connects.
+
+    Verifies that without consumers markers are held up to hold_capacity,
+    with overflow reported, that they are pushed as one chunk with their
+    original timestamps once a consumer connects, that the change is
+    forwarded to on_consumers, and that later markers are pushed directly.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If markers are pushed early, lost or reordered.
+    """
+    changes: list[bool] = []
+    statuses: list[StatusRecord] = []
+    engine = MarkerEngine(
+        hold_until_consumers=True,
+        hold_capacity=3,
+        on_consumers=changes.append,
+        on_status=statuses.extend,
+    )
+    engine.outlet = Mock()
+    engine.outlet.have_consumers.return_value = False
+
+    for index, marker in enumerate("ABCD"):
+        assert engine.send_marker(marker, float(index)) is None
+    engine._poll_consumers()
+    engine._dispatch_pending()
+    engine._flush_status(force=True)
+
+    engine.outlet.push_sample.assert_not_called()
+    engine.outlet.push_chunk.assert_not_called()
+    assert changes == []
+    dropped = [record for record in statuses if record.level == StatusLevel.ERROR]
+    assert [record.detail for record in dropped] == [("D",)]
+
+    engine.outlet.have_consumers.return_value = True
+    engine._next_consumer_poll = 0.0
+    engine._poll_consumers()
+
+    engine.outlet.push_chunk.assert_called_once_with(
+        [["A"], ["B"], ["C"]], [0.0, 1.0, 2.0]
+    )
+    assert changes == [True]
+    assert engine.have_consumers
+
+    engine.send_marker("E", 5.0)
+    engine._dispatch_pending()
+
+    engine.outlet.push_sample.assert_called_once_with(["E"], 5.0)
+
+
+def test_engine_recovers_outlet() -> None:
+    """Test that a failed outlet is re-created and held markers are replayed.
+
+    Verifies that markers are accepted and held while the outlet cannot be
+    created, with the retry delay doubling after every failure, that they
+    are replayed with their original timestamps once it is created, and
+    that after a failed push the replay waits for the consumers of the lost
+    outlet to reconnect.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If a marker is lost or replayed too early.
+    """
+    first, second = Mock(), Mock()
+    statuses: list[StatusRecord] = []
+    with (
+        patch("mobi_marker.engine.StreamInfo"),
+        patch(
+            "mobi_marker.engine.StreamOutlet",
+            side_effect=[RuntimeError("down"), first, second],
+        ),
+    ):
+        engine = MarkerEngine(
+            retry_delay=0.5, max_retry_delay=0.75, on_status=statuses.extend
+        )
+
+        assert not engine._open_outlet()
+        assert engine.outlet is None
+        assert engine.recovering
+        assert engine._retry_wait == 0.75
+        assert engine.send_marker("A", 1.0) is None
+        engine._dispatch_pending()
+        assert engine._held == [MarkerRecord(1, "A", 1.0)]
+
+        assert engine._open_outlet()
+        assert not engine.recovering
+        engine._dispatch_pending()
+        first.push_sample.assert_called_once_with(["A"], 1.0)
+
+        first.push_sample.side_effect = RuntimeError("network")
+        first.have_consumers.return_value = True
+        engine.send_marker("B", 2.0)
+        engine._dispatch_pending()
+        assert engine.outlet is None
+        assert engine.send_marker("C", 3.0) is None
+        engine._dispatch_pending()
+
+        assert engine._open_outlet()
+        second.have_consumers.return_value = False
+        engine._dispatch_pending()
+        second.push_chunk.assert_not_called()
+
+        second.have_consumers.return_value = True
+        engine._poll_consumers()
+        second.push_chunk.assert_called_once_with([["B"], ["C"]], [2.0, 3.0])
+
+    engine._flush_status(force=True)
+    assert [record.message for record in statuses] == [
+        "Error starting LSL stream",
+        "LSL stream recovered, replaying held markers",
+        "Sent marker",
+        "Error sending marker",
+        "Warning: LSL stream lost, holding markers",
+        "LSL stream recovered, replaying held markers",
+        "Consumer connected",
+        "Sent markers",
+    ]
+
+
+def test_engine_journals_markers_while_down() -> None:
+    """Test that markers held while the outlet is down are journaled.
+
+    Verifies that run() keeps the engine accepting markers when the outlet
+    cannot be created, and that markers still held when it is stopped are
+    written to the journal and reported as not sent.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the held markers are not journaled.
+    """
+    journal = Mock()
+    statuses: list[StatusRecord] = []
+    with (
+        patch("mobi_marker.engine.StreamInfo"),
+        patch("mobi_marker.engine.StreamOutlet", side_effect=RuntimeError("down")),
+    ):
+        engine = MarkerEngine(journal=journal, on_status=statuses.extend)
+        thread = threading.Thread(target=engine.run)
+        thread.start()
+        assert engine.started.wait(1.0)
+
+        assert engine.recovering
+        assert engine.send_marker("A", 1.0) is None
+        engine.stop()
+        thread.join()
+
+    journal.write.assert_called_once()
+    assert journal.write.call_args.args[0] == [MarkerRecord(1, "A", 1.0)]
+    assert statuses[-1].message == "Error: LSL stream down, markers not sent"
+    assert statuses[-1].detail == ("A",)
@@ -0,0 +1,140 @@
+"""Test suite for the Prometheus metrics endpoint.
+
+This module contains tests for formatting metrics in the text exposition
+format and for scraping them over HTTP.
+
+Functions:
+    test_render_metrics: Tests the exported counters, gauges and histogram
+        buckets.
+    test_exporter_serves_engine_metrics: Tests scraping the gauges sampled by
+        the dispatch loop.
+    test_exporter_keep_alive_does_not_block: Tests that a scraper keeping
+        its connection alive neither blocks other scrapes nor stop().
+"""
+
+import http.client
+import socket
+from unittest.mock import Mock
+
+from mobi_marker.engine import MarkerEngine
+from mobi_marker.exporter import CONTENT_TYPE, MetricsExporter, render_metrics
+from mobi_marker.metrics import Metrics
+
+
+def test_render_metrics() -> None:
+    """Test the exported counters, gauges and histogram buckets.
+
+    Verifies that counters get a _total suffix, that histogram buckets are
+    cumulative and converted to seconds, and that the +Inf bucket, sum and
+    count cover every sample.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the exposition text is wrong.
+    """
+    metrics = Metrics()
+    metrics.markers_sent.inc(3)
+    metrics.queue_depth.set(7)
+    for value in (5_000, 40_000, 2_000_000):
+        metrics.push.record(value)
+
+    text = render_metrics(metrics, metrics.snapshot())
+    lines = text.splitlines()
+
+    assert text.endswith("\n")
+    assert "# TYPE mobi_marker_markers_sent_total counter" in lines
+    assert "mobi_marker_markers_sent_total 3" in lines
+    assert "mobi_marker_send_errors_total 0" in lines
+    assert "# TYPE mobi_marker_queue_depth gauge" in lines
+    assert "mobi_marker_queue_depth 7" in lines
+    assert "# TYPE mobi_marker_push_seconds histogram" in lines
+    assert 'mobi_marker_push_seconds_bucket{le="1e-05"} 1' in lines
+    assert 'mobi_marker_push_seconds_bucket{le="5e-05"} 2' in lines
+    assert 'mobi_marker_push_seconds_bucket{le="0.001"} 2' in lines
+    assert 'mobi_marker_push_seconds_bucket{le="0.0025"} 3' in lines
+    assert 'mobi_marker_push_seconds_bucket{le="+Inf"} 3' in lines
+    assert "mobi_marker_push_seconds_sum 0.002045" in lines
+    assert "mobi_marker_push_seconds_count 3" in lines
+
+
+def test_exporter_serves_engine_metrics() -> None:
+    """Test scraping the gauges sampled by the dispatch loop.
+
+    Verifies that the engine samples queue depth and consumer state into its
+    metrics, that GET /metrics serves them with the exposition content type,
+    and that other paths are not found.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the scrape does not reflect the engine state.
+    """
+    metrics = Metrics()
+    engine = MarkerEngine(metrics=metrics)
+    engine.outlet = Mock()
+    engine.outlet.have_consumers.return_value = True
+    engine.send_marker("A", 1.0)
+    engine.send_marker("B", 2.0)
+    engine._sample_gauges(metrics)
+
+    exporter = MetricsExporter(metrics, port=0)
+    exporter.start()
+    try:
+        connection = http.client.HTTPConnection(*exporter.address, timeout=5)
+        connection.request("GET", "/metrics")
+        response = connection.getresponse()
+        body = response.read().decode()
+        assert response.status == 200
+        assert response.getheader("Content-Type") == CONTENT_TYPE
+        assert "mobi_marker_queue_depth 2" in body.splitlines()
+        assert "mobi_marker_have_consumers 1.0" in body.splitlines()
+
+        connection.request("GET", "/other")
+        response = connection.getresponse()
+        response.read()
+        assert response.status == 404
+        connection.close()
+    finally:
+        exporter.stop()
+        exporter.join()
+
+
+def test_exporter_keep_alive_does_not_block() -> None:
+    """Test that a keep-alive scrape does not hold the endpoint.
+
+    Verifies that the endpoint closes the connection after its response even
+    when the scraper asks to keep it alive, that another scrape is served
+    afterwards, and that stop() returns before the first scraper hangs up.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the connection is kept open or stop() hangs.
+    """
+    exporter = MetricsExporter(Metrics(), port=0)
+    exporter.start()
+    client = socket.create_connection(exporter.address, timeout=5)
+    try:
+        client.sendall(
+            b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n"
+            b"Connection: keep-alive\r\n\r\n"
+        )
+        response = b""
+        while chunk := client.recv(4096):
+            response += chunk
+        assert response.startswith(b"HTTP/1.0 200")
+
+        connection = http.client.HTTPConnection(*exporter.address, timeout=5)
+        connection.request("GET", "/metrics")
+        assert connection.getresponse().status == 200
+        connection.close()
+    finally:
+        exporter.stop()
+        exporter.join(5.0)
+        client.close()
+
+    assert not exporter.is_alive()
@@ -6,12 +6,18 @@ application, including the LSL stream thread and main window.
 Functions:
     test_lsl_stream_thread_initialization: Tests LSL stream thread initialization.
     test_gui_window_initialization: Tests GUI window initialization.
+    test_lsl_stream_thread_signals: Tests that engine status reaches the
+        thread's signals.
     test_send_quick_marker: Tests quick marker sending through LSL stream.
+    test_stylesheet_covers_quick_markers: Tests that the window style sheet
+        styles every quick marker button.
 """
 
 from unittest.mock import Mock, patch
 
-from mobi_marker.gui import LSLStreamThread, MobiMarkerGUI
+from mobi_marker.gui import LSLStreamThread, MobiMarkerGUI, build_stylesheet
+from mobi_marker.profile import DEFAULT_PROFILE
+from mobi_marker.status import StatusLevel, StatusRecord
 
 
 def test_lsl_stream_thread_initialization() -> None:
@@ -31,6 +37,40 @@ def test_lsl_stream_thread_initialization() -> None:
 
         assert thread.outlet is None
         assert thread.stream_info is None
+        assert len(thread.engine.queue) == 0
+
+
+def test_lsl_stream_thread_signals() -> None:
+    """Test that engine status is forwarded through the thread's signals.
+
+    Verifies that a marker rejected by the engine is reported through
+    status_update, and that status batches from the dispatch loop are
+    emitted through status_batch.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If status records are not forwarded.
+    """
+    thread = LSLStreamThread()
+    updates: list[StatusRecord] = []
+    batches: list[list[StatusRecord]] = []
+    thread.status_update.connect(updates.append)
+    thread.status_batch.connect(batches.append)
+
+    thread.send_marker("START", 1.0)
+
+    assert len(updates) == 1
+    assert updates[0].level == StatusLevel.ERROR
+
+    thread.engine.outlet = Mock()
+    thread.send_marker("START", 1.0)
+    thread.engine._dispatch_pending()
+    thread.engine._flush_status(force=True)
+
+    assert len(updates) == 1
+    assert [record.detail for record in batches[0]] == ["START"]
 
 
 def test_gui_window_initialization() -> None:
@@ -73,6 +113,7 @@ def test_send_quick_marker() -> None:
         patch("mobi_marker.gui.QMainWindow.__init__"),
         patch("mobi_marker.gui.MobiMarkerGUI.init_ui"),
         patch("mobi_marker.gui.MobiMarkerGUI.start_lsl_stream"),
+        patch("mobi_marker.gui.local_clock", return_value=12.5),
     ):
         gui = MobiMarkerGUI()
         mock_thread = Mock(spec=LSLStreamThread)
@@ -80,7 +121,7 @@ def test_send_quick_marker() -> None:
 
         gui.send_quick_marker("START")
 
-        mock_thread.send_marker.assert_called_once_with("START")
+        mock_thread.send_marker.assert_called_once_with("START", 12.5)
 
 
 def test_send_end_modality_marker() -> None:
@@ -100,6 +141,7 @@ def test_send_end_modality_marker() -> None:
         patch("mobi_marker.gui.QMainWindow.__init__"),
         patch("mobi_marker.gui.MobiMarkerGUI.init_ui"),
         patch("mobi_marker.gui.MobiMarkerGUI.start_lsl_stream"),
+        patch("mobi_marker.gui.local_clock", return_value=12.5),
     ):
         gui = MobiMarkerGUI()
         mock_thread = Mock(spec=LSLStreamThread)
@@ -114,7 +156,7 @@ def test_send_end_modality_marker() -> None:
 
         gui.send_end_modality_marker()
 
-        mock_thread.send_marker.assert_called_once_with("END EEG")
+        mock_thread.send_marker.assert_called_once_with("END EEG", 12.5)
 
 
 def test_send_end_modality_marker_custom() -> None:
@@ -134,6 +176,7 @@ def test_send_end_modality_marker_custom() -> None:
         patch("mobi_marker.gui.QMainWindow.__init__"),
         patch("mobi_marker.gui.MobiMarkerGUI.init_ui"),
         patch("mobi_marker.gui.MobiMarkerGUI.start_lsl_stream"),
+        patch("mobi_marker.gui.local_clock", return_value=12.5),
     ):
         gui = MobiMarkerGUI()
         mock_thread = Mock(spec=LSLStreamThread)
@@ -149,4 +192,26 @@ def test_send_end_modality_marker_custom() -> None:
 
         gui.send_end_modality_marker()
 
-        mock_thread.send_marker.assert_called_once_with("END CUSTOM SENSOR")
+        mock_thread.send_marker.assert_called_once_with("END CUSTOM SENSOR", 12.5)
+
+
+def test_stylesheet_covers_quick_markers() -> None:
+    """Test that the window style sheet styles every quick marker button.
+
+    Verifies that the single style sheet contains a normal, hover and pressed
+    color rule for each quick marker of the default profile, and that it is
+    built only once.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If a quick marker has no color rules.
+    """
+    stylesheet = build_stylesheet(DEFAULT_PROFILE.markers)
+    assert build_stylesheet(DEFAULT_PROFILE.markers) is stylesheet
+    for marker, color, _ in DEFAULT_PROFILE.markers:
+        selector = f'QPushButton[marker="{marker}"]'
+        assert f"{selector} {{ background-color: {color}; }}" in stylesheet
+        assert f"{selector}:hover {{ background-color: {color}CC; }}" in stylesheet
+        assert f"{selector}:pressed {{ background-color: {color}99; }}" in stylesheet
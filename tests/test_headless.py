@@ -0,0 +1,108 @@
+"""Test suite for the headless marker outlet.
+
+This module contains tests for running the marker outlet without the GUI.
+
+Functions:
+    test_run_headless_sends_input_lines: Tests that input lines are sent as
+        timestamped markers.
+    test_run_headless_without_outlet: Tests that markers are still accepted
+        and journaled when the LSL stream cannot be started.
+    test_run_headless_runs_protocol: Tests that end of input waits for the
+        protocol to finish.
+"""
+
+import io
+from pathlib import Path
+from unittest.mock import patch
+
+from mobi_marker.headless import run_headless
+from mobi_marker.journal_reader import JournalReader
+from mobi_marker.scheduler import Protocol, ProtocolStep
+
+
+def test_run_headless_sends_input_lines(tmp_path: Path) -> None:
+    """Test that every non-empty input line is sent as a marker.
+
+    Verifies that lines are pushed in order with the LSL time at which they
+    were read, that blank lines are skipped, and that the markers are
+    journaled.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the markers are not sent or journaled.
+    """
+    markers = io.StringIO("START\n\nEND\n")
+    journal_path = tmp_path / "session.mbj"
+
+    with (
+        patch("mobi_marker.engine.StreamInfo"),
+        patch("mobi_marker.engine.StreamOutlet") as outlet_class,
+        patch("mobi_marker.headless.local_clock", side_effect=[1.0, 2.0, 3.0]),
+    ):
+        status = run_headless(journal_path, markers)
+
+    assert status == 0
+    outlet = outlet_class.return_value
+    pushed = [(args[0], args[1]) for args, _ in outlet.push_sample.call_args_list] + [
+        (sample, ts)
+        for args, _ in outlet.push_chunk.call_args_list
+        for sample, ts in zip(*args)
+    ]
+    assert sorted(pushed, key=lambda item: item[1]) == [
+        (["START"], 1.0),
+        (["END"], 3.0),
+    ]
+    with JournalReader(journal_path) as reader:
+        assert [entry.marker for entry in reader] == ["START", "END"]
+
+
+def test_run_headless_without_outlet(tmp_path: Path) -> None:
+    """Test that markers are kept while the outlet cannot be created.
+
+    Verifies that the outlet is retried in the background instead of ending
+    the session, and that markers read meanwhile are journaled on exit.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the session ends early or a marker is lost.
+    """
+    journal_path = tmp_path / "session.mbj"
+    with (
+        patch("mobi_marker.engine.StreamInfo"),
+        patch("mobi_marker.engine.StreamOutlet", side_effect=RuntimeError("no lsl")),
+    ):
+        status = run_headless(journal_path, io.StringIO("START\n"))
+
+    assert status == 0
+    with JournalReader(journal_path) as reader:
+        assert [entry.marker for entry in reader] == ["START"]
+
+
+def test_run_headless_runs_protocol(tmp_path: Path) -> None:
+    """Test that end of input waits for the protocol to finish.
+
+    Verifies that the protocol's markers are sent alongside the input lines
+    and journaled before the outlet is stopped.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If a protocol marker is missing.
+    """
+    journal_path = tmp_path / "session.mbj"
+    protocol = Protocol("Test", (ProtocolStep("P1", 0.05), ProtocolStep("P2", 0.05)))
+
+    with (
+        patch("mobi_marker.engine.StreamInfo"),
+        patch("mobi_marker.engine.StreamOutlet"),
+    ):
+        status = run_headless(journal_path, io.StringIO("START\n"), protocol=protocol)
+
+    assert status == 0
+    with JournalReader(journal_path) as reader:
+        assert sorted(entry.marker for entry in reader) == ["P1", "P2", "START"]
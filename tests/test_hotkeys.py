@@ -0,0 +1,134 @@
+"""Test suite for the marker hotkeys.
+
+This module contains tests for resolving profile hotkeys into a lookup
+table and for the event filter sending the marker of a pressed hotkey.
+
+Functions:
+    test_build_hotkey_table: Tests the lookup table and invalid hotkeys.
+    test_dispatcher_sends_marker: Tests that a hotkey press sends its marker.
+    test_dispatcher_ignores_auto_repeat: Tests that held keys send once.
+    test_dispatcher_passes_other_events: Tests that other events pass through.
+"""
+
+import sys
+from unittest.mock import Mock
+
+from PyQt6.QtCore import QEvent, Qt
+from PyQt6.QtGui import QKeyEvent, QKeySequence
+
+from mobi_marker.hotkeys import HotkeyDispatcher, build_hotkey_table
+from mobi_marker.profile import QuickMarker
+
+
+def _key_press(key: Qt.Key, autorep: bool = False) -> QKeyEvent:
+    """Create a key press event without modifiers.
+
+    Args:
+        key: The pressed key.
+        autorep: Whether the press is auto-repeated.
+
+    Returns:
+        The key press event.
+    """
+    return QKeyEvent(
+        QEvent.Type.KeyPress, key, Qt.KeyboardModifier.NoModifier, "", autorep
+    )
+
+
+def test_build_hotkey_table() -> None:
+    """Test the lookup table and invalid hotkeys.
+
+    Verifies that valid hotkeys map their combined key code to the interned
+    marker string, that markers without a hotkey are skipped, and that
+    unknown keys and multi-key sequences are reported as invalid.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the table or the invalid hotkeys are wrong.
+    """
+    markers = [
+        QuickMarker("START", "#27ae60", "F1"),
+        QuickMarker("NOTE", "#3498db", "Ctrl+1"),
+        QuickMarker("PAUSE", "#f39c12"),
+        QuickMarker("BAD", "#c0392b", "bogus+key"),
+        QuickMarker("CHORD", "#c0392b", "A, B"),
+    ]
+
+    table, invalid = build_hotkey_table(markers)
+
+    assert table == {
+        QKeySequence("F1")[0].toCombined(): "START",
+        QKeySequence("Ctrl+1")[0].toCombined(): "NOTE",
+    }
+    assert table[QKeySequence("F1")[0].toCombined()] is sys.intern("START")
+    assert invalid == ["bogus+key", "A, B"]
+
+
+def test_dispatcher_sends_marker() -> None:
+    """Test that a hotkey press sends its marker.
+
+    Verifies that the marker is sent with a timestamp and that the key
+    press is consumed.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the marker is not sent or the press not consumed.
+    """
+    table, _ = build_hotkey_table([QuickMarker("START", "#27ae60", "F1")])
+    send = Mock()
+    dispatcher = HotkeyDispatcher(table, send)
+
+    assert dispatcher.eventFilter(None, _key_press(Qt.Key.Key_F1))
+
+    send.assert_called_once()
+    marker, timestamp = send.call_args.args
+    assert marker == "START"
+    assert isinstance(timestamp, float)
+
+
+def test_dispatcher_ignores_auto_repeat() -> None:
+    """Test that held keys send their marker once.
+
+    Verifies that an auto-repeated hotkey press is consumed without sending
+    the marker again.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the marker is sent or the press not consumed.
+    """
+    table, _ = build_hotkey_table([QuickMarker("START", "#27ae60", "F1")])
+    send = Mock()
+    dispatcher = HotkeyDispatcher(table, send)
+
+    assert dispatcher.eventFilter(None, _key_press(Qt.Key.Key_F1, autorep=True))
+
+    send.assert_not_called()
+
+
+def test_dispatcher_passes_other_events() -> None:
+    """Test that other keys and events pass through.
+
+    Verifies that key presses without a hotkey and non-key events are not
+    consumed and send nothing.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If an event is consumed or a marker sent.
+    """
+    table, _ = build_hotkey_table([QuickMarker("START", "#27ae60", "F1")])
+    send = Mock()
+    dispatcher = HotkeyDispatcher(table, send)
+
+    assert not dispatcher.eventFilter(None, _key_press(Qt.Key.Key_F2))
+    assert not dispatcher.eventFilter(None, QEvent(QEvent.Type.FocusIn))
+    assert not dispatcher.eventFilter(None, None)
+
+    send.assert_not_called()
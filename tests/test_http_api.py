@@ -0,0 +1,201 @@
+"""Test suite for the marker HTTP API.
+
+This module contains tests for submitting markers with POST /markers using
+a local HTTP client.
+
+Functions:
+    test_http_single_marker: Tests submitting a single marker.
+    test_http_marker_array_is_one_chunk: Tests that an array of markers is
+        pushed with a single push_chunk call.
+    test_http_errors: Tests the responses to invalid requests.
+    test_http_keep_alive_does_not_block: Tests that an idle keep-alive
+        connection neither blocks other clients nor stop().
+"""
+
+import http.client
+import json
+import socket
+from typing import Iterator
+from unittest.mock import Mock, patch
+
+import pytest
+
+from mobi_marker.engine import MarkerEngine
+from mobi_marker.http_api import HTTPMarkerServer
+
+
+@pytest.fixture
+def api() -> Iterator[HTTPMarkerServer]:
+    """Start an HTTP API on a free port for an engine with a mock outlet.
+
+    Yields:
+        The running server. The engine is not dispatching; tests call
+        _dispatch_pending() themselves.
+    """
+    engine = MarkerEngine()
+    engine.outlet = Mock()
+    server = HTTPMarkerServer(engine, port=0)
+    server.start()
+    yield server
+    server.stop()
+    server.join()
+
+
+def _post(
+    server: HTTPMarkerServer, body: object, path: str = "/markers"
+) -> tuple[int, object]:
+    """Send a JSON request to the API.
+
+    Args:
+        server: The running server.
+        body: The JSON-serializable request body.
+        path: The request path.
+
+    Returns:
+        The response status and decoded JSON body.
+    """
+    connection = http.client.HTTPConnection(*server.address, timeout=5)
+    try:
+        connection.request(
+            "POST",
+            path,
+            json.dumps(body),
+            {"Content-Type": "application/json"},
+        )
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def test_http_single_marker(api: HTTPMarkerServer) -> None:
+    """Test submitting a single marker.
+
+    Verifies that a marker without timestamp is stamped with the time the
+    request was received, and that the assigned sequence number and
+    timestamp are returned.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the marker is not queued or the response is wrong.
+    """
+    with patch("mobi_marker.http_api.local_clock", return_value=7.5):
+        status, body = _post(api, "START")
+
+    assert status == 200
+    assert body == {"seq": 1, "timestamp": 7.5}
+    api.engine._dispatch_pending()
+    outlet = api.engine.outlet
+    assert outlet is not None
+    outlet.push_sample.assert_called_once_with(["START"], 7.5)
+
+
+def test_http_marker_array_is_one_chunk(api: HTTPMarkerServer) -> None:
+    """Test that an array of markers is pushed with one push_chunk call.
+
+    Verifies that client timestamps are kept, that markers without one get
+    the receipt time, and that 10k markers bypass max_batch_size and reach
+    the outlet as a single chunk.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the markers are split or mistimed.
+    """
+    markers: list[object] = [
+        {"marker": f"M{i}", "timestamp": 100.0 + i} for i in range(10000)
+    ]
+    markers[1] = "NO TIMESTAMP"
+    with patch("mobi_marker.http_api.local_clock", return_value=50.0):
+        status, body = _post(api, markers)
+
+    assert status == 200
+    assert isinstance(body, list)
+    assert [entry["seq"] for entry in body] == list(range(1, 10001))
+    assert body[0]["timestamp"] == 100.0
+    assert body[1]["timestamp"] == 50.0
+
+    api.engine._dispatch_pending()
+    outlet = api.engine.outlet
+    assert outlet is not None
+    outlet.push_sample.assert_not_called()
+    outlet.push_chunk.assert_called_once()
+    samples, timestamps = outlet.push_chunk.call_args.args
+    assert len(samples) == 10000
+    assert samples[:2] == [["M0"], ["NO TIMESTAMP"]]
+    assert timestamps[:3] == [100.0, 50.0, 102.0]
+
+
+def test_http_errors(api: HTTPMarkerServer) -> None:
+    """Test the responses to invalid requests.
+
+    Verifies that malformed markers, non-finite timestamps and a negative
+    Content-Length are rejected with 400, unknown paths with 404, and that no marker is
+    accepted while the stream is down.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If an invalid request is accepted.
+    """
+    assert _post(api, {"marker": 3})[0] == 400
+    assert _post(api, ["A", {"marker": "B", "timestamp": "soon"}])[0] == 400
+    for timestamp in (float("nan"), float("inf"), 1e400):
+        assert _post(api, {"marker": "A", "timestamp": timestamp})[0] == 400
+    assert len(api.engine._drain(10)) == 0
+    assert _post(api, "A", path="/other")[0] == 404
+
+    connection = http.client.HTTPConnection(*api.address, timeout=5)
+    connection.putrequest("POST", "/markers")
+    connection.putheader("Content-Length", "-1")
+    connection.endheaders()
+    assert connection.getresponse().status == 400
+    connection.close()
+
+    api.engine.outlet = None
+    status, body = _post(api, ["A", "B"])
+    assert status == 503
+    assert body == {"error": "LSL stream not active"}
+    assert api.dropped == 2
+    assert len(api.engine._drain(10)) == 0
+
+
+def test_http_keep_alive_does_not_block() -> None:
+    """Test that an idle keep-alive connection does not hold the server.
+
+    Verifies that the server closes the connection after its response even
+    when the client asks to keep it alive, that another client is served
+    afterwards, and that stop() returns before the first client hangs up.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the connection is kept open or stop() hangs.
+    """
+    engine = MarkerEngine()
+    engine.outlet = Mock()
+    server = HTTPMarkerServer(engine, port=0)
+    server.start()
+    client = socket.create_connection(server.address, timeout=5)
+    try:
+        client.sendall(
+            b"POST /markers HTTP/1.1\r\nHost: localhost\r\n"
+            b'Connection: keep-alive\r\nContent-Length: 3\r\n\r\n"A"'
+        )
+        response = b""
+        while chunk := client.recv(4096):
+            response += chunk
+        assert response.startswith(b"HTTP/1.0 200")
+
+        assert _post(server, "B")[0] == 200
+    finally:
+        server.stop()
+        server.join(5.0)
+        client.close()
+
+    assert not server.is_alive()
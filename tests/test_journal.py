@@ -0,0 +1,172 @@
+"""Test suite for the marker journal.
+
+This module contains tests for the append-only on-disk journal that records
+every dispatched marker.
+
+Functions:
+    test_journal_writes_fixed_records: Tests the on-disk record layout.
+    test_journal_appends_to_existing_file: Tests reopening a journal.
+    test_journal_rejects_foreign_file: Tests header validation.
+    test_journal_group_sync: Tests background and synchronous fsyncs.
+    test_default_journal_path_is_unique: Tests that sessions started in the
+        same second get their own journal.
+"""
+
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from mobi_marker.dispatch import MarkerRecord
+from mobi_marker.journal import (
+    HEADER,
+    JOURNAL_MAGIC,
+    JOURNAL_VERSION,
+    PAYLOAD_SIZE,
+    RECORD,
+    MarkerJournal,
+    default_journal_path,
+)
+
+
+def _read_records(path: Path) -> list[tuple]:
+    """Read and unpack every record of a journal file.
+
+    Args:
+        path: Path of the journal file.
+
+    Returns:
+        The unpacked records.
+    """
+    data = path.read_bytes()
+    return [
+        RECORD.unpack_from(data, offset)
+        for offset in range(HEADER.size, len(data), RECORD.size)
+    ]
+
+
+def test_journal_writes_fixed_records(tmp_path: Path) -> None:
+    """Test that markers are written as fixed-size records after a header.
+
+    Verifies the header, the record fields, and that payloads longer than
+    PAYLOAD_SIZE are truncated while keeping their full length.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the file layout does not match the format.
+    """
+    path = tmp_path / "nested" / "session.mbj"
+    long_marker = "é" * PAYLOAD_SIZE
+    journal = MarkerJournal(path, sync_interval=0.5)
+    journal.write(
+        [MarkerRecord(1, "START", 10.5), MarkerRecord(2, long_marker, 11.0)], 99.0
+    )
+    journal.close()
+
+    data = path.read_bytes()
+    assert HEADER.unpack_from(data) == (JOURNAL_MAGIC, JOURNAL_VERSION, RECORD.size)
+    assert len(data) == HEADER.size + 2 * RECORD.size
+
+    first, second = _read_records(path)
+    assert first[:4] == (1, 10.5, 99.0, 5)
+    assert first[4].rstrip(b"\0") == b"START"
+    assert second[3] == len(long_marker.encode("utf-8"))
+    assert len(second[4]) == PAYLOAD_SIZE
+
+
+def test_journal_appends_to_existing_file(tmp_path: Path) -> None:
+    """Test that reopening a journal appends after the existing records.
+
+    Verifies that a record left half-written by a crash is dropped so the
+    appended records stay aligned.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If existing records are lost or misaligned.
+    """
+    path = tmp_path / "session.mbj"
+    journal = MarkerJournal(path, sync_interval=0)
+    journal.write([MarkerRecord(1, "A", 1.0)], 1.0)
+    journal.close()
+    with open(path, "ab") as partial:
+        partial.write(b"\x01" * 10)
+
+    journal = MarkerJournal(path, sync_interval=0)
+    journal.write([MarkerRecord(2, "B", 2.0)], 2.0)
+    journal.close()
+
+    assert [record[0] for record in _read_records(path)] == [1, 2]
+
+
+def test_journal_rejects_foreign_file(tmp_path: Path) -> None:
+    """Test that a file that is not a marker journal is not appended to.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the foreign file is accepted or modified.
+    """
+    path = tmp_path / "notes.txt"
+    path.write_bytes(b"these are not markers")
+
+    with pytest.raises(ValueError):
+        MarkerJournal(path)
+
+    assert path.read_bytes() == b"these are not markers"
+
+
+def test_journal_group_sync(tmp_path: Path) -> None:
+    """Test that buffered records are fsync'd in groups in the background.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If records are not synced within the interval.
+    """
+    journal = MarkerJournal(tmp_path / "session.mbj", sync_interval=0.01)
+    journal.write([MarkerRecord(seq, "M", float(seq)) for seq in range(5)], 1.0)
+    assert journal.records_written == 5
+
+    deadline = time.monotonic() + 5
+    while journal.records_synced != 5 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    journal.close()
+
+    assert journal.records_synced == 5
+
+
+def test_default_journal_path_is_unique() -> None:
+    """Test that sessions started in the same second get their own journal.
+
+    Verifies that consecutive default paths differ, and that the path names
+    the process so sessions running side by side cannot collide.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If two sessions would share a journal.
+    """
+    paths = {default_journal_path() for _ in range(100)}
+
+    assert len(paths) == 100
+    assert all(path.stem.endswith(f"-{os.getpid()}") for path in paths)
@@ -0,0 +1,137 @@
+"""Test suite for the memory-mapped journal reader.
+
+This module contains tests for reading marker journals through NumPy views
+of a memory-mapped file.
+
+Functions:
+    test_journal_reader_views: Tests the structured array views.
+    test_journal_reader_decodes_payloads: Tests lazy payload decoding.
+    test_journal_reader_ignores_partial_record: Tests crash leftovers.
+    test_journal_reader_view_outlives_close: Tests closing while a view is
+        held.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from mobi_marker.dispatch import MarkerRecord
+from mobi_marker.journal import PAYLOAD_SIZE, MarkerJournal
+from mobi_marker.journal_reader import JournalEntry, JournalReader
+
+
+def _write_journal(path: Path, markers: list[str]) -> None:
+    """Write a journal with one record per marker.
+
+    Args:
+        path: Path of the journal file.
+        markers: The markers to journal, with timestamps 0.5 s apart.
+    """
+    journal = MarkerJournal(path, sync_interval=0)
+    journal.write(
+        [
+            MarkerRecord(seq, marker, 100.0 + seq / 2)
+            for seq, marker in enumerate(markers, start=1)
+        ],
+        1700000000.0,
+    )
+    journal.close()
+
+
+def test_journal_reader_views(tmp_path: Path) -> None:
+    """Test that record fields are exposed as structured array views.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the views do not match the journaled records.
+    """
+    path = tmp_path / "session.mbj"
+    _write_journal(path, ["START", "NOTE", "END"])
+
+    with JournalReader(path) as reader:
+        assert len(reader) == 3
+        np.testing.assert_array_equal(reader.seq, [1, 2, 3])
+        np.testing.assert_allclose(reader.lsl_time, [100.5, 101.0, 101.5])
+        assert reader.wall_time[0] == 1700000000.0
+        assert not reader.seq.flags.owndata
+
+
+def test_journal_reader_decodes_payloads(tmp_path: Path) -> None:
+    """Test that payloads are decoded on demand, including truncated ones.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If payloads are decoded incorrectly.
+    """
+    path = tmp_path / "session.mbj"
+    long_marker = "ü" * PAYLOAD_SIZE
+    _write_journal(path, ["Zürich", long_marker])
+
+    with JournalReader(path) as reader:
+        assert reader.payload(0) == "Zürich"
+        assert not reader.truncated(0)
+        assert reader.truncated(1)
+        assert reader.payload(1) == "ü" * (PAYLOAD_SIZE // 2)
+        assert list(reader)[0] == JournalEntry(1, 100.5, 1700000000.0, "Zürich")
+
+
+def test_journal_reader_ignores_partial_record(tmp_path: Path) -> None:
+    """Test that a half-written trailing record is not exposed.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the partial record is read.
+    """
+    path = tmp_path / "session.mbj"
+    _write_journal(path, ["START"])
+    with open(path, "ab") as partial:
+        partial.write(b"\x00" * 17)
+
+    with JournalReader(path) as reader:
+        assert len(reader) == 1
+
+    foreign = tmp_path / "foreign.bin"
+    foreign.write_bytes(b"\x00" * 64)
+    with pytest.raises(ValueError):
+        JournalReader(foreign)
+
+
+def test_journal_reader_view_outlives_close(tmp_path: Path) -> None:
+    """Test closing the reader while a view is still held.
+
+    Verifies that leaving the context does not fail while the caller keeps
+    a view into the mapping, and that the view stays readable.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If closing fails or the view is invalidated.
+    """
+    path = tmp_path / "session.mbj"
+    _write_journal(path, ["START", "END"])
+
+    with JournalReader(path) as reader:
+        timestamps = reader.lsl_time
+
+    assert len(reader) == 0
+    np.testing.assert_allclose(timestamps, [100.5, 101.0])
@@ -0,0 +1,58 @@
+"""Test suite for starting the network listeners.
+
+This module contains tests for opening the requested network listeners
+without loading the others.
+
+Functions:
+    test_start_listeners_imports_only_enabled: Tests that only the enabled
+        listeners are imported and started.
+"""
+
+import subprocess
+import sys
+
+_SCRIPT = """
+import sys
+from mobi_marker.engine import MarkerEngine
+from mobi_marker.listeners import start_listeners
+
+listeners = start_listeners(MarkerEngine(), udp_port=0)
+for listener in listeners:
+    listener.stop()
+    listener.join()
+print(type(listeners[0]).__name__, len(listeners))
+print(*sorted(name for name in sys.argv[1:] if name in sys.modules))
+"""
+
+
+def test_start_listeners_imports_only_enabled() -> None:
+    """Test that only the enabled listeners are imported and started.
+
+    Verifies in a fresh interpreter that opening the UDP listener alone
+    starts only that listener and loads neither the asyncio server nor the
+    HTTP API.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If another listener is started or imported.
+    """
+    loaded = {
+        "asyncio",
+        "http.server",
+        "mobi_marker.http_api",
+        "mobi_marker.server",
+        "mobi_marker.udp",
+    }
+    result = subprocess.run(
+        [sys.executable, "-c", _SCRIPT, *loaded],
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=30,
+    )
+
+    started, imported = result.stdout.splitlines()
+    assert started == "UDPMarkerListener 1"
+    assert imported == "mobi_marker.udp"
@@ -5,8 +5,36 @@ of the MoBI Marker application.
 
 Functions:
     test_import: Tests that the main function can be imported successfully.
+    test_headless_does_not_import_qt: Tests that headless mode stays free of
+        PyQt6.
+    test_import_time: Tests that importing the package loads no heavy
+        dependency.
+    test_lazy_exports: Tests that the package exports are loaded on first
+        access.
+    test_main_headless_dispatch: Tests that --headless runs the headless
+        outlet with the requested journal.
+    test_main_gui_profile: Tests that --profile is loaded and passed to the
+        GUI.
 """
 
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+import mobi_marker
+from mobi_marker.main import main
+
+# Generous upper bound on the cumulative import time of the package, in
+# microseconds; loading pylsl or PyQt6 alone takes several times longer
+IMPORT_BUDGET_US = 50_000
+
+# Upper bound on the import time of the headless outlet apart from pylsl;
+# eagerly importing its optional subsystems alone took longer
+HEADLESS_BUDGET_US = 100_000
+
 
 def test_import() -> None:
     """Test that the main function can be imported.
@@ -24,3 +52,215 @@ def test_import() -> None:
     from mobi_marker import main
 
     assert callable(main)
+
+
+def test_headless_does_not_import_qt() -> None:
+    """Test that the headless code path never imports PyQt6.
+
+    Verifies in a fresh interpreter that importing the package, the entry
+    point and the headless runner leaves PyQt6 unloaded.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If PyQt6 is imported.
+    """
+    code = (
+        "import sys, mobi_marker, mobi_marker.main, mobi_marker.headless; "
+        "sys.exit('PyQt6' in sys.modules)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], check=False)
+
+    assert result.returncode == 0
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """Measure the import of a module in a fresh interpreter.
+
+    Args:
+        module: Name of the module to import.
+
+    Returns:
+        The cumulative import time in microseconds of every module loaded.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, total, name = line.split("|")
+        cumulative[name.strip()] = int(total)
+    return cumulative
+
+
+def test_import_time() -> None:
+    """Test that importing the package loads no heavy dependency.
+
+    Verifies with ``-X importtime`` in a fresh interpreter that importing the
+    package and the entry point loads neither PyQt6, pylsl nor numpy, and
+    that the import stays within IMPORT_BUDGET_US. Also verifies that the
+    headless outlet loads none of its optional subsystems, and that apart
+    from pylsl it stays within HEADLESS_BUDGET_US.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If a heavy dependency is imported or the import is
+            too slow.
+    """
+    cumulative = _import_times("mobi_marker.main")
+    heavy = {name.split(".")[0] for name in cumulative} & {"PyQt6", "pylsl", "numpy"}
+    assert not heavy
+    assert cumulative["mobi_marker"] < IMPORT_BUDGET_US
+
+    cumulative = _import_times("mobi_marker.headless")
+    optional = {
+        "PyQt6",
+        "asyncio",
+        "http.server",
+        "mobi_marker.exporter",
+        "mobi_marker.http_api",
+        "mobi_marker.recorder",
+        "mobi_marker.scheduler",
+        "mobi_marker.server",
+        "mobi_marker.udp",
+    }
+    assert not optional & set(cumulative)
+    headless = cumulative["mobi_marker.headless"] - cumulative["pylsl"]
+    assert headless < HEADLESS_BUDGET_US
+
+
+def test_lazy_exports() -> None:
+    """Test that the package exports are loaded on first access.
+
+    Verifies that the lazily exported names resolve to the objects of their
+    modules, are listed by dir(), and that unknown names still raise.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If an export does not resolve as expected.
+    """
+    from mobi_marker.engine import MarkerEngine
+    from mobi_marker.headless import run_headless
+
+    assert mobi_marker.MarkerEngine is MarkerEngine
+    assert mobi_marker.run_headless is run_headless
+    assert set(mobi_marker.__all__) <= set(dir(mobi_marker))
+    with pytest.raises(AttributeError):
+        mobi_marker.missing  # noqa: B018
+
+
+def test_main_headless_dispatch() -> None:
+    """Test that --headless dispatches to the headless runner.
+
+    Verifies that the journal path, listener ports and recording options are
+    passed through, that --no-journal disables journaling, and that arguments
+    meant for Qt and --record-stream without --record are rejected.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the headless runner is not called as expected.
+    """
+    with patch("mobi_marker.headless.run_headless", return_value=0) as run:
+        with pytest.raises(SystemExit) as exit_info:
+            main(["--headless", "--journal", "session.mbj"])
+        assert exit_info.value.code == 0
+        run.assert_called_once_with(
+            "session.mbj",
+            host="127.0.0.1",
+            udp_port=None,
+            tcp_port=None,
+            ws_port=None,
+            http_port=None,
+            instrument=False,
+            metrics_port=None,
+            record_path=None,
+            record_streams=[],
+            hold_until_consumers=False,
+            protocol=None,
+        )
+
+        run.reset_mock()
+        with pytest.raises(SystemExit):
+            main(
+                [
+                    "--headless",
+                    "--no-journal",
+                    "--udp-port",
+                    "15000",
+                    "--record",
+                    "session.xdf",
+                    "--record-stream",
+                    "EEG",
+                    "--hold-until-consumers",
+                ]
+            )
+        run.assert_called_once_with(
+            None,
+            host="127.0.0.1",
+            udp_port=15000,
+            tcp_port=None,
+            ws_port=None,
+            http_port=None,
+            instrument=False,
+            metrics_port=None,
+            record_path="session.xdf",
+            record_streams=["EEG"],
+            hold_until_consumers=True,
+            protocol=None,
+        )
+
+        run.reset_mock()
+        with pytest.raises(SystemExit) as exit_info:
+            main(["--headless", "--record-stream", "EEG"])
+        assert exit_info.value.code == 2
+        run.assert_not_called()
+
+        run.reset_mock()
+        with pytest.raises(SystemExit) as exit_info:
+            main(["--headless", "-style", "fusion"])
+        assert exit_info.value.code == 2
+        run.assert_not_called()
+
+
+def test_main_gui_profile(tmp_path: Path) -> None:
+    """Test that --profile is loaded and passed to the GUI.
+
+    Verifies that the GUI receives the loaded profile, that an invalid
+    profile is reported as a usage error, and that --profile is rejected in
+    headless mode.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the profile is not passed or errors are missed.
+    """
+    path = tmp_path / "study.toml"
+    path.write_text('name = "Study"\nmodalities = ["EEG"]\n')
+
+    with patch("mobi_marker.gui.main") as gui_main:
+        main(["--no-journal", "--profile", str(path)])
+        profile = gui_main.call_args.kwargs["profile"]
+        assert profile.name == "Study"
+        assert profile.modalities == ("EEG",)
+
+        path.write_text("columns = 0\n")
+        with pytest.raises(SystemExit) as exit_info:
+            main(["--profile", str(path)])
+        assert exit_info.value.code == 2
+
+        with pytest.raises(SystemExit) as exit_info:
+            main(["--headless", "--profile", str(path)])
+        assert exit_info.value.code == 2
@@ -0,0 +1,144 @@
+"""Test suite for the hot-path instrumentation.
+
+This module contains tests for the fixed-bucket histograms, counters and
+snapshots used to instrument the marker hot path.
+
+Functions:
+    test_bucket_bounds: Tests that every value falls into a bucket whose
+        bounds contain it.
+    test_histogram_percentiles: Tests recorded values and percentiles.
+    test_histogram_out_of_range: Tests that invalid durations neither raise
+        nor distort the statistics.
+    test_metrics_snapshot_readout: Tests the snapshot and its one-line
+        readout.
+"""
+
+from mobi_marker.metrics import (
+    BUCKET_COUNT,
+    SUB_BUCKETS,
+    Histogram,
+    Metrics,
+    bucket_index,
+    bucket_lower_bound,
+)
+
+
+def test_bucket_bounds() -> None:
+    """Test that every value falls into a bucket whose bounds contain it.
+
+    Verifies that small values have exact buckets, that bucket bounds hold
+    their values with a relative error of at most 1/16, and that huge values
+    are clamped into the last bucket.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If a value lies outside its bucket.
+    """
+    for value in range(SUB_BUCKETS):
+        assert bucket_index(value) == value
+    for value in (16, 17, 31, 32, 33, 1000, 123_456, 10**9, 2**39 + 5):
+        index = bucket_index(value)
+        lower = bucket_lower_bound(index)
+        upper = bucket_lower_bound(index + 1)
+        assert lower <= value < upper
+        assert upper - lower <= max(1, lower // SUB_BUCKETS)
+    assert bucket_index(2**60) == BUCKET_COUNT - 1
+
+
+def test_histogram_percentiles() -> None:
+    """Test recorded values and percentiles.
+
+    Verifies the sample count, sum, extremes and mean, that percentiles are
+    within one bucket of the exact value, and that an empty histogram reports
+    zeros.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the histogram statistics are wrong.
+    """
+    histogram = Histogram("test", "Test histogram")
+    assert histogram.snapshot().percentile(99) == 0
+    assert histogram.snapshot().min == 0
+
+    for value in range(1, 1001):
+        histogram.record(value * 1000)
+    histogram.record(-5)
+
+    snapshot = histogram.snapshot()
+    assert snapshot.samples == 1001
+    assert snapshot.total == 500_500_000
+    assert snapshot.min == 0
+    assert snapshot.max == 1_000_000
+    assert snapshot.mean == 500_500_000 / 1001
+    assert 500_000 <= snapshot.percentile(50) <= 500_000 * 17 // 16
+    assert 990_000 <= snapshot.percentile(99) <= 1_000_000
+    assert snapshot.percentile(100) == 1_000_000
+
+
+def test_histogram_out_of_range() -> None:
+    """Test that invalid durations neither raise nor distort the statistics.
+
+    Verifies that NaN is skipped, that infinities and values beyond the last
+    bucket are clamped to the largest value it holds, and that negative
+    durations in seconds are recorded as 0.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If an invalid value raises or is recorded wrongly.
+    """
+    histogram = Histogram("test", "Test histogram")
+    largest = bucket_lower_bound(BUCKET_COUNT) - 1
+
+    histogram.record_seconds(float("nan"))
+    assert histogram.snapshot().samples == 0
+
+    histogram.record_seconds(float("inf"))
+    histogram.record_seconds(1e12)
+    histogram.record(2**70)
+    histogram.record_seconds(float("-inf"))
+    histogram.record_seconds(0.0015)
+
+    snapshot = histogram.snapshot()
+    assert snapshot.samples == 5
+    assert snapshot.max == largest
+    assert snapshot.min == 0
+    assert snapshot.counts[BUCKET_COUNT - 1] == 3
+    assert snapshot.counts[bucket_index(1_500_000)] == 1
+
+
+def test_metrics_snapshot_readout() -> None:
+    """Test the snapshot and its one-line readout.
+
+    Verifies that snapshots copy counter values and are not affected by later
+    updates, and that the readout shows the counters and push latencies.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the snapshot or readout is wrong.
+    """
+    metrics = Metrics()
+    metrics.markers_sent.inc(1234)
+    metrics.send_errors.inc()
+    metrics.push.record(20_000)
+    snapshot = metrics.snapshot()
+    metrics.markers_sent.inc()
+
+    assert snapshot.counters["markers_sent"] == 1234
+    assert set(snapshot.histograms) == {
+        "enqueue",
+        "dispatch",
+        "push",
+        "status_format",
+        "schedule",
+    }
+    readout = snapshot.readout()
+    assert readout.startswith("Sent 1,234 | Rejected 0 | Errors 1 | push p50 20.0 µs")
+    assert readout.endswith("event-to-push p99 0.0 µs")
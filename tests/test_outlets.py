@@ -0,0 +1,144 @@
+"""Test suite for the multi-stream outlet manager.
+
+This module contains tests for publishing several marker streams, each
+with its own engine and dispatch thread, and routing markers by key.
+
+Functions:
+    test_manager_routes_markers: Tests that markers reach their stream only.
+    test_manager_isolates_streams: Tests that a blocked stream does not delay
+        another.
+    test_manager_rejects_unknown_stream: Tests markers sent to a missing key.
+    test_manager_requires_unique_streams: Tests stream validation.
+"""
+
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+from mobi_marker.outlets import OutletManager, StreamSpec
+from mobi_marker.status import StatusLevel, StatusRecord
+
+
+def test_manager_routes_markers() -> None:
+    """Test that markers reach their own stream only.
+
+    Verifies that every stream gets an outlet with its own name and source
+    ID, that markers are pushed on the stream named by their key, and that
+    status records are delivered with the key of their stream.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If a marker is pushed on the wrong stream.
+    """
+    statuses: list[tuple[str, list[StatusRecord]]] = []
+    manager = OutletManager(
+        [StreamSpec("behavior", "Behavior"), StreamSpec("sync", "Sync", "sync-1")],
+        on_status=lambda key, records: statuses.append((key, records)),
+    )
+    with (
+        patch("mobi_marker.engine.StreamInfo") as mock_info_cls,
+        patch("mobi_marker.engine.StreamOutlet", side_effect=lambda info: Mock()),
+    ):
+        manager.start()
+        assert manager.wait_started(5.0)
+        assert manager.send_marker("behavior", "START", 1.0) is None
+        assert manager.send_marker("sync", "PULSE", 2.0) is None
+        manager.stop()
+
+    infos = {call.kwargs["name"]: call.kwargs for call in mock_info_cls.call_args_list}
+    assert infos["Behavior"]["source_id"] == "mobi_marker_gui_v1_behavior"
+    assert infos["Sync"]["source_id"] == "sync-1"
+    behavior = manager.engines["behavior"].outlet
+    sync = manager.engines["sync"].outlet
+    assert behavior is not sync
+    behavior.push_sample.assert_called_once_with(["START"], 1.0)  # type: ignore[union-attr]
+    sync.push_sample.assert_called_once_with(["PULSE"], 2.0)  # type: ignore[union-attr]
+    assert {key for key, _ in statuses} == {"behavior", "sync"}
+
+
+def test_manager_isolates_streams() -> None:
+    """Test that a blocked stream does not delay another.
+
+    Verifies that while one stream's push is stuck, markers on another
+    stream are still pushed by that stream's own dispatch thread.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the second stream waits for the blocked one.
+    """
+    manager = OutletManager([StreamSpec("slow", "Slow"), StreamSpec("fast", "Fast")])
+    release = threading.Event()
+    blocked = threading.Event()
+    pushed = threading.Event()
+    with (
+        patch("mobi_marker.engine.StreamInfo"),
+        patch("mobi_marker.engine.StreamOutlet", side_effect=lambda info: Mock()),
+    ):
+        manager.start()
+        assert manager.wait_started(5.0)
+        slow = manager.engines["slow"].outlet
+        fast = manager.engines["fast"].outlet
+
+        def block(*args: object) -> None:
+            blocked.set()
+            release.wait(5.0)
+
+        slow.push_sample.side_effect = block  # type: ignore[union-attr]
+        fast.push_sample.side_effect = lambda *args: pushed.set()  # type: ignore[union-attr]
+        try:
+            manager.send_marker("slow", "STUCK")
+            assert blocked.wait(5.0)
+            manager.send_marker("fast", "FREE")
+            assert pushed.wait(5.0)
+            assert not release.is_set()
+        finally:
+            release.set()
+            manager.stop()
+
+
+def test_manager_rejects_unknown_stream() -> None:
+    """Test markers sent to a key without a stream.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the marker is not rejected.
+    """
+    manager = OutletManager([StreamSpec("behavior", "Behavior")])
+
+    rejection = manager.send_marker("notes", "HELLO")
+
+    assert rejection is not None
+    assert rejection.level == StatusLevel.ERROR
+    assert rejection.detail == "notes"
+
+
+@pytest.mark.parametrize(
+    "streams",
+    [
+        [],
+        [StreamSpec("a", "A"), StreamSpec("a", "B")],
+        [StreamSpec("a", "A"), StreamSpec("b", "A")],
+        [StreamSpec("a", "A", "same"), StreamSpec("b", "B", "same")],
+    ],
+)
+def test_manager_requires_unique_streams(streams: list[StreamSpec]) -> None:
+    """Test that streams must exist and be distinguishable.
+
+    Args:
+        streams: Invalid stream configurations.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the configuration is accepted.
+    """
+    with pytest.raises(ValueError):
+        OutletManager(streams)
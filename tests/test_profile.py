@@ -0,0 +1,185 @@
+"""Test suite for marker profiles.
+
+This module contains tests for loading, validating and caching the TOML and
+JSON profiles that configure the quick markers and modalities.
+
+Functions:
+    test_load_toml_profile: Tests loading a TOML profile.
+    test_load_json_profile_defaults: Tests that missing keys take their
+        default values.
+    test_profile_cache: Tests that parsed profiles are cached by mtime.
+    test_invalid_profiles: Tests that invalid profiles are rejected.
+    test_resolve_profile: Tests finding profiles by path and by name.
+"""
+
+import json
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from mobi_marker import profile as profile_module
+from mobi_marker.profile import (
+    DEFAULT_PROFILE,
+    QuickMarker,
+    load_profile,
+    resolve_profile,
+)
+
+WALKING_PROFILE = """
+name = "Walking study"
+columns = 2
+modalities = ["EEG", "Other", "Motion Capture", "EEG"]
+
+[[markers]]
+text = "START"
+color = "#27AE60"
+hotkey = "F1"
+
+[[markers]]
+text = "TURN"
+"""
+
+
+def test_load_toml_profile(tmp_path: Path) -> None:
+    """Test loading a TOML profile.
+
+    Verifies that markers, colors, hotkeys, columns and modalities are read,
+    that colors are normalized, and that "Other" and duplicate modalities are
+    dropped.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the profile is not loaded as expected.
+    """
+    path = tmp_path / "walking.toml"
+    path.write_text(WALKING_PROFILE)
+
+    profile = load_profile(path)
+
+    assert profile.name == "Walking study"
+    assert profile.columns == 2
+    assert profile.markers == (
+        QuickMarker("START", "#27ae60", "F1"),
+        QuickMarker("TURN", "#3498db", None),
+    )
+    assert profile.modalities == ("EEG", "Motion Capture")
+
+
+def test_load_json_profile_defaults(tmp_path: Path) -> None:
+    """Test that missing keys take their default values.
+
+    Verifies that a JSON profile setting only its modalities keeps the
+    default quick markers and grid, and is named after its file.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If a default is not applied.
+    """
+    path = tmp_path / "ecg.json"
+    path.write_text(json.dumps({"modalities": ["ECG"]}))
+
+    profile = load_profile(path)
+
+    assert profile.name == "ecg"
+    assert profile.markers == DEFAULT_PROFILE.markers
+    assert profile.columns == DEFAULT_PROFILE.columns
+    assert profile.modalities == ("ECG",)
+
+
+def test_profile_cache(tmp_path: Path) -> None:
+    """Test that parsed profiles are cached by mtime.
+
+    Verifies that loading a profile writes a cache next to it, that a later
+    process loads the cache without parsing the profile again, and that
+    changing the profile invalidates the cache.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the cache is not written, used or invalidated.
+    """
+    path = tmp_path / "walking.toml"
+    path.write_text(WALKING_PROFILE)
+    profile = load_profile(path)
+    assert (tmp_path / ".walking.toml.cache").is_file()
+
+    # Simulate a new process, which starts without in-memory profiles
+    with (
+        patch.dict(profile_module._loaded, clear=True),
+        patch.object(profile_module, "parse_profile") as parse,
+    ):
+        assert load_profile(path) == profile
+        parse.assert_not_called()
+
+    path.write_text(WALKING_PROFILE.replace("Walking study", "Running study"))
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert load_profile(path).name == "Running study"
+
+
+@pytest.mark.parametrize(
+    ("document", "message"),
+    [
+        ('markers = [{text = "A", color = "red"}]', "color"),
+        ('markers = [{text = ""}]', "text"),
+        ('markers = [{text = "A"}, {text = "A"}]', "unique"),
+        (
+            'markers = [{text = "A", hotkey = "F1"}, {text = "B", hotkey = "F1"}]',
+            "hotkeys",
+        ),
+        ("modalities = [1]", "modalities"),
+        ("columns = 0", "columns"),
+    ],
+)
+def test_invalid_profiles(tmp_path: Path, document: str, message: str) -> None:
+    """Test that invalid profiles are rejected.
+
+    Args:
+        tmp_path: Temporary directory for the profile file.
+        document: Contents of the invalid profile.
+        message: Text expected in the error message.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the profile is accepted.
+    """
+    path = tmp_path / "invalid.toml"
+    path.write_text(document)
+
+    with pytest.raises(ValueError, match=message):
+        load_profile(path)
+    assert not (tmp_path / ".invalid.toml.cache").exists()
+
+
+def test_resolve_profile(tmp_path: Path) -> None:
+    """Test finding profiles by path and by name.
+
+    Verifies that an existing path is used as is, that a name is looked up
+    in the profile directory with either extension, and that a missing
+    profile raises FileNotFoundError.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If a profile is not found as expected.
+    """
+    toml = tmp_path / "walking.toml"
+    toml.write_text(WALKING_PROFILE)
+    json_path = tmp_path / "ecg.json"
+    json_path.write_text("{}")
+
+    assert resolve_profile(toml, tmp_path / "elsewhere") == toml
+    assert resolve_profile("walking", tmp_path) == toml
+    assert resolve_profile("ecg", tmp_path) == json_path
+    with pytest.raises(FileNotFoundError):
+        resolve_profile("missing", tmp_path)
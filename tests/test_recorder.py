@@ -0,0 +1,383 @@
+"""Test suite for the XDF recorder.
+
+This module contains tests for the streaming XDF writer and the recorder
+thread pulling LSL streams into it. LSL resolution and inlets are mocked,
+and written files are decoded with a minimal XDF chunk reader.
+
+Functions:
+    test_writer_writes_xdf: Tests the chunks of a written XDF file.
+    test_writer_rejects_invalid_streams: Tests stream header validation.
+    test_writer_never_overwrites: Tests that existing files are kept.
+    test_recorder_records_streams: Tests recording pulled chunks.
+    test_recorder_skips_failed_streams: Tests that a stream failing to open
+        does not stop the others from being recorded.
+    test_recorder_without_streams: Tests the report when no stream is
+        found.
+    test_recorder_stops_continuous_stream: Tests that stopping does not wait
+        for a producing stream to run dry.
+"""
+
+import struct
+import time
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+from pylsl import cf_float32, cf_string, cf_undefined
+
+from mobi_marker.recorder import XDFRecorder, XDFWriter
+from mobi_marker.status import StatusLevel, StatusRecord
+
+
+def _read_varlen(data: bytes, offset: int) -> tuple[int, int]:
+    """Decode an XDF variable-length integer.
+
+    Args:
+        data: The file contents.
+        offset: Position of the integer's length byte.
+
+    Returns:
+        The integer and the position after it.
+    """
+    size = data[offset]
+    value = int.from_bytes(data[offset + 1 : offset + 1 + size], "little")
+    return value, offset + 1 + size
+
+
+def _read_chunks(path: Path) -> list[tuple[int, bytes]]:
+    """Split an XDF file into chunks.
+
+    Args:
+        path: Path of the XDF file.
+
+    Returns:
+        The tag and content of every chunk, in file order.
+    """
+    data = path.read_bytes()
+    assert data[:4] == b"XDF:"
+    chunks = []
+    offset = 4
+    while offset < len(data):
+        length, offset = _read_varlen(data, offset)
+        (tag,) = struct.unpack_from("<H", data, offset)
+        chunks.append((tag, data[offset + 2 : offset + length]))
+        offset += length
+    return chunks
+
+
+def _read_strings(content: bytes) -> list[tuple[float, str]]:
+    """Decode a samples chunk of a single-channel string stream.
+
+    Args:
+        content: The chunk content.
+
+    Returns:
+        The timestamp and value of every sample.
+    """
+    count, offset = _read_varlen(content, 4)
+    samples = []
+    for _ in range(count):
+        assert content[offset] == 8
+        (timestamp,) = struct.unpack_from("<d", content, offset + 1)
+        length, offset = _read_varlen(content, offset + 9)
+        samples.append((timestamp, content[offset : offset + length].decode()))
+        offset += length
+    return samples
+
+
+def test_writer_writes_xdf(tmp_path: Path) -> None:
+    """Test the chunks of a written XDF file.
+
+    Verifies the file header, stream headers, string and numeric sample
+    chunks, clock offset and boundary chunks, and the stream footers with
+    the sample counts and timestamp range.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If a chunk is missing or wrongly encoded.
+    """
+    path = tmp_path / "session.xdf"
+    writer = XDFWriter(path)
+    writer.add_stream(1, "<info><name>Markers</name></info>", cf_string, 1)
+    writer.add_stream(2, "<info><name>EEG</name></info>", cf_float32, 2)
+    writer.write_samples(1, [["START"], ["ÉND"]], [1.5, 2.5])
+    writer.write_samples(2, [[1.0, 2.0]], [1.75])
+    writer.write_samples(2, [], [])
+    writer.write_clock_offset(1, 3.0, -0.25)
+    writer.write_boundary()
+    writer.close()
+    writer.close()
+
+    chunks = _read_chunks(path)
+
+    assert [tag for tag, _ in chunks] == [1, 2, 2, 3, 3, 4, 5, 6, 6]
+    assert b"<version>1.0</version>" in chunks[0][1]
+    assert chunks[1][1] == struct.pack("<I", 1) + b"<info><name>Markers</name></info>"
+    assert _read_strings(chunks[3][1]) == [(1.5, "START"), (2.5, "ÉND")]
+    assert chunks[4][1] == struct.pack("<IBBBd2f", 2, 1, 1, 8, 1.75, 1.0, 2.0)
+    assert chunks[5][1] == struct.pack("<Idd", 1, 3.0, -0.25)
+    assert len(chunks[6][1]) == 16
+    footer = chunks[7][1]
+    assert footer[:4] == struct.pack("<I", 1)
+    assert b"<first_timestamp>1.5</first_timestamp>" in footer
+    assert b"<last_timestamp>2.5</last_timestamp>" in footer
+    assert b"<sample_count>2</sample_count>" in footer
+
+
+def test_writer_rejects_invalid_streams(tmp_path: Path) -> None:
+    """Test that duplicate IDs and unsupported formats are rejected.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If an invalid stream is accepted.
+    """
+    writer = XDFWriter(tmp_path / "session.xdf")
+    writer.add_stream(1, "<info/>", cf_string, 1)
+    with pytest.raises(ValueError):
+        writer.add_stream(1, "<info/>", cf_string, 1)
+    with pytest.raises(ValueError):
+        writer.add_stream(2, "<info/>", cf_undefined, 1)
+    writer.close()
+
+
+def test_writer_never_overwrites(tmp_path: Path) -> None:
+    """Test that an existing file is never overwritten.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the existing file is replaced.
+    """
+    path = tmp_path / "session.xdf"
+    path.write_bytes(b"previous")
+
+    with pytest.raises(FileExistsError):
+        XDFWriter(path)
+
+    assert path.read_bytes() == b"previous"
+
+
+def test_recorder_records_streams(tmp_path: Path) -> None:
+    """Test that pulled chunks are recorded until the recorder is stopped.
+
+    Verifies that found streams are opened and recorded with clock offsets,
+    that a missing stream is reported, that the start of the recording is
+    reported, and that the file is closed with footers once the recorder
+    stops.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If samples are missing or the file is incomplete.
+    """
+    info = Mock()
+    info.as_xml.return_value = "<info><name>MobiMarkerStream</name></info>"
+    info.channel_format.return_value = cf_string
+    info.channel_count.return_value = 1
+    info.name.return_value = "MobiMarkerStream"
+    inlet = Mock()
+    inlet.info.return_value = info
+    inlet.time_correction.return_value = 0.0
+    chunks = iter([([["START"], ["END"]], [1.0, 2.0])])
+    inlet.pull_chunk.side_effect = lambda **kwargs: next(chunks, ([], []))
+
+    def resolver(prop: str, value: str) -> Mock:
+        return Mock(results=Mock(return_value=[info] if value != "EEG" else []))
+
+    statuses: list[StatusRecord] = []
+    path = tmp_path / "session.xdf"
+    with (
+        patch("mobi_marker.recorder.ContinuousResolver", side_effect=resolver),
+        patch("mobi_marker.recorder.StreamInlet", return_value=inlet),
+    ):
+        recorder = XDFRecorder(
+            path,
+            ["MobiMarkerStream", "EEG"],
+            resolve_timeout=0.1,
+            poll_interval=0.01,
+            drain_timeout=0.0,
+            on_status=statuses.append,
+        )
+        recorder.start()
+        deadline = time.monotonic() + 5.0
+        while recorder.samples_recorded < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        recorder.stop()
+        recorder.join(5.0)
+
+    assert not recorder.is_alive()
+    inlet.open_stream.assert_called_once()
+    chunks_written = _read_chunks(path)
+    tags = [tag for tag, _ in chunks_written]
+    assert tags[:2] == [1, 2]
+    assert 4 in tags
+    assert tags[-1] == 6
+    samples = [
+        sample
+        for tag, content in chunks_written
+        if tag == 3
+        for sample in _read_strings(content)
+    ]
+    assert samples == [(1.0, "START"), (2.0, "END")]
+    warnings = [record for record in statuses if record.level == StatusLevel.WARNING]
+    assert [record.detail for record in warnings] == ["EEG"]
+    assert [record.message for record in statuses[-2:]] == [
+        "Recording to",
+        "Recording saved to",
+    ]
+
+
+def _stream_info(name: str) -> Mock:
+    """Return a mock stream info of a single-channel string stream.
+
+    Args:
+        name: Name of the stream.
+
+    Returns:
+        The mock stream info.
+    """
+    info = Mock()
+    info.as_xml.return_value = f"<info><name>{name}</name></info>"
+    info.channel_format.return_value = cf_string
+    info.channel_count.return_value = 1
+    info.name.return_value = name
+    return info
+
+
+def test_recorder_skips_failed_streams(tmp_path: Path) -> None:
+    """Test that a stream failing to open is skipped.
+
+    Verifies that an error other than an unsupported format while opening
+    one stream is reported, that its inlet is closed, and that the other
+    stream is still recorded and the recording reported as saved.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the failure aborts the recording.
+    """
+    infos = {name: _stream_info(name) for name in ("MobiMarkerStream", "EEG")}
+    good = Mock()
+    good.info.return_value = infos["MobiMarkerStream"]
+    good.time_correction.return_value = 0.0
+    chunks = iter([([["START"]], [1.0])])
+    good.pull_chunk.side_effect = lambda **kwargs: next(chunks, ([], []))
+    bad = Mock()
+    bad.open_stream.side_effect = TimeoutError("open_stream timed out")
+    inlets = {"MobiMarkerStream": good, "EEG": bad}
+
+    def resolver(prop: str, value: str) -> Mock:
+        return Mock(results=Mock(return_value=[infos[value]]))
+
+    statuses: list[StatusRecord] = []
+    path = tmp_path / "session.xdf"
+    with (
+        patch("mobi_marker.recorder.ContinuousResolver", side_effect=resolver),
+        patch(
+            "mobi_marker.recorder.StreamInlet",
+            side_effect=lambda info, **kwargs: inlets[info.name()],
+        ),
+    ):
+        recorder = XDFRecorder(
+            path,
+            ["EEG", "MobiMarkerStream"],
+            resolve_timeout=0.1,
+            poll_interval=0.01,
+            drain_timeout=0.0,
+            on_status=statuses.append,
+        )
+        recorder.start()
+        deadline = time.monotonic() + 5.0
+        while recorder.samples_recorded < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        recorder.stop()
+        recorder.join(5.0)
+
+    assert recorder.samples_recorded == 1
+    bad.close_stream.assert_called_once()
+    errors = [record for record in statuses if record.level == StatusLevel.ERROR]
+    assert [record.message for record in errors] == ["Error recording stream"]
+    assert statuses[-1].message == "Recording saved to"
+
+
+def test_recorder_without_streams(tmp_path: Path) -> None:
+    """Test the report when none of the streams is found.
+
+    Verifies that the recorder warns that nothing was recorded instead of
+    reporting the recording as saved.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the empty recording is reported as saved.
+    """
+    statuses: list[StatusRecord] = []
+    with patch(
+        "mobi_marker.recorder.ContinuousResolver",
+        return_value=Mock(results=Mock(return_value=[])),
+    ):
+        recorder = XDFRecorder(
+            tmp_path / "session.xdf",
+            ["MobiMarkerStream"],
+            resolve_timeout=0.05,
+            poll_interval=0.01,
+            on_status=statuses.append,
+        )
+        recorder.start()
+        recorder.join(5.0)
+
+    assert not recorder.is_alive()
+    assert statuses[-1].level == StatusLevel.WARNING
+    assert statuses[-1].message == "Warning: no streams found, nothing recorded to"
+    assert all(record.message != "Recording saved to" for record in statuses)
+
+
+def test_recorder_stops_continuous_stream(tmp_path: Path) -> None:
+    """Test that stop() ends recording of a stream that never runs dry.
+
+    Verifies that the drain after stop() is bounded by drain_timeout even
+    when every pull returns new samples, as with a continuous EEG stream.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the recorder keeps running after the drain.
+    """
+    info = _stream_info("EEG")
+    inlet = Mock()
+    inlet.info.return_value = info
+    inlet.time_correction.return_value = 0.0
+    inlet.pull_chunk.return_value = ([["sample"]], [1.0])
+
+    with (
+        patch(
+            "mobi_marker.recorder.ContinuousResolver",
+            return_value=Mock(results=Mock(return_value=[info])),
+        ),
+        patch("mobi_marker.recorder.StreamInlet", return_value=inlet),
+    ):
+        recorder = XDFRecorder(
+            tmp_path / "session.xdf",
+            ["EEG"],
+            resolve_timeout=0.1,
+            poll_interval=0.01,
+            drain_timeout=0.1,
+        )
+        recorder.start()
+        assert recorder.started.wait(5.0)
+        recorder.stop()
+        start = time.monotonic()
+        recorder.join(5.0)
+
+    assert not recorder.is_alive()
+    assert time.monotonic() - start < 2.0
+    assert recorder.samples_recorded > 0
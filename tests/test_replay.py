@@ -0,0 +1,94 @@
+"""Test suite for the journal replay tool.
+
+This module contains tests for replaying marker journals through an LSL
+outlet.
+
+Functions:
+    test_replay_preserves_relative_timing: Tests re-based timestamps.
+    test_replay_scaled_timing: Tests replay at a scaled speed.
+"""
+
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import pytest
+
+from mobi_marker.dispatch import MarkerRecord
+from mobi_marker.journal import MarkerJournal
+from mobi_marker.journal_reader import JournalReader
+from mobi_marker.replay import replay
+
+
+def _write_journal(path: Path) -> None:
+    """Write a journal with three markers at 0, 1 and 3 seconds.
+
+    Args:
+        path: Path of the journal file.
+    """
+    journal = MarkerJournal(path, sync_interval=0)
+    journal.write(
+        [
+            MarkerRecord(1, "START", 50.0),
+            MarkerRecord(2, "NOTE", 51.0),
+            MarkerRecord(3, "END", 53.0),
+        ],
+        0.0,
+    )
+    journal.close()
+
+
+def test_replay_preserves_relative_timing(tmp_path: Path) -> None:
+    """Test that replayed markers keep their spacing on the current clock.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If markers or timestamps are replayed incorrectly.
+    """
+    path = tmp_path / "session.mbj"
+    _write_journal(path)
+    outlet = Mock()
+
+    with (
+        JournalReader(path) as reader,
+        patch("mobi_marker.replay.local_clock", return_value=1000.0),
+    ):
+        assert replay(reader, outlet, speed=0) == 3
+
+    pushed = [(call.args[0][0], call.args[1]) for call in outlet.push_sample.mock_calls]
+    assert pushed == [("START", 1000.0), ("NOTE", 1001.0), ("END", 1003.0)]
+
+    with JournalReader(path) as reader, pytest.raises(ValueError):
+        replay(reader, outlet, speed=-1)
+
+
+def test_replay_scaled_timing(tmp_path: Path) -> None:
+    """Test that a speed factor compresses the spacing between markers.
+
+    Args:
+        tmp_path: Temporary directory provided by pytest.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the scaled schedule is not respected.
+    """
+    path = tmp_path / "session.mbj"
+    _write_journal(path)
+    outlet = Mock()
+
+    with (
+        JournalReader(path) as reader,
+        patch("mobi_marker.replay.local_clock", return_value=1000.0),
+        patch("mobi_marker.replay.time.sleep") as sleep,
+    ):
+        replay(reader, outlet, speed=100.0)
+
+    stamps = [call.args[1] for call in outlet.push_sample.mock_calls]
+    assert stamps == pytest.approx([1000.0, 1000.01, 1000.03])
+    assert sleep.call_count == 2
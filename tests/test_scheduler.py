@@ -0,0 +1,266 @@
+"""Test suite for the protocol scheduler.
+
+This module contains tests for loading timed marker protocols and firing
+their markers on time.
+
+Functions:
+    test_load_protocol: Tests that protocol files are parsed and validated.
+    test_schedule: Tests that loops and jitter are expanded into offsets.
+    test_wait_until: Tests the hybrid sleep and spin wait.
+    test_scheduler_fires_markers: Tests that markers are sent at their
+        deadlines through the scheduler's queue.
+    test_scheduler_stop: Tests that a running protocol can be stopped.
+    test_scheduler_reuses_queue: Tests that consecutive runs share a
+        dispatch queue.
+"""
+
+import json
+import random
+import threading
+import time
+from pathlib import Path
+from unittest.mock import Mock
+
+import pytest
+from pylsl import local_clock
+
+from mobi_marker.engine import MarkerEngine
+from mobi_marker.metrics import Metrics
+from mobi_marker.scheduler import (
+    FiredMarker,
+    Protocol,
+    ProtocolLoop,
+    ProtocolScheduler,
+    ProtocolStep,
+    ScheduledMarker,
+    load_protocol,
+    schedule,
+    wait_until,
+)
+from mobi_marker.status import StatusLevel, StatusRecord
+
+
+def test_load_protocol(tmp_path: Path) -> None:
+    """Test that protocol files are parsed and validated.
+
+    Verifies that a TOML protocol with a nested loop is loaded with its
+    offsets, jitter and seed, that a JSON protocol takes its name from the
+    file, and that invalid steps are reported with their location.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If a protocol is parsed wrongly or accepted invalid.
+    """
+    path = tmp_path / "oddball.toml"
+    path.write_text(
+        'name = "Oddball"\n'
+        "seed = 7\n"
+        "[[steps]]\n"
+        'marker = " START "\n'
+        "[[steps]]\n"
+        "repeat = 3\n"
+        'steps = [{ marker = "STIM", offset = 1, jitter = 0.25 }]\n'
+    )
+
+    protocol = load_protocol(path)
+
+    assert protocol == Protocol(
+        "Oddball",
+        (
+            ProtocolStep("START"),
+            ProtocolLoop((ProtocolStep("STIM", 1.0, 0.25),), 3),
+        ),
+        7,
+    )
+    assert protocol.marker_count == 4
+
+    path = tmp_path / "simple.json"
+    path.write_text(json.dumps({"steps": [{"marker": "A", "offset": 0.5}]}))
+    assert load_protocol(path) == Protocol("simple", (ProtocolStep("A", 0.5),))
+
+    for steps, message in (
+        ([], "steps must be a non-empty array"),
+        ([{"marker": "A", "jitter": -1}], r"steps\[0\]\.jitter"),
+        ([{"repeat": 0, "steps": [{"marker": "A"}]}], r"steps\[0\]\.repeat"),
+        ([{"repeat": 2, "steps": [{"offset": 1}]}], r"steps\[0\]\.steps\[0\]"),
+    ):
+        path.write_text(json.dumps({"steps": steps}))
+        with pytest.raises(ValueError, match=message):
+            load_protocol(path)
+    with pytest.raises(ValueError, match="not a .toml or .json"):
+        load_protocol(tmp_path / "protocol.txt")
+
+
+def test_schedule() -> None:
+    """Test that loops and jitter are expanded into offsets.
+
+    Verifies that offsets accumulate from the previous marker's deadline
+    across loop repetitions, and that jitter stays within its bound and is
+    reproducible with the same seed.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If a marker or offset is wrong.
+    """
+    protocol = Protocol(
+        "Test",
+        (
+            ProtocolStep("START"),
+            ProtocolLoop((ProtocolStep("A", 1.0), ProtocolStep("B", 0.5)), 2),
+            ProtocolStep("END", 2.0),
+        ),
+    )
+
+    assert list(schedule(protocol, random.Random())) == [
+        ScheduledMarker(0.0, "START"),
+        ScheduledMarker(1.0, "A"),
+        ScheduledMarker(1.5, "B"),
+        ScheduledMarker(2.5, "A"),
+        ScheduledMarker(3.0, "B"),
+        ScheduledMarker(5.0, "END"),
+    ]
+
+    jittered = Protocol("Jitter", (ProtocolLoop((ProtocolStep("S", 1.0, 0.5),), 50),))
+    offsets = [item.offset for item in schedule(jittered, random.Random(1))]
+    intervals = [b - a for a, b in zip([0.0, *offsets], offsets)]
+    assert all(1.0 <= interval <= 1.5 for interval in intervals)
+    assert offsets == [item.offset for item in schedule(jittered, random.Random(1))]
+
+
+def test_wait_until() -> None:
+    """Test the hybrid sleep and spin wait.
+
+    Verifies that the wait returns at its deadline, not before it, that a
+    past deadline returns immediately, and that setting the interrupt event
+    ends a long wait early.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the wait ends early, late or is not interrupted.
+    """
+    deadline = local_clock() + 0.02
+    assert wait_until(deadline)
+    woke = local_clock()
+    assert deadline <= woke < deadline + 0.005
+
+    assert wait_until(local_clock() - 1.0)
+
+    interrupt = threading.Event()
+    threading.Timer(0.05, interrupt.set).start()
+    start = time.monotonic()
+    assert not wait_until(local_clock() + 10.0, interrupt=interrupt)
+    assert time.monotonic() - start < 5.0
+
+
+def test_scheduler_fires_markers() -> None:
+    """Test that markers are sent at their deadlines.
+
+    Verifies that every marker is queued on the scheduler's own dispatch
+    queue, stamped with the time it was sent at, shortly after its
+    deadline, that the scheduling errors are recorded into the metrics and
+    that the start and end of the protocol are reported.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If a marker is missing, early or mistimed.
+    """
+    engine = MarkerEngine()
+    engine.outlet = Mock()
+    metrics = Metrics()
+    statuses: list[StatusRecord] = []
+    fired: list[FiredMarker] = []
+    protocol = Protocol(
+        "Fast", (ProtocolStep("START"), ProtocolLoop((ProtocolStep("S", 0.02),), 4))
+    )
+
+    scheduler = ProtocolScheduler(
+        engine,
+        protocol,
+        on_status=statuses.append,
+        on_fired=fired.append,
+        metrics=metrics,
+    )
+    scheduler.start()
+    scheduler.join(5.0)
+
+    assert not scheduler.is_alive()
+    assert scheduler.fired == 5
+    records = engine._drain(10)
+    assert [record.marker for record in records] == ["START", "S", "S", "S", "S"]
+    assert [record.timestamp for record in records] == [item.fired_at for item in fired]
+    for item in fired:
+        assert 0.0 <= item.fired_at - item.deadline < 0.005
+    assert fired[-1].deadline - fired[0].deadline == pytest.approx(0.08)
+    assert metrics.schedule.snapshot().samples == 5
+    assert statuses[0].message == "Protocol started"
+    assert statuses[-1].message == "Protocol finished"
+
+
+def test_scheduler_stop() -> None:
+    """Test that a running protocol can be stopped.
+
+    Verifies that stop() ends the wait for the next marker, that the stop
+    is reported and that on_finished is called.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the protocol keeps running after stop().
+    """
+    engine = MarkerEngine()
+    engine.outlet = Mock()
+    statuses: list[StatusRecord] = []
+    finished = threading.Event()
+    protocol = Protocol("Slow", (ProtocolStep("A"), ProtocolStep("B", 60.0)))
+
+    scheduler = ProtocolScheduler(
+        engine, protocol, on_status=statuses.append, on_finished=finished.set
+    )
+    scheduler.start()
+    while scheduler.fired == 0:
+        time.sleep(0.001)
+    scheduler.stop()
+    scheduler.join(5.0)
+
+    assert not scheduler.is_alive()
+    assert finished.is_set()
+    assert scheduler.fired == 1
+    assert statuses[-1].level == StatusLevel.WARNING
+    assert statuses[-1].detail == "1 of 2 markers sent"
+
+
+def test_scheduler_reuses_queue() -> None:
+    """Test that consecutive runs can share a dispatch queue.
+
+    Verifies that a scheduler given a queue sends through it without
+    registering another one with the engine, so repeated runs do not grow
+    the queues the dispatch loop scans.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If a run registers a queue of its own.
+    """
+    engine = MarkerEngine()
+    engine.outlet = Mock()
+    queue = engine.add_queue()
+    queues = len(engine._queues)
+    protocol = Protocol("Once", (ProtocolStep("A"),))
+
+    for _ in range(3):
+        scheduler = ProtocolScheduler(engine, protocol, queue=queue)
+        scheduler.start()
+        scheduler.join(5.0)
+
+    assert len(engine._queues) == queues
+    assert len(queue) == 3
@@ -0,0 +1,257 @@
+"""Test suite for the asyncio marker server.
+
+This module contains tests for receiving markers over the TCP and WebSocket
+endpoints of the marker server.
+
+Functions:
+    test_server_tcp_markers: Tests that TCP lines are queued in order.
+    test_server_websocket_markers: Tests the WebSocket handshake, masked and
+        fragmented messages, ping and close.
+    test_server_backpressure: Tests that a full queue holds clients back
+        instead of dropping markers.
+    test_server_backpressure_many_clients: Tests that held-back clients
+        share one backing-off wait for queue space.
+"""
+
+import asyncio
+import base64
+import hashlib
+import os
+import socket
+import time
+from typing import Callable, Iterator
+from unittest.mock import Mock, patch
+
+import pytest
+
+from mobi_marker.dispatch import MarkerRecord
+from mobi_marker.engine import MarkerEngine
+from mobi_marker.server import MarkerServer
+
+
+@pytest.fixture
+def engine() -> MarkerEngine:
+    """Return an engine with a mock outlet that is not dispatching.
+
+    Returns:
+        The engine.
+    """
+    engine = MarkerEngine()
+    engine.outlet = Mock()
+    return engine
+
+
+def _start(engine: MarkerEngine, queue_capacity: int = 65536) -> MarkerServer:
+    """Start a server on free ports and wait until it accepts clients.
+
+    Args:
+        engine: The engine markers are sent through.
+        queue_capacity: Capacity of the server's dispatch queue.
+
+    Returns:
+        The running server.
+    """
+    server = MarkerServer(engine, tcp_port=0, ws_port=0, queue_capacity=queue_capacity)
+    server.start()
+    assert server.ready.wait(2.0)
+    return server
+
+
+def _wait_for(condition: Callable[[], bool], timeout: float = 2.0) -> None:
+    """Poll until a condition callable returns true or the timeout expires.
+
+    Args:
+        condition: Callable returning whether the awaited state is reached.
+        timeout: Maximum number of seconds to wait.
+    """
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def _drain_all(engine: MarkerEngine) -> Iterator[MarkerRecord]:
+    """Dequeue every queued marker from all of the engine's queues.
+
+    Args:
+        engine: The engine to drain.
+
+    Yields:
+        The queued markers.
+    """
+    while batch := engine._drain(1024):
+        yield from batch
+
+
+def _ws_client_frame(opcode: int, payload: bytes, fin: bool = True) -> bytes:
+    """Build a masked client WebSocket frame with a short payload.
+
+    Args:
+        opcode: The frame opcode.
+        payload: The frame payload, shorter than 126 bytes.
+        fin: Whether this is the final fragment of the message.
+
+    Returns:
+        The encoded frame.
+    """
+    mask = os.urandom(4)
+    masked = bytes(byte ^ mask[i % 4] for i, byte in enumerate(payload))
+    return bytes(((0x80 if fin else 0) | opcode, 0x80 | len(payload))) + mask + masked
+
+
+def test_server_tcp_markers(engine: MarkerEngine) -> None:
+    """Test that newline-delimited TCP markers are queued in order.
+
+    Verifies that each line from a client becomes one marker, that markers
+    of one client keep their order, that blank lines are skipped, and that
+    a final line without newline is accepted when the client disconnects.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the markers are not queued as sent.
+    """
+    server = _start(engine)
+    assert server.tcp_address is not None
+    try:
+        with socket.create_connection(server.tcp_address) as client:
+            client.sendall(b"A\r\n\nB\n")
+            client.sendall("C é".encode())
+        _wait_for(lambda: server.received == 3)
+    finally:
+        server.stop()
+        server.join()
+
+    assert [record.marker for record in _drain_all(engine)] == ["A", "B", "C é"]
+
+
+def test_server_websocket_markers(engine: MarkerEngine) -> None:
+    """Test WebSocket clients.
+
+    Verifies the opening handshake, that each (possibly fragmented) text
+    message becomes one marker, that pings are answered, and that a close
+    frame is echoed.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the WebSocket protocol is not followed.
+    """
+    server = _start(engine)
+    assert server.ws_address is not None
+    key = base64.b64encode(os.urandom(16))
+    try:
+        with socket.create_connection(server.ws_address) as client:
+            client.settimeout(2.0)
+            client.sendall(
+                b"GET / HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\n"
+                b"Connection: Upgrade\r\nSec-WebSocket-Key: " + key + b"\r\n"
+                b"Sec-WebSocket-Version: 13\r\n\r\n"
+            )
+            response = b""
+            while not response.endswith(b"\r\n\r\n"):
+                response += client.recv(1)
+            accept = base64.b64encode(
+                hashlib.sha1(key + b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11").digest()
+            )
+            assert response.startswith(b"HTTP/1.1 101")
+            assert b"Sec-WebSocket-Accept: " + accept in response
+
+            client.sendall(
+                _ws_client_frame(0x1, b"START")
+                + _ws_client_frame(0x1, b"TRI", fin=False)
+                + _ws_client_frame(0x9, b"ping")
+                + _ws_client_frame(0x0, b"AL 1")
+                + _ws_client_frame(0x8, (1000).to_bytes(2, "big"))
+            )
+            assert client.recv(6) == b"\x8a\x04ping"
+            assert client.recv(4) == b"\x88\x02\x03\xe8"
+        _wait_for(lambda: server.clients == 0)
+    finally:
+        server.stop()
+        server.join()
+
+    assert [record.marker for record in _drain_all(engine)] == ["START", "TRIAL 1"]
+
+
+def test_server_backpressure(engine: MarkerEngine) -> None:
+    """Test that a full dispatch queue holds clients back.
+
+    Verifies that when the server's queue is full, further markers are not
+    dropped but wait until the dispatch loop makes room, and that they are
+    then queued in the order they were sent.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If markers are dropped or reordered.
+    """
+    server = _start(engine, queue_capacity=4)
+    assert server.tcp_address is not None
+    try:
+        with socket.create_connection(server.tcp_address) as client:
+            client.sendall(b"".join(b"%d\n" % i for i in range(10)))
+            _wait_for(lambda: server.received == 4)
+            time.sleep(0.05)
+            assert server.received == 4
+
+            markers: list[str] = []
+            while len(markers) < 10:
+                markers.extend(record.marker for record in _drain_all(engine))
+                time.sleep(0.005)
+    finally:
+        server.stop()
+        server.join()
+
+    assert server.dropped == 0
+    assert markers == [str(i) for i in range(10)]
+
+
+def test_server_backpressure_many_clients(engine: MarkerEngine) -> None:
+    """Test that held-back clients share one wait for queue space.
+
+    Verifies that while the queue stays full, the event loop checks for
+    space at a backing-off interval instead of once per millisecond for
+    every stalled client, and that all markers are still queued once the
+    dispatch loop makes room.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the loop polls per client or markers are lost.
+    """
+    sleep = asyncio.sleep
+    sleeps = 0
+
+    async def counting_sleep(delay: float) -> None:
+        nonlocal sleeps
+        sleeps += 1
+        await sleep(delay)
+
+    server = _start(engine, queue_capacity=2)
+    assert server.tcp_address is not None
+    clients = [socket.create_connection(server.tcp_address) for _ in range(20)]
+    try:
+        with patch("mobi_marker.server.asyncio.sleep", counting_sleep):
+            for index, client in enumerate(clients):
+                client.sendall(b"%d\n" % index)
+            _wait_for(lambda: server.received == 2)
+            time.sleep(0.3)
+        assert sleeps < 30
+
+        markers: list[str] = []
+        deadline = time.monotonic() + 2.0
+        while len(markers) < 20 and time.monotonic() < deadline:
+            markers.extend(record.marker for record in _drain_all(engine))
+            time.sleep(0.005)
+    finally:
+        for client in clients:
+            client.close()
+        server.stop()
+        server.join()
+
+    assert server.dropped == 0
+    assert sorted(markers, key=int) == [str(i) for i in range(20)]
@@ -0,0 +1,56 @@
+"""Test suite for status records.
+
+This module contains tests for the lazily formatted status record type.
+
+Functions:
+    test_status_record_now: Tests creation of a record stamped with now.
+    test_status_record_format: Tests formatting of the different details.
+"""
+
+import time
+from datetime import datetime
+
+from mobi_marker.status import StatusLevel, StatusRecord
+
+
+def test_status_record_now() -> None:
+    """Test that records created with now() carry the current times.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the timestamps are not taken from the clocks.
+    """
+    before = time.time()
+    record = StatusRecord.now(StatusLevel.INFO, "Started", lsl_time=3.0)
+
+    assert before <= record.wall_time <= time.time()
+    assert record.lsl_time == 3.0
+    assert record.detail is None
+    assert StatusRecord.now(StatusLevel.INFO, "Started").lsl_time > 0
+
+
+def test_status_record_format() -> None:
+    """Test that records format to the status log line layout.
+
+    Verifies the human-readable and LSL timestamps as well as the
+    formatting of single markers, marker batches, and delays.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the formatted text does not match the layout.
+    """
+    wall_time = datetime(2025, 1, 2, 3, 4, 5, 678000).timestamp()
+
+    plain = StatusRecord(wall_time, 12.3456, StatusLevel.INFO, "Started")
+    single = StatusRecord(
+        wall_time, 1.0, StatusLevel.INFO, "Sent marker", "START", 0.0015
+    )
+    batch = StatusRecord(wall_time, 1.0, StatusLevel.INFO, "Sent markers", ("A", "B"))
+
+    assert plain.format() == "[2025-01-02 03:04:05.678 | LSL: 12.346] Started"
+    assert single.format().endswith("] Sent marker: START (event-to-push: 1.500 ms)")
+    assert batch.format().endswith("] Sent markers (2): A, B")
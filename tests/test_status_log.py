@@ -0,0 +1,131 @@
+"""Test suite for the status log model.
+
+This module contains tests for the fixed-capacity ring buffer model that
+backs the status log view.
+
+Functions:
+    test_status_log_appends_in_order: Tests that rows follow append order.
+    test_status_log_discards_oldest: Tests that capacity bounds the model.
+    test_status_log_extend_larger_than_capacity: Tests oversized batches.
+    test_status_log_formats_rows_lazily: Tests display and foreground data.
+"""
+
+import pytest
+from PyQt6.QtCore import Qt
+
+from mobi_marker.status import StatusLevel, StatusRecord
+from mobi_marker.status_log import LEVEL_COLORS, StatusLogModel
+
+
+def _record(message: str, level: StatusLevel = StatusLevel.INFO) -> StatusRecord:
+    """Create a status record with fixed timestamps.
+
+    Args:
+        message: The status message.
+        level: The status level.
+
+    Returns:
+        The status record.
+    """
+    return StatusRecord(0.0, 1.5, level, message)
+
+
+def _messages(model: StatusLogModel) -> list[str]:
+    """Return the messages of all records retained by a model.
+
+    Args:
+        model: The status log model.
+
+    Returns:
+        The retained messages, oldest first.
+    """
+    return [record.message for record in model.records()]
+
+
+def test_status_log_appends_in_order() -> None:
+    """Test that appended records are exposed as rows in order.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If rows do not match the appended records.
+    """
+    model = StatusLogModel(capacity=5)
+    model.append(_record("first"))
+    model.extend([_record("second"), _record("third")])
+
+    assert model.rowCount() == 3
+    assert str(model.data(model.index(0))).endswith("] first")
+    assert str(model.data(model.index(2))).endswith("] third")
+    assert model.data(model.index(2), Qt.ItemDataRole.ToolTipRole) is None
+    assert _messages(model) == ["first", "second", "third"]
+
+
+def test_status_log_discards_oldest() -> None:
+    """Test that the model never grows beyond its capacity.
+
+    Verifies that appending to a full model discards the oldest records
+    and keeps the newest ones in order, across buffer wraparound.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the model grows or retains the wrong records.
+    """
+    model = StatusLogModel(capacity=3)
+    for number in range(10):
+        model.append(_record(f"message {number}"))
+
+    assert model.rowCount() == 3
+    assert _messages(model) == ["message 7", "message 8", "message 9"]
+
+    model.clear()
+    assert model.rowCount() == 0
+
+    with pytest.raises(ValueError):
+        StatusLogModel(capacity=0)
+
+
+def test_status_log_extend_larger_than_capacity() -> None:
+    """Test that a batch larger than the capacity keeps only its tail.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the retained records are not the newest ones.
+    """
+    model = StatusLogModel(capacity=4)
+    model.append(_record("old"))
+    model.extend(_record(str(number)) for number in range(6))
+
+    assert _messages(model) == ["2", "3", "4", "5"]
+
+
+def test_status_log_formats_rows_lazily() -> None:
+    """Test the display and foreground data of formatted rows.
+
+    Verifies that rows are formatted from their records on request, that
+    error rows are colored, and that exporting formats every record.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the row data does not match the records.
+    """
+    model = StatusLogModel(capacity=4)
+    model.extend([_record("ok"), _record("failed", StatusLevel.ERROR)])
+
+    assert "LSL: 1.500" in str(model.data(model.index(0)))
+    assert model.data(model.index(0), Qt.ItemDataRole.ForegroundRole) is None
+    assert (
+        model.data(model.index(1), Qt.ItemDataRole.ForegroundRole)
+        == LEVEL_COLORS[StatusLevel.ERROR]
+    )
+    assert model.export_text().splitlines() == [
+        model.data(model.index(0)),
+        model.data(model.index(1)),
+    ]
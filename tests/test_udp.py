@@ -0,0 +1,105 @@
+"""Test suite for UDP marker ingestion.
+
+This module contains tests for receiving markers over a local UDP socket.
+
+Functions:
+    test_udp_listener_queues_datagrams: Tests that datagrams are queued as
+        timestamped markers.
+    test_udp_listener_counts_drops: Tests that rejected markers are counted
+        and reported once per run.
+"""
+
+import socket
+import time
+from typing import Callable
+from unittest.mock import Mock, patch
+
+from mobi_marker.engine import MarkerEngine
+from mobi_marker.status import StatusRecord
+from mobi_marker.udp import UDPMarkerListener
+
+
+def _send(address: tuple[str, int], *datagrams: bytes) -> None:
+    """Send datagrams to a listener.
+
+    Args:
+        address: The (host, port) the listener is bound to.
+        *datagrams: The datagrams to send, in order.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+        for datagram in datagrams:
+            sender.sendto(datagram, address)
+
+
+def _wait_for(condition: Callable[[], bool], timeout: float = 2.0) -> None:
+    """Poll until a condition callable returns true or the timeout expires.
+
+    Args:
+        condition: Callable returning whether the awaited state is reached.
+        timeout: Maximum number of seconds to wait.
+    """
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_udp_listener_queues_datagrams() -> None:
+    """Test that each datagram is queued as one timestamped marker.
+
+    Verifies that markers arrive on the listener's own queue in order, that
+    trailing newlines and empty datagrams are dropped, and that each marker
+    carries the LSL time at which it was received.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If the datagrams are not queued as markers.
+    """
+    engine = MarkerEngine()
+    engine.outlet = Mock()
+    listener = UDPMarkerListener(engine, port=0, poll_interval=0.01)
+
+    with patch("mobi_marker.udp.local_clock", side_effect=[1.0, 2.0, 3.0]):
+        listener.start()
+        _send(listener.address, b"START\n", b"", "NOTE é".encode())
+        _wait_for(lambda: listener.received == 2)
+        listener.stop()
+        listener.join()
+
+    assert len(engine.queue) == 0
+    records = engine._drain(10)
+    assert [record.marker for record in records] == ["START", "NOTE é"]
+    assert [record.timestamp for record in records] == [1.0, 3.0]
+
+
+def test_udp_listener_counts_drops() -> None:
+    """Test that rejected markers are counted and reported once per run.
+
+    Verifies that every marker rejected by the engine is counted, but only
+    the first of a consecutive run of rejections reaches on_status.
+
+    Returns:
+        None
+
+    Raises:
+        AssertionError: If drops are not counted or reports are not limited.
+    """
+    engine = MarkerEngine()
+    reports: list[StatusRecord] = []
+    listener = UDPMarkerListener(
+        engine, port=0, on_status=reports.append, poll_interval=0.01
+    )
+
+    listener.start()
+    _send(listener.address, b"A", b"B", b"C")
+    _wait_for(lambda: listener.dropped == 3)
+    listener.stop()
+    listener.join()
+
+    assert listener.received == 0
+    assert listener.dropped == 3
+    assert [record.message for record in reports] == [
+        "Listening for UDP markers on",
+        "LSL stream not active",
+    ]